@@ -0,0 +1,19 @@
+"""Split structured edition documents (.docx/.odt/.json) into articles.
+
+The processing code lives in :mod:`doc_processor.core` and has no Streamlit
+or pandas dependency; the ``processor_*.py`` modules are the Streamlit apps
+built on top of it. ``python -m doc_processor`` runs the command line.
+"""
+
+from .core import ProcessorConfig, process_document
+
+__all__ = ["ProcessorConfig", "process_batch", "process_document"]
+
+
+def __getattr__(name):
+    # loaded on first use, like the other heavy names of doc_processor.core
+    if name == "process_batch":
+        from .core import process_batch
+
+        return process_batch
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
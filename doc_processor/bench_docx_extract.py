@@ -0,0 +1,72 @@
+"""Compare python-docx and the streaming lxml .docx reader on a large document.
+
+The body of a sample document is replicated N times into a temporary .docx,
+then both extractors are timed and their output is checked to be identical.
+
+    python doc_processor/bench_docx_extract.py --copies 1000
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import zipfile
+
+from core.docx_fast import main_document_path
+from core.extract import iter_docx_paragraphs, iter_docx_paragraphs_fast
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "new_line_separation.docx")
+
+
+def replicate_docx(source, target, copies):
+    """Write ``target`` with the body content of ``source`` repeated ``copies`` times."""
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as dst:
+        document_path = main_document_path(src)
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == document_path:
+                xml = data.decode("utf-8")
+                match = re.search(r"(<w:body>)(.*?)(<w:sectPr.*</w:body>)", xml, re.S)
+                xml = xml[: match.start(2)] + match.group(2) * copies + xml[match.end(2):]
+                data = xml.encode("utf-8")
+            dst.writestr(item, data)
+
+
+def run(extract, path, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paragraphs = list(extract(path))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return paragraphs, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=SAMPLE, help="document whose body is replicated")
+    parser.add_argument("--copies", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per extractor (best time is kept)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.docx")
+        replicate_docx(args.source, path, args.copies)
+        with zipfile.ZipFile(path) as zf:
+            xml_bytes = zf.getinfo(main_document_path(zf)).file_size
+
+        baseline, baseline_time = run(iter_docx_paragraphs, path, args.repeat)
+        fast, fast_time = run(iter_docx_paragraphs_fast, path, args.repeat)
+
+    assert "\n".join(fast).encode("utf-8") == "\n".join(baseline).encode("utf-8"), "outputs differ"
+
+    mb = xml_bytes / 1e6
+    print(f"document.xml: {mb:.1f} MB, {len(baseline)} paragraphs")
+    for label, elapsed in (("python-docx", baseline_time), ("lxml iterparse", fast_time)):
+        print(f"{label:>15}: {elapsed:7.3f} s  {len(baseline) / elapsed:10.0f} paragraphs/s  {mb / elapsed:7.1f} MB/s")
+    print(f"speed-up: {baseline_time / fast_time:.1f}x (identical output)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Benchmark the document pipeline on synthetic editions.
+
+Generates a .docx, .odt and .json edition with core.synthetic, then times each
+stage (text and HTML extraction, article splitting, JSON processing, CSV
+export) and reports articles/s, MB/s and peak RSS. Every case runs in a fresh
+process so its peak RSS is not inflated by the cases before it.
+
+    python doc_processor/benchmark.py --articles 2000 --output results.json
+    python doc_processor/benchmark.py --baseline results.json --threshold 0.15
+
+With ``--baseline`` the run is compared with a saved result file and the exit
+status is 1 if any case got slower by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from core import (
+    ArticleTable,
+    ProcessorConfig,
+    extract_paragraphs,
+    iter_edition_rows,
+    normalize_articles,
+    open_input,
+    split_articles,
+    to_bytes,
+)
+from core.json_stream import CSV_FIELDNAMES
+from core.sinks import article_fieldnames
+from core.synthetic import generate_edition
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _extract(ext, **config):
+    def case(paths):
+        return len(list(extract_paragraphs(paths[ext], ext, ProcessorConfig(**config)))), os.path.getsize(paths[ext])
+    return case
+
+
+def _article_split(paths):
+    config = ProcessorConfig()
+    paragraphs = list(extract_paragraphs(paths[".docx"], ".docx", config))
+    size = sum(len(p.encode("utf-8")) for p in paragraphs)
+    start = time.perf_counter()
+    count = sum(1 for _ in split_articles(paragraphs, config))
+    return count, size, time.perf_counter() - start
+
+
+def _process_json(paths):
+    from processor_json import process_json
+
+    with open(paths[".json"], "rb") as f:
+        data = f.read()
+    start = time.perf_counter()
+    count = len(process_json(data)[-1])
+    return count, len(data), time.perf_counter() - start
+
+
+def _stream_json(paths):
+    with open(paths[".json"], "rb") as f:
+        return sum(1 for _ in iter_edition_rows(f)), os.path.getsize(paths[".json"])
+
+
+def _json_full_copy(paths):
+    # decode the whole file and json.loads it, as the JSON app did before streaming
+    with open(paths[".json"], "rb") as f:
+        data = f.read()
+    edition = json.loads(data.decode("utf-8"))
+    return len(edition["articles"]), len(data)
+
+
+def _stream_json_memory(paths):
+    # an upload already in memory, read through a memoryview without another copy
+    with open(paths[".json"], "rb") as f:
+        data = f.read()
+    with open_input(data) as reader:
+        return sum(1 for _ in iter_edition_rows(reader)), len(data)
+
+
+def _normalize(paths):
+    import pandas as pd
+
+    config = ProcessorConfig()
+    frame = pd.DataFrame(split_articles(extract_paragraphs(paths[".docx"], ".docx", config), config))
+    start = time.perf_counter()
+    normalize_articles(frame)
+    return len(frame), int(frame.memory_usage(deep=True).sum()), time.perf_counter() - start
+
+
+def _json_normalize(paths):
+    import pandas  # noqa: F401 -- imported before the timed part
+
+    with open(paths[".json"], "rb") as f:
+        table = ArticleTable.from_rows(iter_edition_rows(f), CSV_FIELDNAMES)
+    start = time.perf_counter()
+    normalize_articles(table)
+    return len(table), table.nbytes, time.perf_counter() - start
+
+
+def _csv_export(paths):
+    config = ProcessorConfig()
+    articles = list(split_articles(extract_paragraphs(paths[".docx"], ".docx", config), config))
+    start = time.perf_counter()
+    data = to_bytes(articles, "csv", article_fieldnames(config.metadata_fields))
+    return len(articles), len(data), time.perf_counter() - start
+
+
+def _json_csv_export(paths):
+    with open(paths[".json"], "rb") as f:
+        rows = list(iter_edition_rows(f))
+    start = time.perf_counter()
+    data = to_bytes(rows, "csv", CSV_FIELDNAMES)
+    return len(rows), len(data), time.perf_counter() - start
+
+
+# name -> case(paths) returning (items, bytes) or (items, bytes, seconds)
+# when only part of the call is timed; items are paragraphs for extraction
+# cases and articles otherwise
+CASES = {
+    "extract_text": _extract(".docx"),
+    "extract_text_fast": _extract(".docx", fast=True),
+    "extract_odt": _extract(".odt"),
+    "paragraph_to_html": _extract(".docx", output_format="HTML"),
+    "odt_to_html": _extract(".odt", output_format="HTML"),
+    "article_split": _article_split,
+    "process_json": _process_json,
+    "stream_json": _stream_json,
+    "stream_json_memory": _stream_json_memory,
+    "json_full_copy": _json_full_copy,
+    "normalize": _normalize,
+    "json_normalize": _json_normalize,
+    "csv_export": _csv_export,
+    "json_csv_export": _json_csv_export,
+}
+
+
+def run_case(name, paths, repeat, queue):
+    """Child process body: run case ``name`` ``repeat`` times and report the best time."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outcome = CASES[name](paths)
+        elapsed = outcome[2] if len(outcome) == 3 else time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    items, size = outcome[:2]
+    queue.put({
+        "seconds": best,
+        "items": items,
+        "bytes": size,
+        "items_per_s": items / best if best else None,
+        "mb_per_s": size / 1e6 / best if best else None,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def measure(name, paths, repeat):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run_case, args=(name, paths, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def generate(path, params):
+    """Write a synthetic edition from a child process.
+
+    The peak RSS survives exec on Linux, so the generation must not raise it
+    in the process that spawns the measured cases.
+    """
+    process = multiprocessing.get_context("spawn").Process(target=generate_edition, args=(path,), kwargs=params)
+    process.start()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f"generating {path} failed")
+
+
+def compare(results, baseline, threshold):
+    """Print the change against ``baseline`` and return the names of regressed cases."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        change = result["seconds"] / previous["seconds"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:>18}: {change:+7.1%} vs baseline{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--body-paragraphs", type=int, default=6)
+    parser.add_argument("--words", type=int, default=60, help="words per body paragraph")
+    parser.add_argument("--metadata-density", type=float, default=0.8, help="fraction of metadata fields present")
+    parser.add_argument("--run-density", type=int, default=4, help="formatting runs per body paragraph")
+    parser.add_argument("--hyperlinks", type=int, default=1, help="hyperlinks per article")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best time is kept)")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated cases to run")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slow-down against the baseline")
+    args = parser.parse_args()
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    params = {
+        "articles": args.articles,
+        "body_paragraphs": args.body_paragraphs,
+        "words_per_paragraph": args.words,
+        "metadata_density": args.metadata_density,
+        "run_density": args.run_density,
+        "hyperlinks": args.hyperlinks,
+        "seed": args.seed,
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for ext in (".docx", ".odt", ".json"):
+            paths[ext] = os.path.join(tmp, "edition" + ext)
+            generate(paths[ext], params)
+        for name in cases:
+            results[name] = result = measure(name, paths, args.repeat)
+            rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.0f} MB"
+            print(
+                f"{name:>18}: {result['seconds']:7.3f} s  {result['items_per_s']:10.0f} items/s"
+                f"  {result['mb_per_s']:7.1f} MB/s  peak RSS {rss}"
+            )
+
+    report = {
+        "params": params,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"slower than the baseline: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
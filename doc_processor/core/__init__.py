@@ -0,0 +1,126 @@
+"""Headless processing core shared by the CLI and the Streamlit apps.
+
+Importing this package is cheap: python-docx and lxml are only imported when
+a document is parsed, and the modules that pull in process pools, asyncio,
+urllib, SQLite or NumPy (batch, service, the indexes and stores, ...) are
+only imported when one of their names is first used.
+"""
+
+import importlib
+
+from .cache import DocumentCache, LRUByteCache, content_hash
+from .classifier import LineClassifier, get_classifier
+from .config import IMAGE_FIELD, ProcessorConfig
+from .docx_fast import iter_docx_paragraphs_fast
+from .extract import iter_paragraphs
+from .html import docx_paragraph_runs_html, runs_to_html
+from .incremental import IncrementalSplitter, ParagraphIndex
+from .inputs import MemoryReader, open_input
+from .instrument import Profiler, profile_session
+from .odt import iter_odt_paragraphs_stream
+from .pipeline import extract_paragraphs, process_document, split_articles, wrap_paragraph_html
+from .registry import Extractor, detect_extension, register, select_extractor, supported_extensions
+from .search import SEARCH_FIELDS, ArticleIndex
+from .sinks import SINK_FORMATS, CsvSink, JsonlSink, ParquetSink, article_fieldnames, open_sink, to_bytes
+from .splitter import ArticleSplitter, iter_articles
+from .table import ArticleRow, ArticleTable
+
+# name -> submodule, imported on first access (see __getattr__)
+_LAZY = {
+    **dict.fromkeys(["SOURCE_FIELD", "BatchResult", "collect_files", "iter_batch_articles", "process_batch"], "batch"),
+    **dict.fromkeys(["DedupIndex", "DuplicateCluster", "find_duplicates"], "dedup"),
+    **dict.fromkeys(["FullTextIndex", "SearchHit", "source_digest"], "fulltext"),
+    **dict.fromkeys(["ImageStore", "extract_images", "split_with_images"], "images"),
+    **dict.fromkeys(["CSV_FIELDNAMES", "iter_edition_rows", "iter_json_events", "iter_ndjson_rows"], "json_stream"),
+    **dict.fromkeys(["NORMALIZE_FIELDS", "NormalizedArticles", "normalize_articles"], "normalize"),
+    **dict.fromkeys(["DIFF_FIELDNAMES", "ArticleChange", "article_fingerprint", "diff_revisions"], "revdiff"),
+    **dict.fromkeys(["IngestionService", "ServiceClient"], "service"),
+    "ResultStore": "store",
+    "generate_edition": "synthetic",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY})
+
+
+__all__ = [
+    "NORMALIZE_FIELDS",
+    "SEARCH_FIELDS",
+    "SINK_FORMATS",
+    "SOURCE_FIELD",
+    "ArticleChange",
+    "ArticleIndex",
+    "ArticleRow",
+    "ArticleSplitter",
+    "ArticleTable",
+    "CSV_FIELDNAMES",
+    "DIFF_FIELDNAMES",
+    "IMAGE_FIELD",
+    "BatchResult",
+    "CsvSink",
+    "DedupIndex",
+    "DocumentCache",
+    "DuplicateCluster",
+    "Extractor",
+    "FullTextIndex",
+    "ImageStore",
+    "IngestionService",
+    "IncrementalSplitter",
+    "JsonlSink",
+    "LineClassifier",
+    "LRUByteCache",
+    "MemoryReader",
+    "NormalizedArticles",
+    "ParagraphIndex",
+    "ParquetSink",
+    "Profiler",
+    "ProcessorConfig",
+    "ResultStore",
+    "SearchHit",
+    "ServiceClient",
+    "article_fieldnames",
+    "article_fingerprint",
+    "collect_files",
+    "content_hash",
+    "detect_extension",
+    "diff_revisions",
+    "docx_paragraph_runs_html",
+    "extract_images",
+    "extract_paragraphs",
+    "find_duplicates",
+    "generate_edition",
+    "get_classifier",
+    "iter_articles",
+    "iter_batch_articles",
+    "iter_docx_paragraphs_fast",
+    "iter_edition_rows",
+    "iter_json_events",
+    "iter_ndjson_rows",
+    "iter_odt_paragraphs_stream",
+    "iter_paragraphs",
+    "normalize_articles",
+    "open_input",
+    "open_sink",
+    "process_batch",
+    "process_document",
+    "profile_session",
+    "register",
+    "runs_to_html",
+    "select_extractor",
+    "source_digest",
+    "split_articles",
+    "split_with_images",
+    "supported_extensions",
+    "to_bytes",
+    "wrap_paragraph_html",
+]
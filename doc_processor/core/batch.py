@@ -0,0 +1,140 @@
+"""Parallel batch processing of many source documents.
+
+Each file is extracted and split in its own worker process (python-docx and
+odfpy parsing is CPU bound and holds the GIL), and the results are merged
+back in a deterministic order: the sorted input order, regardless of which
+worker finishes first. A failure in one file is reported for that file only.
+Each file's articles come back as a compact :class:`core.table.ArticleTable`
+rather than a list of dicts, which keeps both the worker's memory and the
+data pickled back to the parent small.
+
+Batches can mix any formats of :mod:`core.registry`. Each file gets the
+backend the configuration asks for (the cheapest capable one with ``fast``),
+files are submitted largest estimated cost first so a big document does not
+start last, and files whose extractor cannot be pickled (registered with a
+lambda or closure) are processed in the parent process while the pool works.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import ProcessorConfig
+from .pipeline import document_extractor, process_document
+from .registry import detect_extension, register, supported_extensions
+from .table import ArticleTable
+
+SOURCE_FIELD = "Ficheiro"
+
+BatchResult = namedtuple("BatchResult", ["source", "articles", "error"])
+
+
+def collect_files(inputs, recursive=False):
+    """Expand files and directories into a sorted list of supported documents."""
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+
+    extensions = supported_extensions()
+    files = set()
+    for item in inputs:
+        item = os.fspath(item)
+        if os.path.isdir(item):
+            if recursive:
+                walker = ((root, names) for root, _, names in os.walk(item))
+            else:
+                walker = [(item, os.listdir(item))]
+            for root, names in walker:
+                for name in names:
+                    path = os.path.join(root, name)
+                    # skip Word lock files such as "~$edition.docx"
+                    if name.startswith("~$") or not os.path.isfile(path):
+                        continue
+                    if os.path.splitext(name)[1].lower() in extensions:
+                        files.add(path)
+        else:
+            files.add(item)
+    return sorted(files)
+
+
+def process_file(path, config=None, extractor=None):
+    """Extract and split one document, capturing any error instead of raising.
+
+    ``extractor`` is the backend chosen by the parent; it is registered here
+    too, since a spawned worker only has the built-in ones.
+    """
+    try:
+        if extractor is not None:
+            register(extractor)
+        extension = detect_extension(path) or os.path.splitext(path)[1].lower()
+        articles = ArticleTable.from_rows(process_document(path, extension, config))
+        return BatchResult(path, articles, None)
+    except Exception as exc:
+        return BatchResult(path, [], f"{type(exc).__name__}: {exc}")
+
+
+def process_batch(inputs, config=None, workers=None, recursive=False):
+    """Yield a :class:`BatchResult` per document, in sorted path order.
+
+    ``workers`` defaults to the number of CPUs; ``workers=1`` processes the
+    files sequentially in the current process.
+    """
+    config = config or ProcessorConfig()
+    files = collect_files(inputs, recursive)
+    if not files:
+        return
+
+    if workers == 1 or len(files) == 1:
+        for path in files:
+            yield process_file(path, config)
+        return
+
+    plans = {path: _plan(path, config) for path in files}
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for path in sorted(files, key=lambda path: plans[path][1], reverse=True):
+            extractor = plans[path][0]
+            if extractor is None or extractor.picklable:
+                futures[path] = executor.submit(process_file, path, config, extractor)
+        for path in files:
+            future = futures.get(path)
+            if future is None:
+                yield process_file(path, config, plans[path][0])
+                continue
+            try:
+                yield future.result()
+            except Exception as exc:
+                # the worker process itself died (e.g. BrokenProcessPool)
+                yield BatchResult(path, [], f"{type(exc).__name__}: {exc}")
+
+
+def _plan(path, config):
+    """(extractor, estimated cost) of one file; no extractor when its format is unknown."""
+    try:
+        extension = detect_extension(path)
+        if extension is None:
+            return None, 0
+        extractor = document_extractor(extension, config)
+    except (ValueError, OSError):
+        return None, 0
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    return extractor, size * extractor.cost
+
+
+def iter_batch_articles(results, errors=None):
+    """Flatten batch results into one article stream tagged with the source file.
+
+    Failed files are skipped; if ``errors`` is a list, their results are
+    appended to it.
+    """
+    for result in results:
+        if result.error is not None:
+            if errors is not None:
+                errors.append(result)
+            continue
+        source = os.path.basename(result.source)
+        for article in result.articles:
+            yield {SOURCE_FIELD: source, **article}
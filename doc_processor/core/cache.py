@@ -0,0 +1,206 @@
+"""Content-hash keyed cache of parsed documents.
+
+Streamlit reruns the whole script on every widget change, so the same upload
+is parsed again and again. :class:`DocumentCache` keeps two tiers keyed by a
+hash of the file bytes plus the options each tier depends on:
+
+- paragraphs: the extracted paragraph list (depends on extension and format),
+- articles: the split article list (also depends on the split settings).
+
+Changing the delimiter or the metadata fields therefore only re-splits the
+cached paragraphs, and a repeated run with the same settings returns the
+cached articles. Both tiers evict least recently used entries once their
+total size goes over budget, and can optionally be backed by a directory on
+disk so repeat uploads survive a restart.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .inputs import open_input
+
+# settings that do not change the extracted articles
+_OUTPUT_NEUTRAL = ("fast",)
+
+
+def content_hash(data):
+    """Hex SHA-256 digest of a bytes-like object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def settings_key(settings):
+    """Canonical JSON of ``settings`` (a :class:`ProcessorConfig` or any JSON value)."""
+    if hasattr(settings, "to_dict"):
+        settings = {name: value for name, value in settings.to_dict().items() if name not in _OUTPUT_NEUTRAL}
+    return json.dumps(settings, sort_keys=True, ensure_ascii=False)
+
+
+def sizeof(value):
+    """Approximate memory footprint of cached paragraphs/articles in bytes."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUByteCache:
+    """Thread safe LRU mapping bounded by the total size of its values.
+
+    With ``disk_dir`` set, entries are also pickled to that directory and
+    loaded back on a memory miss; the directory is trimmed (oldest first) to
+    ``disk_max_bytes``.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        value = self._load(key)
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        self._store(key, value)
+        self._dump(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _store(self, key, value):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, value = pickle.load(f)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return value if stored_key == key else None
+
+    def _dump(self, key, value):
+        if not self.disk_dir:
+            return
+        # write to a temporary file first so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if self.disk_max_bytes:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class DocumentCache:
+    """Two tier (paragraphs, articles) cache keyed by file content and options.
+
+    Cached lists are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, disk_dir=None, disk_max_bytes=None):
+        # paragraphs are reused across delimiter changes, so give them most of the budget
+        paragraph_dir = os.path.join(disk_dir, "paragraphs") if disk_dir else None
+        article_dir = os.path.join(disk_dir, "articles") if disk_dir else None
+        disk_budget = disk_max_bytes // 2 if disk_max_bytes else None
+        self.paragraph_tier = LRUByteCache(max_bytes * 2 // 3, paragraph_dir, disk_budget)
+        self.article_tier = LRUByteCache(max_bytes // 3, article_dir, disk_budget)
+
+    @staticmethod
+    def _paragraph_key(digest, file_extension, output_format):
+        return "\x1f".join([digest, file_extension, output_format])
+
+    def paragraphs(self, data, file_extension, output_format, extract, digest=None):
+        """Return the paragraph list of ``data``, calling ``extract`` on a miss.
+
+        ``extract(file, file_extension)`` receives a binary file object.
+        """
+        digest = digest or content_hash(data)
+        key = self._paragraph_key(digest, file_extension, output_format)
+        paragraphs = self.paragraph_tier.get(key)
+        if paragraphs is None:
+            with open_input(data) as file:
+                paragraphs = list(extract(file, file_extension))
+            self.paragraph_tier.put(key, paragraphs)
+        return paragraphs
+
+    def articles(self, data, file_extension, settings, extract, split, digest=None):
+        """Return the article list of ``data`` split with ``settings``, reusing cached paragraphs.
+
+        ``settings`` is the :class:`ProcessorConfig` of the split (its
+        ``output_format`` selects the paragraph entry); ``split(paragraphs)``
+        turns the paragraph list into articles on a miss.
+        """
+        digest = digest or content_hash(data)
+        key = "\x1f".join([digest, file_extension, settings_key(settings)])
+        articles = self.article_tier.get(key)
+        if articles is None:
+            paragraphs = self.paragraphs(data, file_extension, settings.output_format, extract, digest)
+            articles = list(split(paragraphs))
+            self.article_tier.put(key, articles)
+        return articles
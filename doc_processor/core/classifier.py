@@ -0,0 +1,50 @@
+"""Precompiled classifier for metadata and delimiter lines.
+
+Building the patterns once per configuration replaces the per-line
+``any(line.startswith(f"{field}:") for field in METADATA_FIELDS)`` scan with a
+single regex match whose group index identifies the field directly.
+"""
+
+import re
+from functools import lru_cache
+
+
+class LineClassifier:
+    """Recognise ``<prefix><field>:`` metadata lines and article delimiters."""
+
+    def __init__(self, metadata_fields, article_start=None, field_prefix=""):
+        self.metadata_fields = list(metadata_fields)
+        self.article_start = article_start
+        self.field_prefix = field_prefix
+        # Dict keys are the field names as listed, without the source prefix.
+        self._keys = [field.strip() for field in self.metadata_fields]
+
+        alternatives = "|".join(f"({re.escape(field)})" for field in self.metadata_fields)
+        fields_pattern = f"{re.escape(field_prefix)}(?:{alternatives}):" if self.metadata_fields else None
+        self._field_re = re.compile(fields_pattern) if fields_pattern else None
+
+        structural = []
+        if article_start is not None:
+            structural.append(re.escape(article_start))
+        if fields_pattern:
+            structural.append(fields_pattern)
+        self._structural_re = re.compile("|".join(structural)) if structural else None
+
+    def match_field(self, line):
+        """Return ``(field, value)`` for a metadata line, otherwise ``None``."""
+        if self._field_re is None:
+            return None
+        m = self._field_re.match(line)
+        if m is None:
+            return None
+        return self._keys[m.lastindex - 1], line[m.end():].strip()
+
+    def is_structural(self, line):
+        """Whether ``line`` starts with the article delimiter or a metadata field."""
+        return self._structural_re is not None and self._structural_re.match(line) is not None
+
+
+@lru_cache(maxsize=32)
+def get_classifier(metadata_fields, article_start=None, field_prefix=""):
+    """Return a shared :class:`LineClassifier` for a hashable configuration."""
+    return LineClassifier(metadata_fields, article_start, field_prefix)
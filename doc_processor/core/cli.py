@@ -0,0 +1,443 @@
+"""Command line interface: ``python -m doc_processor``.
+
+    python -m doc_processor split editions/ extra.docx -o articles.csv --workers 4
+    python -m doc_processor split editions/ -o articles.parquet --to parquet
+    python -m doc_processor json exports/*.json exports/all.ndjson -o articles.csv
+    python -m doc_processor run jobs.json
+    python -m doc_processor generate edition.docx --articles 1000 --run-density 4
+    python -m doc_processor split edition.docx -o out.csv --profile memory --cprofile edition.pstats
+    python -m doc_processor serve --port 8765 --workers 4
+    python -m doc_processor split editions/ -o articles.csv --index archive.sqlite3
+    python -m doc_processor split editions/ -o articles.csv --store results.sqlite3
+    python -m doc_processor search archive.sqlite3 orçamento --autor "joão silva"
+    python -m doc_processor dedup editions/2024 --archive archive.sqlite3 -o repeated.csv
+    python -m doc_processor diff "edition v1.docx" "edition v2.docx" -o changes.csv
+    python -m doc_processor split editions/ -o articles.csv --format HTML --images media/
+
+``run`` executes several jobs, each with its own configuration, in one
+process. ``jobs.json`` holds a list of objects such as::
+
+    {"inputs": ["editions/2024"], "output": "2024.jsonl", "to": "jsonl",
+     "workers": 4, "recursive": false, "index": "archive.sqlite3",
+     "store": "results.sqlite3", "config": {"output_format": "HTML"}}
+
+where ``config`` takes the fields of :class:`core.config.ProcessorConfig`.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from contextlib import nullcontext
+
+from .batch import SOURCE_FIELD, iter_batch_articles, process_batch, process_file
+from .config import ARTICLE_START, IMAGE_FIELD, METADATA_FIELDS, OUTPUT_FORMATS, ProcessorConfig
+# only constants: the SQLite modules import sqlite3 when an index is opened
+from .dedup import THRESHOLD
+from .fulltext import INDEX_COLUMNS
+from .instrument import PROFILE_MODES, count, cprofile, profile_iter, profile_session, stage
+from .json_stream import CSV_FIELDNAMES, iter_edition_rows, iter_ndjson_rows
+from .sinks import SINK_FORMATS, article_fieldnames, open_sink
+
+# the service (asyncio, urllib, process pool), the indexes and stores (sqlite3),
+# revdiff, synthetic and images are imported by the commands that use them
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--article-start", default=ARTICLE_START, help="article delimiter")
+    parser.add_argument("--fields", default=", ".join(METADATA_FIELDS), help="comma separated metadata fields")
+    parser.add_argument("--field-prefix", default="#", help="text before each field name in the source")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="Texto", help="output format of the bodies")
+    parser.add_argument("--no-strip", action="store_true", help="keep whitespace around BODY and Rodape")
+    parser.add_argument(
+        "--fast", action="store_true", help="read .docx text with the streaming lxml reader (same output, faster)"
+    )
+    parser.add_argument("--merge-runs", action="store_true", help="merge adjacent runs with the same formatting (HTML)")
+    parser.add_argument(
+        "--images",
+        metavar="DIR",
+        help=f"store the images of .docx/.odt inputs in DIR (by content hash), listed in {IMAGE_FIELD}",
+    )
+
+
+def add_index_argument(parser):
+    parser.add_argument(
+        "--index", metavar="DB", help="also add the articles to this full-text index (SQLite, updated per file)"
+    )
+
+
+def add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="time",
+        choices=PROFILE_MODES,
+        help="log per-stage timings and counters as JSON on stderr ('memory' adds tracemalloc peaks)",
+    )
+    parser.add_argument("--cprofile", metavar="FILE", help="dump cProfile stats (pstats format) to FILE")
+
+
+def config_from_args(args):
+    return ProcessorConfig(
+        article_start=args.article_start,
+        metadata_fields=[field.strip() for field in args.fields.split(",")],
+        field_prefix=args.field_prefix,
+        output_format=args.format,
+        strip_body=not args.no_strip,
+        fast=args.fast,
+        merge_runs=args.merge_runs,
+        image_dir=args.images,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m doc_processor", description="Split edition documents into articles.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    split = subparsers.add_parser("split", help="split .docx/.odt/.md/.html/.txt documents into one output file")
+    split.add_argument("inputs", nargs="+", help="documents and/or directories containing documents")
+    split.add_argument("-o", "--output", help="output file (default: stdout)")
+    split.add_argument("-t", "--to", choices=SINK_FORMATS, default="csv", help="output file format (default: csv)")
+    split.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    split.add_argument("-r", "--recursive", action="store_true", help="also scan sub-directories")
+    add_config_arguments(split)
+    add_index_argument(split)
+    split.add_argument(
+        "--store", metavar="DB", help="keep the results in this store (SQLite) and only re-split new or changed files"
+    )
+    add_profile_arguments(split)
+
+    json_parser = subparsers.add_parser("json", help="convert JSON/NDJSON edition exports into one output file")
+    json_parser.add_argument("inputs", nargs="+", help="JSON files; .ndjson/.jsonl files hold one edition per line")
+    json_parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    json_parser.add_argument("-t", "--to", choices=SINK_FORMATS, default="csv", help="output file format (default: csv)")
+    json_parser.add_argument("--ndjson", action="store_true", help="read every input as NDJSON")
+    add_index_argument(json_parser)
+    add_profile_arguments(json_parser)
+
+    search = subparsers.add_parser("search", help="search a full-text index built with --index")
+    search.add_argument("index", help="index file (SQLite)")
+    search.add_argument("query", nargs="*", help="words (prefixes) that must all match")
+    search.add_argument("--fields", help=f"comma separated columns to match the words in ({', '.join(INDEX_COLUMNS)})")
+    for column in INDEX_COLUMNS:
+        search.add_argument(f"--{column}", help=f"words that must match in {column}")
+    search.add_argument("-n", "--limit", type=int, default=20)
+
+    dedup = subparsers.add_parser("dedup", help="report near-duplicate articles within the inputs and an archive")
+    dedup.add_argument("inputs", nargs="+", help="documents and/or directories containing documents")
+    dedup.add_argument("--archive", metavar="DB", help="signature archive (SQLite) to check against and update")
+    dedup.add_argument("--threshold", type=float, default=THRESHOLD, help="minimum estimated Jaccard similarity")
+    dedup.add_argument("-o", "--output", help="CSV report of the duplicate groups (default: stdout)")
+    dedup.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    dedup.add_argument("-r", "--recursive", action="store_true", help="also scan sub-directories")
+    add_config_arguments(dedup)
+
+    diff = subparsers.add_parser("diff", help="write the articles added, removed or modified between two revisions")
+    diff.add_argument("old", help="previous revision of the document")
+    diff.add_argument("new", help="new revision of the document")
+    diff.add_argument("-o", "--output", help="output file (default: stdout)")
+    diff.add_argument("-t", "--to", choices=SINK_FORMATS, default="csv", help="output file format (default: csv)")
+    add_config_arguments(diff)
+
+    run = subparsers.add_parser("run", help="run the jobs listed in a JSON file")
+    run.add_argument("jobs", help="JSON file with a list of jobs")
+
+    serve_parser = subparsers.add_parser("serve", help="run the HTTP ingestion service (see core.service)")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=None, help="default: 8765 (core.service.DEFAULT_PORT)")
+    serve_parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    serve_parser.add_argument("--queue-size", type=int, default=16, help="jobs waiting before uploads get 503")
+    serve_parser.add_argument("--max-jobs", type=int, default=256, help="finished jobs kept for polling")
+    serve_parser.add_argument("--max-upload-mb", type=int, default=256)
+
+    generate = subparsers.add_parser("generate", help="write a synthetic .docx/.odt/.json edition")
+    generate.add_argument("output", help="output file; the format comes from the extension")
+    generate.add_argument("--articles", type=int, default=100)
+    generate.add_argument("--body-paragraphs", type=int, default=5)
+    generate.add_argument("--words", type=int, default=60, help="words per body paragraph")
+    generate.add_argument("--metadata-density", type=float, default=1.0, help="fraction of metadata fields present")
+    generate.add_argument("--run-density", type=int, default=1, help="formatting runs per body paragraph")
+    generate.add_argument("--hyperlinks", type=int, default=0, help="hyperlinks per article")
+    generate.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def output_fieldnames(config, leading):
+    """Article columns for ``config``, with :data:`IMAGE_FIELD` when images are extracted."""
+    return article_fieldnames(config.metadata_fields, leading, [IMAGE_FIELD] if config.image_dir else ())
+
+
+def run_job(inputs, output, config, workers=None, recursive=False, to="csv", index=None, store=None):
+    """Split ``inputs`` into ``output`` (stdout if None) as ``to``; return the failed results.
+
+    ``index`` is the path of a :class:`FullTextIndex` to update with each file.
+    With ``store`` (the path of a :class:`ResultStore`) only new or changed
+    files are split, and the output is written from the store.
+    """
+    from .fulltext import FullTextIndex
+    from .store import ResultStore
+
+    if output is None and to == "parquet":
+        raise SystemExit("parquet output needs --output")
+
+    errors = []
+    skipped = None
+    fieldnames = output_fieldnames(config, [SOURCE_FIELD])
+    with open_sink(to, output or sys.stdout.buffer, fieldnames) as sink:
+        with FullTextIndex(index) if index else nullcontext() as fulltext:
+            if store is None:
+                results = process_batch(inputs, config, workers=workers, recursive=recursive)
+                if fulltext is not None:
+                    results = index_results(results, fulltext, config)
+                count = sink.write_all(iter_batch_articles(results, errors))
+            else:
+                with ResultStore(store) as results_store:
+                    results = results_store.refresh(inputs, config, workers=workers, recursive=recursive)
+                    if fulltext is not None:
+                        results = index_results(results, fulltext, config)
+                    with stage("store"):
+                        errors = [result for result in results if result.error is not None]
+                    skipped = len(results_store.skipped)
+                    count = sink.write_all(results_store.iter_batch_articles(inputs, recursive))
+
+    for result in errors:
+        print(f"erro em {result.source}: {result.error}", file=sys.stderr)
+    if skipped is not None:
+        print(f"♻️ {skipped} ficheiros sem alterações (do arquivo {store}).", file=sys.stderr)
+    print(f"✅ {count} artigos, {len(errors)} ficheiros com erro.", file=sys.stderr)
+    return errors
+
+
+def index_results(results, fulltext, config):
+    """Pass batch results through, adding each parsed file to ``fulltext``."""
+    from .fulltext import source_digest
+
+    for result in results:
+        if result.error is None:
+            with stage("index"):
+                fulltext.add(result.source, result.articles, source_digest(result.source, config))
+        yield result
+
+
+def iter_json_rows(inputs, ndjson=False, fulltext=None):
+    """Stream the article rows of JSON/NDJSON edition files, tagged with the file name.
+
+    With ``fulltext`` (a :class:`FullTextIndex`) each file is indexed as its
+    rows go by.
+    """
+    from .fulltext import source_digest
+
+    for path in inputs:
+        source = os.path.basename(path)
+        count("bytes", os.path.getsize(path))
+        with open(path, "rb") as f:
+            if ndjson or path.lower().endswith((".ndjson", ".jsonl")):
+                rows = iter_ndjson_rows(f)
+            else:
+                rows = iter_edition_rows(f)
+            rows = profile_iter("json_rows", rows, "articles")
+            if fulltext is not None:
+                rows = fulltext.iter_indexed(path, rows, source_digest(path))
+            for row in rows:
+                yield {SOURCE_FIELD: source, **row}
+
+
+def run_json(inputs, output, to="csv", ndjson=False, index=None):
+    from .fulltext import FullTextIndex
+
+    if output is None and to == "parquet":
+        raise SystemExit("parquet output needs --output")
+    with open_sink(to, output or sys.stdout.buffer, [SOURCE_FIELD, *CSV_FIELDNAMES]) as sink:
+        with FullTextIndex(index) if index else nullcontext() as fulltext:
+            count = sink.write_all(iter_json_rows(inputs, ndjson, fulltext))
+    print(f"✅ {count} artigos.", file=sys.stderr)
+
+
+def run_dedup(args):
+    """Check each parsed file against the archive (and the files before it), then add it."""
+    from .dedup import CLUSTER_FIELDNAMES, DedupIndex, cluster_rows
+    from .fulltext import source_digest
+
+    config = config_from_args(args)
+    errors = []
+    clusters = 0
+    with DedupIndex(args.archive or ":memory:", threshold=args.threshold) as archive:
+        with open_sink("csv", args.output or sys.stdout.buffer, CLUSTER_FIELDNAMES) as sink:
+            for result in process_batch(args.inputs, config, workers=args.workers, recursive=args.recursive):
+                if result.error is not None:
+                    errors.append(result)
+                    continue
+                found = archive.update(result.source, result.articles, source_digest(result.source, config))
+                sink.write_all(cluster_rows(found, clusters + 1))
+                clusters += len(found)
+    for result in errors:
+        print(f"erro em {result.source}: {result.error}", file=sys.stderr)
+    print(f"✅ {clusters} grupos de artigos repetidos, {len(errors)} ficheiros com erro.", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def run_diff(args):
+    """Write only the articles that changed from ``args.old`` to ``args.new``."""
+    from .revdiff import ADDED, DIFF_FIELDNAMES, MODIFIED, REMOVED, change_rows, diff_revisions
+
+    if args.output is None and args.to == "parquet":
+        raise SystemExit("parquet output needs --output")
+    config = config_from_args(args)
+    revisions = []
+    for path in (args.old, args.new):
+        result = process_file(path, config)
+        if result.error is not None:
+            print(f"erro em {result.source}: {result.error}", file=sys.stderr)
+            return 1
+        revisions.append(result.articles)
+    with stage("diff"):
+        changes = diff_revisions(*revisions)
+    fieldnames = output_fieldnames(config, DIFF_FIELDNAMES)
+    with open_sink(args.to, args.output or sys.stdout.buffer, fieldnames) as sink:
+        sink.write_all(change_rows(changes))
+    kinds = Counter(change.kind for change in changes)
+    print(
+        f"✅ {kinds[ADDED]} novos, {kinds[REMOVED]} removidos, {kinds[MODIFIED]} alterados "
+        f"({len(revisions[1])} artigos).",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def run_search(args):
+    """Print the best matches of an index, one tab separated line per article."""
+    from .fulltext import FullTextIndex
+
+    fields = [field.strip() for field in args.fields.split(",")] if args.fields else None
+    filters = {column: getattr(args, column) for column in INDEX_COLUMNS if getattr(args, column)}
+    try:
+        with FullTextIndex(args.index) as fulltext:
+            hits = fulltext.search(" ".join(args.query), fields, limit=args.limit, **filters)
+            total = fulltext.count(" ".join(args.query), fields, **filters)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    for hit in hits:
+        fields = (hit.source, hit.position + 1, hit.titulo, hit.autor, hit.snippet)
+        print("\t".join(" ".join(str(field).split()) for field in fields))
+    print(f"✅ {total} artigos.", file=sys.stderr)
+    return 0
+
+
+def run_serve(args):
+    """Run the ingestion service until interrupted."""
+    import asyncio
+
+    from .service import DEFAULT_PORT, serve
+
+    port = DEFAULT_PORT if args.port is None else args.port
+    print(f"a servir em http://{args.host}:{port}", file=sys.stderr)
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                port,
+                workers=args.workers,
+                queue_size=args.queue_size,
+                max_jobs=args.max_jobs,
+                max_upload_bytes=args.max_upload_mb << 20,
+            )
+        )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+def run_generate(args):
+    """Write a synthetic edition to ``args.output``."""
+    from .synthetic import generate_edition
+
+    try:
+        count = generate_edition(
+            args.output,
+            articles=args.articles,
+            body_paragraphs=args.body_paragraphs,
+            words_per_paragraph=args.words,
+            metadata_density=args.metadata_density,
+            run_density=args.run_density,
+            hyperlinks=args.hyperlinks,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"✅ {count} artigos em {args.output}.", file=sys.stderr)
+    return 0
+
+
+def run_profiled(args, command):
+    """Run ``command()`` under the profilers requested with --profile/--cprofile."""
+    with profile_session(args.profile, label=args.command) as profiler:
+        with cprofile(args.cprofile) if args.cprofile else nullcontext():
+            status = command()
+    if profiler is not None:
+        profiler.log()
+    return status
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "split":
+        # profilers only see the current process, so profile without worker processes
+        workers = 1 if (args.profile or args.cprofile) and args.workers is None else args.workers
+
+        def split():
+            errors = run_job(
+                args.inputs,
+                args.output,
+                config_from_args(args),
+                workers,
+                args.recursive,
+                args.to,
+                args.index,
+                args.store,
+            )
+            return 1 if errors else 0
+
+        return run_profiled(args, split)
+
+    if args.command == "json":
+
+        def convert():
+            run_json(args.inputs, args.output, args.to, args.ndjson, args.index)
+            return 0
+
+        return run_profiled(args, convert)
+
+    if args.command == "search":
+        return run_search(args)
+
+    if args.command == "dedup":
+        return run_dedup(args)
+
+    if args.command == "diff":
+        return run_diff(args)
+
+    if args.command == "serve":
+        return run_serve(args)
+
+    if args.command == "generate":
+        return run_generate(args)
+
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = json.load(f)
+    failed = 0
+    for job in jobs:
+        config = ProcessorConfig.from_dict(job.get("config", {}))
+        errors = run_job(
+            job["inputs"],
+            job.get("output"),
+            config,
+            job.get("workers"),
+            job.get("recursive", False),
+            job.get("to", "csv"),
+            job.get("index"),
+            job.get("store"),
+        )
+        failed += len(errors)
+    return 1 if failed else 0
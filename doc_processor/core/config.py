@@ -0,0 +1,75 @@
+"""Explicit processing configuration.
+
+Everything that used to be read from module globals of the Streamlit apps
+(``ARTICLE_START``, ``METADATA_FIELDS``, ``output_format``) travels in a
+:class:`ProcessorConfig`, so the core can run headless, in worker processes,
+or with several configurations in one process.
+"""
+
+from dataclasses import asdict, dataclass, fields, replace
+
+ARTICLE_START = "==Artigo_inicio=="
+METADATA_FIELDS = ("Titulo", "SubTitulo", "Autor", "Data", "Tag", "Pag", "Numero", "Imagens")
+OUTPUT_FORMATS = ("Texto", "HTML")
+# column listing the stored images of an article (see ``image_dir``)
+IMAGE_FIELD = "Imagens_extraidas"
+
+
+@dataclass(frozen=True)
+class ProcessorConfig:
+    """How a document is extracted and split into articles.
+
+    - ``article_start``: delimiter that opens a new article.
+    - ``metadata_fields``: field names recognised on metadata lines.
+    - ``field_prefix``: text before a field name in the source (``#Titulo:``).
+    - ``output_format``: ``"Texto"`` or ``"HTML"``.
+    - ``strip_body``: strip whitespace around BODY and Rodape.
+    - ``fast``: use the streaming lxml reader for plain-text .docx.
+    - ``merge_runs``: merge adjacent same-format runs in HTML output.
+    - ``image_dir``: store the embedded images of .docx/.odt inputs in this
+      directory (content-addressed, see :mod:`core.images`) and reference
+      them from the articles; None leaves them out.
+    """
+
+    article_start: str = ARTICLE_START
+    metadata_fields: tuple = METADATA_FIELDS
+    field_prefix: str = "#"
+    output_format: str = "Texto"
+    strip_body: bool = True
+    fast: bool = False
+    merge_runs: bool = False
+    image_dir: str = None
+
+    def __post_init__(self):
+        if isinstance(self.metadata_fields, str):
+            raise ValueError("metadata_fields must be a sequence of field names, not a string")
+        object.__setattr__(self, "metadata_fields", tuple(self.metadata_fields))
+        if not self.article_start:
+            raise ValueError("article_start must not be empty")
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {self.output_format!r}")
+
+    @property
+    def html(self):
+        return self.output_format == "HTML"
+
+    @property
+    def split_options(self):
+        """Keyword arguments for :class:`core.splitter.ArticleSplitter`."""
+        return {"field_prefix": self.field_prefix, "html": self.html, "strip_body": self.strip_body}
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+    def to_dict(self):
+        data = asdict(self)
+        data["metadata_fields"] = list(self.metadata_fields)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"unknown configuration keys: {', '.join(sorted(unknown))}")
+        return cls(**data)
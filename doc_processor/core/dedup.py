@@ -0,0 +1,505 @@
+"""Near-duplicate detection for article bodies (MinHash + LSH).
+
+Reprinted or lightly edited articles share most of their word 5-grams
+(shingles). Each body gets a MinHash signature: for ``num_perm`` hash
+functions, the minimum hash over its shingles. The fraction of equal
+positions of two signatures estimates the Jaccard similarity of their
+shingle sets, and locality-sensitive hashing (the signature split in
+``bands`` of ``rows`` values, each band hashed to one key) only compares
+articles that share a band key, instead of every pair.
+
+Everything runs on NumPy arrays over the whole batch: words are hashed
+with CRC-32 (once per distinct word, so signatures are stable across runs
+and can be stored), shingle hashes are weighted sums of the word hashes of
+each window, and the signatures use one permutation hashing: each shingle
+is hashed once into one of ``num_perm`` bins and ``np.minimum.at`` keeps
+the minimum per bin, instead of ``num_perm`` hashes per shingle.
+
+:func:`find_duplicates` clusters the articles of one batch.
+:class:`DedupIndex` persists signatures and band keys in SQLite, so a new
+edition is checked against the archive with one indexed lookup per band
+instead of re-reading it:
+
+    with DedupIndex("archive.sqlite3") as index:
+        for cluster in index.update("2020-02.docx", articles):
+            print([(m.source, m.position, m.similarity) for m in cluster.members])
+
+Bodies are read like :mod:`core.fulltext` reads them (``BODY`` or
+``corpo``, HTML tags removed); articles without words are never reported.
+"""
+
+import itertools
+import re
+import zlib
+from collections import namedtuple
+
+from .fulltext import article_columns
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+SEED = 1
+
+_WORD = re.compile(r"\w+")
+_EMPTY = 0xFFFFFFFF
+
+DuplicateMember = namedtuple("DuplicateMember", ["source", "position", "titulo", "similarity"])
+# members[0] is the representative (the earliest indexed article), similarity 1.0
+DuplicateCluster = namedtuple("DuplicateCluster", ["members"])
+
+
+def lsh_bands(num_perm=NUM_PERM, threshold=THRESHOLD):
+    """Number of bands for ``num_perm``: the S-curve threshold closest below ``threshold``.
+
+    With ``b`` bands of ``r`` rows two articles of similarity ``s`` share a
+    band with probability ``1 - (1 - s**r)**b``, which rises around
+    ``(1/b)**(1/r)``; staying below ``threshold`` favours recall, and the
+    candidates are verified on the full signature anyway.
+    """
+    best = 1
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        if (1 / bands) ** (1 / rows) <= threshold:
+            return bands
+        best = bands
+    return best
+
+
+class _Vocabulary(dict):
+    """word -> CRC-32, computed once per distinct word."""
+
+    def __missing__(self, word):
+        value = self[word] = zlib.crc32(word.encode("utf-8"))
+        return value
+
+
+def _mix(x):
+    """splitmix64 finalizer over a uint64 array (in place)."""
+    import numpy as np
+
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+class _Hasher:
+    """Word hashes and shingle hash functions shared by a batch of bodies."""
+
+    def __init__(self, num_perm, shingle_size, seed):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # odd multipliers combining the word hashes of a shingle
+        self.weights = rng.integers(0, 2**64, shingle_size, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self.seed = np.uint64(rng.integers(0, 2**63))
+        self.vocabulary = _Vocabulary()
+
+    def shingles(self, texts):
+        """``(rows, hashes)``: the article row and 64-bit hash of every shingle of ``texts``.
+
+        A text shorter than ``shingle_size`` words is one shingle; empty
+        texts have none.
+        """
+        import numpy as np
+
+        lookup = self.vocabulary.__getitem__
+        words = [list(map(lookup, _WORD.findall(text.casefold()))) for text in texts]
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        flat = np.fromiter(itertools.chain.from_iterable(words), dtype=np.uint64, count=int(lengths.sum()))
+        ends = np.cumsum(lengths)
+        k = self.shingle_size
+
+        # window i covers flat[i:i + k]; keep the windows inside one text
+        count = max(len(flat) - k + 1, 0)
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(min(k, len(flat))):
+            hashes += flat[offset:offset + count] * self.weights[offset]
+        owners = np.repeat(np.arange(len(texts)), lengths)[:count]
+        keep = np.arange(count) + k <= ends[owners] if count else np.zeros(0, dtype=bool)
+        rows, hashes = owners[keep], hashes[keep]
+
+        short = np.flatnonzero((lengths > 0) & (lengths < k))
+        if len(short):
+            extra = np.zeros(len(short), dtype=np.uint64)
+            for i, row in enumerate(short):
+                start = ends[row] - lengths[row]
+                extra[i] = (flat[start:ends[row]] * self.weights[:lengths[row]]).sum(dtype=np.uint64)
+            rows, hashes = np.concatenate([rows, short]), np.concatenate([hashes, extra])
+        return rows, _mix(hashes ^ self.seed)
+
+    def signatures(self, texts):
+        """``(len(texts), num_perm)`` uint32 signatures; all ``0xFFFFFFFF`` for empty texts.
+
+        One permutation hashing: each shingle hash picks one of ``num_perm``
+        bins and the bin keeps its smallest value, so every shingle is
+        hashed once rather than ``num_perm`` times. Bins left empty (short
+        texts) take the value of the next non-empty bin, offset by the
+        distance, so two signatures still agree on a bin with probability
+        equal to the Jaccard similarity.
+        """
+        import numpy as np
+
+        rows, hashes = self.shingles(texts)
+        num_perm = self.num_perm
+        bins = (hashes >> np.uint64(32)) % np.uint64(num_perm)
+        values = (hashes & np.uint64(_EMPTY - 1)).astype(np.uint32)
+        signatures = np.full(len(texts) * num_perm, _EMPTY, dtype=np.uint32)
+        np.minimum.at(signatures, rows * num_perm + bins.astype(np.int64), values)
+        signatures = signatures.reshape(len(texts), num_perm)
+        return _densify(signatures)
+
+
+def _densify(signatures):
+    """Fill the empty bins of non-empty signatures from the next non-empty bin (circularly)."""
+    import numpy as np
+
+    empty = signatures == _EMPTY
+    partial = np.flatnonzero(empty.any(axis=1) & ~empty.all(axis=1))
+    if not len(partial):
+        return signatures
+    block = signatures[partial]
+    num_perm = block.shape[1]
+    positions = np.arange(2 * num_perm)
+    # index of the next non-empty bin at or after each bin, over two turns
+    candidates = np.where(np.tile(~empty[partial], 2), positions, 2 * num_perm)
+    following = np.minimum.accumulate(candidates[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+    distance = (following - positions[:num_perm]).astype(np.uint32)
+    filled = block[np.arange(len(block))[:, None], following % num_perm]
+    # the offset keeps borrowed values apart from real ones; 0x9E3779B1 is odd
+    filled = filled + distance * np.uint32(0x9E3779B1)
+    signatures[partial] = np.where(empty[partial], np.minimum(filled, _EMPTY - 1), block)
+    return signatures
+
+
+def article_bodies(articles):
+    """The indexed body text (see :mod:`core.fulltext`) and the title of each article."""
+    bodies, titles = [], []
+    for article in articles:
+        columns = article_columns(article)
+        bodies.append(columns["corpo"])
+        titles.append(columns["titulo"])
+    return bodies, titles
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+    """MinHash signatures of ``texts`` as a ``(len(texts), num_perm)`` uint32 array."""
+    return _Hasher(num_perm, shingle_size, seed).signatures(texts)
+
+
+def band_keys(signatures, bands):
+    """``(n, bands)`` int64 LSH keys: each band of a signature hashed to one value."""
+    import numpy as np
+
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    mix = np.random.default_rng(rows).integers(0, 2**64, rows, dtype=np.uint64, endpoint=False) | np.uint64(1)
+    keys = (signatures.reshape(n, bands, rows).astype(np.uint64) * mix).sum(axis=2, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def similarities(signatures, left, right, other=None):
+    """Estimated Jaccard similarity of the signature pairs ``(left[i], right[i])``.
+
+    ``right`` indexes ``other`` when given (an archive), else ``signatures``.
+    """
+    other = signatures if other is None else other
+    return (signatures[left] == other[right]).mean(axis=1)
+
+
+def candidate_pairs(keys, valid, max_bucket=64):
+    """Pairs of rows ``(i, j)``, ``i < j``, sharing at least one band key.
+
+    Rows with ``valid`` False (empty bodies) are left out. Buckets larger
+    than ``max_bucket`` are linked to their first row only, which keeps the
+    clusters connected without a quadratic number of pairs.
+    """
+    import numpy as np
+
+    rows = np.flatnonzero(valid)
+    pairs = []
+    for band in range(keys.shape[1]):
+        band_keys = keys[rows, band]
+        order = np.argsort(band_keys, kind="stable")
+        ordered = band_keys[order]
+        boundaries = np.flatnonzero(np.diff(ordered)) + 1
+        for group in np.split(rows[order], boundaries):
+            if len(group) < 2:
+                continue
+            if len(group) > max_bucket:
+                pairs.append(np.stack([np.full(len(group) - 1, group[0]), group[1:]], axis=1))
+                continue
+            i, j = np.triu_indices(len(group), 1)
+            pairs.append(np.stack([group[i], group[j]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def _clusters(count, pairs):
+    """Connected components (of more than one node) of ``count`` nodes linked by ``pairs``."""
+    parent = list(range(count))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for i, j in pairs:
+        root_i, root_j = find(int(i)), find(int(j))
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    groups = {}
+    for node in range(count):
+        groups.setdefault(find(node), []).append(node)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def _report(signatures, pairs, scores, threshold, describe):
+    """Clusters of the pairs scoring at least ``threshold``; ``describe(row)`` gives (source, position, titulo)."""
+    import numpy as np
+
+    pairs = pairs[scores >= threshold]
+    clusters = []
+    for members in _clusters(len(signatures), pairs):
+        representative = members[0]
+        scores = similarities(signatures, np.full(len(members), representative), np.asarray(members))
+        clusters.append(DuplicateCluster([
+            DuplicateMember(*describe(member), round(float(score), 4)) for member, score in zip(members, scores)
+        ]))
+    return clusters
+
+
+def find_duplicates(articles, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, source=None):
+    """Clusters of near-duplicate articles within ``articles`` (no archive).
+
+    Members are sorted by position; ``similarity`` is the estimated Jaccard
+    similarity of the member's shingles with the first member's.
+    """
+    bodies, titles = article_bodies(articles)
+    signatures = minhash_signatures(bodies, num_perm, shingle_size)
+    keys = band_keys(signatures, lsh_bands(num_perm, threshold))
+    pairs = candidate_pairs(keys, signatures[:, 0] != _EMPTY)
+    scores = similarities(signatures, pairs[:, 0], pairs[:, 1])
+    return _report(signatures, pairs, scores, threshold, lambda row: (source, row, titles[row]))
+
+
+CLUSTER_FIELDNAMES = ["Grupo", "Edição", "Artigo", "Titulo", "Semelhança"]
+
+
+def cluster_rows(clusters, start=1):
+    """One dict per cluster member (:data:`CLUSTER_FIELDNAMES`), clusters numbered from ``start``."""
+    return [
+        {"Grupo": number, "Edição": member.source, "Artigo": member.position + 1, "Titulo": member.titulo,
+         "Semelhança": member.similarity}
+        for number, cluster in enumerate(clusters, start)
+        for member in cluster.members
+    ]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup_settings (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS dedup_sources (source TEXT PRIMARY KEY, digest TEXT);
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    titulo TEXT,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_source ON signatures(source, position);
+CREATE TABLE IF NOT EXISTS signature_bands (band INTEGER NOT NULL, key INTEGER NOT NULL, signature_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS signature_bands_key ON signature_bands(band, key);
+"""
+
+
+class DedupIndex:
+    """Persistent MinHash/LSH index of article signatures in the SQLite file ``path``.
+
+    The signature settings are stored with the index; ``num_perm``,
+    ``shingle_size`` and ``bands`` default to them (or to the module
+    defaults for a new index) and must match them when given.
+    """
+
+    def __init__(self, path=":memory:", threshold=THRESHOLD, num_perm=None, shingle_size=None, bands=None):
+        import sqlite3
+
+        import numpy as np
+
+        self.path = path
+        self.threshold = threshold
+        self._np = np
+        # Streamlit reruns a script in a different thread each time
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        stored = dict(self._db.execute("SELECT name, value FROM dedup_settings"))
+        requested = {"num_perm": num_perm, "shingle_size": shingle_size, "bands": bands}
+        defaults = {"num_perm": NUM_PERM, "shingle_size": SHINGLE_SIZE}
+        defaults["bands"] = lsh_bands(num_perm or stored.get("num_perm", NUM_PERM), threshold)
+        settings = {}
+        for name, value in requested.items():
+            if value is not None and name in stored and stored[name] != value:
+                raise ValueError(f"{path} was built with {name}={stored[name]}, not {value}")
+            settings[name] = stored.get(name, value if value is not None else defaults[name])
+        if settings["num_perm"] % settings["bands"]:
+            raise ValueError(f"bands={settings['bands']} does not divide num_perm={settings['num_perm']}")
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO dedup_settings VALUES (?, ?)", settings.items())
+        self.num_perm = settings["num_perm"]
+        self.shingle_size = settings["shingle_size"]
+        self.bands = settings["bands"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def signatures(self, articles):
+        """``(signatures, titles)`` of ``articles`` with the settings of this index."""
+        bodies, titles = article_bodies(articles)
+        return minhash_signatures(bodies, self.num_perm, self.shingle_size), titles
+
+    def _stored(self, source, digest):
+        """Signatures and titles stored for ``source`` if indexed with ``digest``, else None."""
+        if digest is None:
+            return None
+        row = self._db.execute("SELECT digest FROM dedup_sources WHERE source = ?", (source,)).fetchone()
+        if row is None or row[0] != digest:
+            return None
+        rows = self._db.execute(
+            "SELECT titulo, signature FROM signatures WHERE source = ? ORDER BY position", (source,)
+        ).fetchall()
+        np = self._np
+        signatures = np.frombuffer(b"".join(blob for _, blob in rows), dtype="<u4").reshape(len(rows), self.num_perm)
+        return signatures.astype(np.uint32), [titulo for titulo, _ in rows]
+
+    def check(self, articles, source=None, signatures=None):
+        """Clusters of ``articles`` with each other and with the archive.
+
+        Articles of ``source`` already in the archive are ignored, so an
+        edition is not reported as a copy of itself. Every cluster holds at
+        least one of ``articles``; archive members come first.
+        ``signatures`` is the ``(signatures, titles)`` pair of
+        :meth:`signatures`, if already computed.
+        """
+        np = self._np
+        signatures, titles = self.signatures(articles) if signatures is None else signatures
+        keys = band_keys(signatures, self.bands)
+        valid = signatures[:, 0] != _EMPTY
+
+        # archive candidates are numbered first, so they become the representatives
+        archive_pairs, archive_signatures, archive_info = self._archive_candidates(keys, valid, source)
+        offset = len(archive_info)
+        all_signatures = np.concatenate([archive_signatures, signatures])
+        pairs = np.concatenate([
+            np.stack([archive_pairs[:, 1], archive_pairs[:, 0] + offset], axis=1),
+            candidate_pairs(keys, valid) + offset,
+        ])
+        scores = similarities(all_signatures, pairs[:, 0], pairs[:, 1])
+
+        def describe(row):
+            if row < offset:
+                return archive_info[row]
+            return source, row - offset, titles[row - offset]
+
+        return _report(all_signatures, pairs, scores, self.threshold, describe)
+
+    def _archive_candidates(self, keys, valid, source):
+        """``(pairs, signatures, info)``: (batch row, archive position) pairs sharing a band key."""
+        np = self._np
+        empty = np.empty((0, 2), dtype=np.int64), np.empty((0, self.num_perm), dtype=np.uint32), []
+        rows = np.flatnonzero(valid)
+        if not len(rows) or not len(self):
+            return empty
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS batch_bands (band INTEGER, key INTEGER, row INTEGER)")
+        self._db.execute("DELETE FROM temp.batch_bands")
+        self._db.executemany(
+            "INSERT INTO temp.batch_bands VALUES (?, ?, ?)",
+            ((band, int(keys[row, band]), int(row)) for row in rows for band in range(self.bands)),
+        )
+        matches = self._db.execute(
+            """
+            SELECT DISTINCT t.row, s.id, s.source, s.position, s.titulo, s.signature
+            FROM temp.batch_bands AS t
+            JOIN signature_bands AS b ON b.band = t.band AND b.key = t.key
+            JOIN signatures AS s ON s.id = b.signature_id
+            WHERE s.source IS NOT ?
+            """,
+            (source,),
+        ).fetchall()
+        self._db.execute("DELETE FROM temp.batch_bands")
+        if not matches:
+            return empty
+        positions = {}
+        info, blobs, pairs = [], [], []
+        for row, signature_id, match_source, position, titulo, blob in matches:
+            if signature_id not in positions:
+                positions[signature_id] = len(info)
+                info.append((match_source, position, titulo))
+                blobs.append(blob)
+            pairs.append((row, positions[signature_id]))
+        signatures = np.frombuffer(b"".join(blobs), dtype="<u4").reshape(len(blobs), self.num_perm).astype(np.uint32)
+        return np.asarray(pairs, dtype=np.int64), signatures, info
+
+    def add(self, source, articles, digest=None, signatures=None):
+        """Store the signatures of ``source``, replacing earlier ones; returns how many."""
+        np = self._np
+        signatures, titles = self.signatures(articles) if signatures is None else signatures
+        keys = band_keys(signatures, self.bands)
+        with self._db:
+            self._remove(source)
+            self._db.execute("INSERT INTO dedup_sources VALUES (?, ?)", (source, digest))
+            next_id = self._db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM signatures").fetchone()[0]
+            ids = np.arange(next_id, next_id + len(signatures))
+            blobs = signatures.astype("<u4")
+            self._db.executemany(
+                "INSERT INTO signatures VALUES (?, ?, ?, ?, ?)",
+                ((int(ids[row]), source, row, titles[row], blobs[row].tobytes()) for row in range(len(signatures))),
+            )
+            valid = np.flatnonzero(signatures[:, 0] != _EMPTY)
+            self._db.executemany(
+                "INSERT INTO signature_bands VALUES (?, ?, ?)",
+                ((band, int(keys[row, band]), int(ids[row])) for row in valid for band in range(self.bands)),
+            )
+        return len(signatures)
+
+    def update(self, source, articles, digest=None):
+        """:meth:`check` ``articles`` against the archive, then :meth:`add` them as ``source``.
+
+        With a ``digest`` that matches the stored one the signatures are read
+        back instead of recomputed, and nothing is written.
+        """
+        stored = self._stored(source, digest)
+        if stored is not None:
+            return self.check(None, source, stored)
+        signatures = self.signatures(articles)
+        clusters = self.check(None, source, signatures)
+        self.add(source, None, digest, signatures)
+        return clusters
+
+    def _remove(self, source):
+        self._db.execute(
+            "DELETE FROM signature_bands WHERE signature_id IN (SELECT id FROM signatures WHERE source = ?)", (source,)
+        )
+        self._db.execute("DELETE FROM signatures WHERE source = ?", (source,))
+        self._db.execute("DELETE FROM dedup_sources WHERE source = ?", (source,))
+
+    def remove(self, source):
+        """Drop the signatures of ``source``."""
+        with self._db:
+            self._remove(source)
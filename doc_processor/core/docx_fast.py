@@ -0,0 +1,102 @@
+"""Streaming plain-text paragraph extractor for .docx files.
+
+Reads ``word/document.xml`` straight from the zip with ``lxml.etree.iterparse``
+instead of building the python-docx object model. Paragraph text follows the
+same rules as python-docx's ``Paragraph.text`` (runs and hyperlinks, with tabs,
+breaks and non-breaking hyphens translated), so the output is identical to
+``[p.text for p in Document(file).paragraphs]``. Finished paragraphs are
+cleared from the tree as the parser moves on, so memory stays flat.
+"""
+
+import posixpath
+import zipfile
+
+from .inputs import open_input
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+W_BODY = f"{{{W_NS}}}body"
+W_P = f"{{{W_NS}}}p"
+W_R = f"{{{W_NS}}}r"
+W_HYPERLINK = f"{{{W_NS}}}hyperlink"
+W_T = f"{{{W_NS}}}t"
+W_TAB = f"{{{W_NS}}}tab"
+W_PTAB = f"{{{W_NS}}}ptab"
+W_BR = f"{{{W_NS}}}br"
+W_CR = f"{{{W_NS}}}cr"
+W_NO_BREAK_HYPHEN = f"{{{W_NS}}}noBreakHyphen"
+W_TYPE = f"{{{W_NS}}}type"
+
+# text equivalents of the empty run-content elements
+_RUN_CHARS = {W_TAB: "\t", W_PTAB: "\t", W_CR: "\n", W_NO_BREAK_HYPHEN: "-"}
+
+
+def main_document_path(zf):
+    """Name of the main document part, following the package relationships."""
+    from lxml import etree
+
+    try:
+        rels = etree.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def _append_run_text(run, parts):
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            if child.text:
+                parts.append(child.text)
+        elif tag == W_BR:
+            # only text-wrapping breaks are newlines; page/column breaks are dropped
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            char = _RUN_CHARS.get(tag)
+            if char:
+                parts.append(char)
+
+
+def run_text(run):
+    """Text of a ``w:r`` element, equivalent to python-docx ``Run.text``."""
+    parts = []
+    _append_run_text(run, parts)
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    """Text of a ``w:p`` element, equivalent to python-docx ``Paragraph.text``."""
+    parts = []
+    for child in p:
+        tag = child.tag
+        if tag == W_R:
+            _append_run_text(child, parts)
+        elif tag == W_HYPERLINK:
+            for run in child:
+                if run.tag == W_R:
+                    _append_run_text(run, parts)
+    return "".join(parts)
+
+
+def iter_docx_paragraphs_fast(file):
+    """Yield the text of each body paragraph of a .docx file (path or file object)."""
+    from lxml import etree
+
+    with open_input(file) as source, zipfile.ZipFile(source) as zf:
+        with zf.open(main_document_path(zf)) as xml:
+            for _, p in etree.iterparse(xml, events=("end",), tag=W_P, huge_tree=True):
+                parent = p.getparent()
+                # paragraphs inside tables, text boxes, etc. are not body paragraphs
+                if parent is None or parent.tag != W_BODY:
+                    continue
+                yield paragraph_text(p)
+                # drop this paragraph and everything before it from the tree
+                p.clear(keep_tail=True)
+                while p.getprevious() is not None:
+                    del parent[0]
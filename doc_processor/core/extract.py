@@ -0,0 +1,62 @@
+"""Paragraph iterators for the supported source documents.
+
+Each iterator yields one paragraph string at a time, in document order, so
+callers can feed them straight into :class:`core.splitter.ArticleSplitter`
+without first joining the whole document into a single string.
+"""
+
+from .docx_fast import iter_docx_paragraphs_fast  # noqa: F401 -- re-exported
+from .inputs import open_input
+from .instrument import stage
+from .odt import iter_odt_paragraphs_stream
+from .registry import select_extractor, sniff_extension, supported_extensions
+
+
+def iter_docx_paragraphs(file, render=None):
+    """Yield the body paragraphs of a .docx file.
+
+    ``render`` turns a python-docx ``Paragraph`` into a string (for example
+    ``paragraph_to_html``); by default the plain paragraph text is used.
+    """
+    # python-docx is only imported when a document is actually parsed
+    from docx import Document
+    from docx.oxml.ns import qn
+    from docx.text.paragraph import Paragraph
+
+    # python-docx loads every part at open, so the input is only needed here
+    with stage("docx_open"), open_input(file) as source:
+        doc = Document(source)
+    # Same paragraphs as doc.paragraphs, but wrapped one at a time instead of
+    # building the full proxy list up front.
+    for p in doc.element.body.iterchildren(qn("w:p")):
+        paragraph = Paragraph(p, doc)
+        yield render(paragraph) if render else paragraph.text
+
+
+def iter_odt_paragraphs(file, html=False):
+    """Yield the non-empty <text:p>/<text:h> paragraphs of an .odt file.
+
+    With ``html`` set, paragraphs are rendered as inline HTML (see
+    :mod:`core.odt`).
+    """
+    return iter_odt_paragraphs_stream(file, html)
+
+
+def iter_paragraphs(file, file_extension, render=None, fast=False, html=False, images=None):
+    """Yield paragraphs from any registered format, chosen by extension.
+
+    ``render`` applies to .docx paragraphs; the other formats render inline
+    HTML themselves when ``html`` is set. Both produce inline HTML without the
+    <p> wrapper.
+
+    The backend comes from :func:`core.registry.select_extractor`: with
+    ``fast`` set the cheapest capable one is used, so plain-text .docx
+    extraction (no ``render``) goes through the streaming lxml reader in
+    :mod:`core.docx_fast`, which gives the same output without building the
+    python-docx object model. An extension that is not registered is
+    replaced by the format sniffed from the content, if any. ``images``
+    (``{zip member: src}``) goes to the extractors that render images.
+    """
+    if file_extension not in supported_extensions():
+        file_extension = sniff_extension(file) or file_extension
+    return select_extractor(file_extension, render=render, html=html, fast=fast)(file, render=render, html=html, images=images)
@@ -0,0 +1,316 @@
+"""Persistent full-text index over split articles (SQLite FTS5).
+
+:class:`FullTextIndex` keeps the articles of many editions in one SQLite
+file. ``titulo``, ``autor``, ``tag`` and ``corpo`` are indexed by an FTS5
+table with the ``unicode61 remove_diacritics 2`` tokenizer, so matching
+ignores case and Portuguese accents ("coracao" finds "coração"); FTS5
+stores the postings as delta-encoded varints in its own b-trees, and
+:meth:`FullTextIndex.optimize` merges them into one segment.
+
+Articles from documents (``Titulo``, ``Autor``, ``Tag``, ``BODY``, with or
+without the ``#`` field prefix) and from JSON exports (``titulo``,
+``autor``, ``tags``, ``corpo``) are both recognised; HTML bodies are
+indexed without their tags.
+
+The index is updated one source (file) at a time: :meth:`FullTextIndex.add`
+replaces the articles of a source, or does nothing when the source was
+already indexed with the same ``digest`` (for example the content hash and
+the configuration), so re-running over an archive only writes the editions
+that changed.
+
+    with FullTextIndex("archive.sqlite3") as index:
+        index.add("2020-01.docx", articles, digest)
+        hits = index.search("orçamento", autor="joão silva")
+
+Query words are prefixes ("orcam" finds "orçamento") and all must match;
+keyword filters restrict words to one column.
+"""
+
+import json
+import os
+import re
+import time
+from collections import namedtuple
+
+from .cache import content_hash
+from .search import tokenize
+
+ENV_VAR = "DOC_PROCESSOR_INDEX"
+DEFAULT_PATH = "doc_processor_index.sqlite3"
+
+INDEX_COLUMNS = ("titulo", "autor", "tag", "corpo")
+# bm25 weight of each column: a word in the title counts more than in the body
+COLUMN_WEIGHTS = (10.0, 5.0, 5.0, 1.0)
+INSERT_BATCH = 1000
+
+# article keys (lowercase, without the field prefix) -> index column
+_COLUMN_ALIASES = {
+    "titulo": "titulo",
+    "autor": "autor",
+    "tag": "tag",
+    "tags": "tag",
+    "body": "corpo",
+    "corpo": "corpo",
+    "data": "data",
+    "edition_date": "data",
+}
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+SearchHit = namedtuple("SearchHit", ["source", "position", "titulo", "autor", "data", "snippet", "rank"])
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    digest TEXT,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    position INTEGER NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_document ON entries(document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5(
+    {", ".join(INDEX_COLUMNS)}, tokenize="unicode61 remove_diacritics 2"
+);
+"""
+
+
+def index_path(path=None):
+    """``path``, else the ``DOC_PROCESSOR_INDEX`` environment variable, else :data:`DEFAULT_PATH`."""
+    return path or os.environ.get(ENV_VAR) or DEFAULT_PATH
+
+
+def source_digest(source, settings=None):
+    """Digest for :meth:`FullTextIndex.add`: the source and how it was split.
+
+    A path is identified by its size and modification time (hashing every
+    file of an archive would cost as much as parsing it), bytes by their
+    content hash. ``settings`` is a :class:`ProcessorConfig` or any JSON
+    serializable value.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        identity = f"{stat.st_size}:{stat.st_mtime_ns}"
+    else:
+        identity = content_hash(source)
+    return identity_digest(identity, settings)
+
+
+def identity_digest(identity, settings=None):
+    """Like :func:`source_digest`, for a source already identified (``identity``, e.g. its content hash)."""
+    if hasattr(settings, "to_dict"):
+        settings = settings.to_dict()
+    return content_hash(f"{identity}:{json.dumps(settings, sort_keys=True, default=str)}".encode())
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = " ".join(map(str, value))
+    value = str(value)
+    return _HTML_TAG.sub(" ", value) if "<" in value else value
+
+
+def article_columns(article):
+    """The index columns (plus ``data``) of an article dict."""
+    columns = dict.fromkeys((*INDEX_COLUMNS, "data"), "")
+    for key, value in article.items():
+        column = _COLUMN_ALIASES.get(str(key).lstrip("#").casefold())
+        if column is not None and not columns[column]:
+            columns[column] = _text(value)
+    return columns
+
+
+def match_expression(query="", fields=None, **filters):
+    """FTS5 MATCH expression for ``query`` (in ``fields``) and column ``filters``, or None.
+
+    Every word becomes a quoted prefix term, so user input never reaches the
+    FTS5 query syntax.
+    """
+    parts = []
+    expression = _prefix_terms(query)
+    if expression:
+        if fields:
+            _check_columns(fields)
+            expression = f"{{{' '.join(fields)}}} : ({expression})"
+        parts.append(expression)
+    for column, value in filters.items():
+        if not value:
+            continue
+        _check_columns([column])
+        terms = _prefix_terms(value)
+        if terms:
+            parts.append(f"{column} : ({terms})")
+    return " AND ".join(parts) or None
+
+
+def _prefix_terms(text):
+    return " AND ".join(f'"{word}"*' for word in tokenize(text or ""))
+
+
+def _check_columns(columns):
+    unknown = set(columns) - set(INDEX_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown index columns: {sorted(unknown)}")
+
+
+class FullTextIndex:
+    """Full-text index stored in the SQLite file ``path`` (see the module docstring)."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        import sqlite3
+
+        # Streamlit reruns a script in a different thread each time
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def sources(self):
+        """``{source: (digest, articles)}`` of the indexed sources."""
+        rows = self._db.execute("SELECT source, digest, article_count FROM documents ORDER BY source")
+        return {source: (digest, articles) for source, digest, articles in rows}
+
+    def is_current(self, source, digest):
+        """True if ``source`` is indexed with ``digest``."""
+        row = self._db.execute("SELECT digest FROM documents WHERE source = ?", (source,)).fetchone()
+        return row is not None and digest is not None and row[0] == digest
+
+    def add(self, source, articles, digest=None):
+        """Index the articles of ``source``, replacing what was indexed for it.
+
+        Returns the number of articles written, or None when ``source`` was
+        already indexed with the same ``digest``. ``articles`` is consumed
+        as a stream, in one transaction.
+        """
+        if self.is_current(source, digest):
+            return None
+        count = 0
+        for _ in self.iter_indexed(source, articles, digest):
+            count += 1
+        return count
+
+    def iter_indexed(self, source, articles, digest=None):
+        """Yield ``articles`` unchanged while indexing them as :meth:`add` does.
+
+        An indexing stage for an article stream that is also written
+        elsewhere; the source is committed once the stream is exhausted, and
+        nothing is written if it is abandoned or fails half-way.
+        """
+        if self.is_current(source, digest):
+            yield from articles
+            return
+        with self._db:
+            document_id = self._replace_document(source, digest)
+            next_id = self._db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM entries").fetchone()[0]
+            count = 0
+            for batch in _batches(articles, INSERT_BATCH):
+                entries = []
+                texts = []
+                for article in batch:
+                    columns = article_columns(article)
+                    entries.append((next_id, document_id, count, columns["data"]))
+                    texts.append((next_id, *(columns[column] for column in INDEX_COLUMNS)))
+                    next_id += 1
+                    count += 1
+                self._db.executemany("INSERT INTO entries (id, document_id, position, data) VALUES (?, ?, ?, ?)", entries)
+                self._db.executemany(
+                    f"INSERT INTO articles (rowid, {', '.join(INDEX_COLUMNS)}) VALUES (?, ?, ?, ?, ?)", texts
+                )
+                yield from batch
+            self._db.execute("UPDATE documents SET article_count = ? WHERE id = ?", (count, document_id))
+
+    def _replace_document(self, source, digest):
+        row = self._db.execute("SELECT id FROM documents WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return self._db.execute(
+                "INSERT INTO documents (source, digest, indexed_at) VALUES (?, ?, ?)", (source, digest, time.time())
+            ).lastrowid
+        document_id = row[0]
+        self._delete_entries(document_id)
+        self._db.execute(
+            "UPDATE documents SET digest = ?, article_count = 0, indexed_at = ? WHERE id = ?",
+            (digest, time.time(), document_id),
+        )
+        return document_id
+
+    def _delete_entries(self, document_id):
+        self._db.execute(
+            "DELETE FROM articles WHERE rowid IN (SELECT id FROM entries WHERE document_id = ?)", (document_id,)
+        )
+        self._db.execute("DELETE FROM entries WHERE document_id = ?", (document_id,))
+
+    def remove(self, source):
+        """Drop ``source`` from the index; returns False if it was not indexed."""
+        row = self._db.execute("SELECT id FROM documents WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return False
+        with self._db:
+            self._delete_entries(row[0])
+            self._db.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+        return True
+
+    def optimize(self):
+        """Merge the FTS5 segments into one (smaller index, faster queries)."""
+        with self._db:
+            self._db.execute("INSERT INTO articles (articles) VALUES ('optimize')")
+
+    def search(self, query="", fields=None, limit=50, offset=0, **filters):
+        """Best matching articles first, as :class:`SearchHit` tuples.
+
+        ``fields`` restricts the query words to some of :data:`INDEX_COLUMNS`;
+        keyword ``filters`` (``autor="joão silva"``, ``tag=...``) require their
+        words in that column. Without any word nothing matches.
+        """
+        expression = match_expression(query, fields, **filters)
+        if expression is None:
+            return []
+        weights = ", ".join(map(str, COLUMN_WEIGHTS))
+        rows = self._db.execute(
+            f"""
+            SELECT d.source, e.position, articles.titulo, articles.autor, e.data,
+                   snippet(articles, 3, '[', ']', '…', 12), bm25(articles, {weights}) AS rank
+            FROM articles
+            JOIN entries AS e ON e.id = articles.rowid
+            JOIN documents AS d ON d.id = e.document_id
+            WHERE articles MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            (expression, limit, offset),
+        )
+        return [SearchHit(*row) for row in rows]
+
+    def count(self, query="", fields=None, **filters):
+        """Number of articles matching, as :meth:`search` would find them."""
+        expression = match_expression(query, fields, **filters)
+        if expression is None:
+            return 0
+        return self._db.execute("SELECT COUNT(*) FROM articles WHERE articles MATCH ?", (expression,)).fetchone()[0]
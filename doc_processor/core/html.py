@@ -0,0 +1,144 @@
+"""Single pass HTML renderer for .docx paragraphs.
+
+Renders the runs and hyperlinks of a ``w:p`` element as inline HTML: bold,
+italic and underline become ``<b>``, ``<i>`` and ``<u>`` (nested in that
+order) and hyperlinks become ``<a href>``. Each run subtree is walked once for
+its text and formatting, tag names are resolved at import time and fragments
+are collected in a list.
+
+With ``merge_runs`` adjacent runs that share the same formatting are emitted
+inside a single set of tags (``<b>ab</b>`` instead of ``<b>a</b><b>b</b>``);
+otherwise the output matches the previous ``paragraph_to_html`` exactly.
+
+With ``image_src`` the drawings of a run (``a:blip``, ``v:imagedata``)
+become ``<img src>`` tags after its text (see :mod:`core.images`).
+"""
+
+from .docx_fast import W_HYPERLINK, W_NS, W_R, W_T, run_text
+
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+R_ID = f"{{{R_NS}}}id"
+R_EMBED = f"{{{R_NS}}}embed"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+A_BLIP = f"{{{A_NS}}}blip"
+V_NS = "urn:schemas-microsoft-com:vml"
+V_IMAGEDATA = f"{{{V_NS}}}imagedata"
+
+W_B = f"{{{W_NS}}}b"
+W_I = f"{{{W_NS}}}i"
+W_U = f"{{{W_NS}}}u"
+
+# (bold, italic, underline) -> (opening tags, closing tags)
+_FORMAT_TAGS = {}
+for _b in (False, True):
+    for _i in (False, True):
+        for _u in (False, True):
+            _FORMAT_TAGS[(_b, _i, _u)] = (
+                "<u>" * _u + "<i>" * _i + "<b>" * _b,
+                "</b>" * _b + "</i>" * _i + "</u>" * _u,
+            )
+
+
+def _run_text_and_format(run):
+    """Collect the ``w:t`` text and b/i/u flags of a run in one walk of its subtree."""
+    texts = []
+    bold = italic = underline = False
+    for el in run.iter(W_T, W_B, W_I, W_U):
+        tag = el.tag
+        if tag == W_T:
+            if el.text:
+                texts.append(el.text)
+        elif tag == W_B:
+            bold = True
+        elif tag == W_I:
+            italic = True
+        else:
+            underline = True
+    return "".join(texts), (bold, italic, underline)
+
+
+def image_ids(el):
+    """Relationship ids of the images referenced inside a .docx element, in order."""
+    for image in el.iter(A_BLIP, V_IMAGEDATA):
+        rid = image.get(R_EMBED) if image.tag == A_BLIP else image.get(R_ID)
+        if rid:
+            yield rid
+
+
+def _images_html(run, image_src):
+    tags = []
+    for rid in image_ids(run):
+        try:
+            tags.append(f'<img src="{image_src(rid)}">')
+        except (KeyError, AttributeError, ValueError):
+            continue
+    return "".join(tags)
+
+
+def runs_to_html(p, hyperlink_target=None, merge_runs=False, image_src=None):
+    """Render the runs and hyperlinks of the ``w:p`` element ``p`` as inline HTML.
+
+    ``hyperlink_target(rId)`` returns the URL of a hyperlink relationship and
+    may raise ``KeyError``/``AttributeError``, in which case the link is left
+    out (as are all links when it is ``None``). ``image_src(rId)`` likewise
+    returns the ``src`` of an image relationship.
+    """
+    fragments = []
+    pending_texts = []
+    pending_format = None
+
+    for child in p:
+        tag = child.tag
+        if tag == W_R:
+            text, run_format = _run_text_and_format(child)
+            images = _images_html(child, image_src) if image_src is not None else ""
+            if text:
+                if merge_runs and run_format == pending_format:
+                    pending_texts.append(text)
+                else:
+                    if pending_texts:
+                        opening, closing = _FORMAT_TAGS[pending_format]
+                        fragments.extend((opening, *pending_texts, closing))
+                    pending_texts = [text]
+                    pending_format = run_format
+            if images:
+                if pending_texts:
+                    opening, closing = _FORMAT_TAGS[pending_format]
+                    fragments.extend((opening, *pending_texts, closing))
+                    pending_texts = []
+                    pending_format = None
+                fragments.append(images)
+        elif tag == W_HYPERLINK:
+            if pending_texts:
+                opening, closing = _FORMAT_TAGS[pending_format]
+                fragments.extend((opening, *pending_texts, closing))
+                pending_texts = []
+                pending_format = None
+            rId = child.get(R_ID)
+            if rId and hyperlink_target is not None:
+                try:
+                    url = hyperlink_target(rId)
+                except (KeyError, AttributeError):
+                    continue
+                link_text = "".join(run_text(run) for run in child.iter(W_R))
+                if link_text:
+                    fragments.append(f'<a href="{url}">{link_text}</a>')
+
+    if pending_texts:
+        opening, closing = _FORMAT_TAGS[pending_format]
+        fragments.extend((opening, *pending_texts, closing))
+    return "".join(fragments)
+
+
+def docx_paragraph_runs_html(paragraph, merge_runs=False, images=None):
+    """:func:`runs_to_html` for a python-docx ``Paragraph``.
+
+    ``images`` maps zip members (``word/media/image1.png``) to their ``src``.
+    """
+    image_src = None
+    if images:
+
+        def image_src(rId):
+            return images[paragraph.part.rels[rId].target_part.partname.lstrip("/")]
+
+    return runs_to_html(paragraph._element, lambda rId: paragraph.part.rels[rId].target_ref, merge_runs, image_src)
@@ -0,0 +1,227 @@
+"""Content-addressed extraction of the images embedded in .docx/.odt editions.
+
+The images are read straight from the zip: ``word/media/*`` through the
+relationships of ``a:blip``/``v:imagedata`` references in
+``word/document.xml``, and ``Pictures/*`` through the ``draw:image``
+references in the ODT ``content.xml``. python-docx is not involved.
+
+:func:`extract_images` streams the document XML once with
+``lxml.etree.iterparse`` and records after which paragraph of the extracted
+paragraph stream each image is referenced. Each image referenced for the
+first time is handed to a thread pool as soon as it is seen, while the XML
+parse goes on. The pool hashes the blob in chunks and copies it only if it
+is not stored yet, so no image is held in memory whole. :class:`ImageStore`
+keeps the blobs under their SHA-256 (``ab/abcdef....png``), so a logo
+repeated in every edition is stored once.
+
+With ``ProcessorConfig(image_dir=...)``, :func:`core.pipeline.process_document`
+runs this stage first. :func:`split_with_images` then splits the extracted
+paragraphs and gives each article the stored paths of its images in the
+:data:`IMAGE_FIELD` column, so the images follow the articles of the real
+split whatever the output format. In HTML output the drawings become
+``<img src>`` tags pointing at the stored files.
+"""
+
+import hashlib
+import os
+import posixpath
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import IMAGE_FIELD
+from .docx_fast import REL_NS, W_BODY, W_P, main_document_path
+from .html import image_ids
+from .inputs import open_input
+from .odt import DRAW_IMAGE, PARAGRAPH_TAGS, XLINK_HREF, _drop_finished, _Renderer
+from .splitter import ArticleSplitter
+
+IMAGE_WORKERS = 4
+CHUNK_SIZE = 1 << 20
+
+IMAGE_EXTENSIONS = (".docx", ".odt")
+
+
+def docx_image_targets(zf, main_path):
+    """``{relationship id: zip member}`` of the images of the main document part."""
+    from lxml import etree
+
+    folder, name = posixpath.split(main_path)
+    try:
+        rels = etree.fromstring(zf.read(posixpath.join(folder, "_rels", f"{name}.rels")))
+    except KeyError:
+        return {}
+    targets = {}
+    for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External" or not rel.get("Type", "").endswith("/image"):
+            continue
+        target = rel.get("Target", "")
+        member = target.lstrip("/") if target.startswith("/") else posixpath.join(folder, target)
+        targets[rel.get("Id")] = posixpath.normpath(member)
+    return targets
+
+
+def iter_docx_paragraph_images(zf):
+    """Yield ``(True, members)`` for each body paragraph of a .docx zip.
+
+    ``members`` are the images of the paragraph, and of the tables and other
+    body content before it. Every body paragraph is extracted, even empty.
+    """
+    from lxml import etree
+
+    main_path = main_document_path(zf)
+    targets = docx_image_targets(zf, main_path)
+    with zf.open(main_path) as xml:
+        for _, p in etree.iterparse(xml, events=("end",), tag=W_P, huge_tree=True):
+            parent = p.getparent()
+            if parent is None or parent.tag != W_BODY:
+                continue
+            ids = []
+            while p.getprevious() is not None:
+                # tables and other body content between paragraphs
+                ids.extend(image_ids(parent[0]))
+                del parent[0]
+            ids.extend(image_ids(p))
+            yield True, [targets[rid] for rid in ids if rid in targets]
+            p.clear(keep_tail=True)
+
+
+def iter_odt_paragraph_images(zf, html=False):
+    """Yield ``(kept, members)`` for each paragraph of an .odt zip.
+
+    Paragraphs come in the order of :func:`core.odt.iter_odt_paragraphs_stream`;
+    ``kept`` tells whether it yields the paragraph (it skips those that
+    render empty in the ``html`` or text output). Images outside any
+    paragraph come with the next one.
+    """
+    from lxml import etree
+
+    members = set(zf.namelist())
+    # any src will do: only whether the paragraph renders empty matters
+    renderer = _Renderer(html, {}, {member: member for member in members})
+    tags = PARAGRAPH_TAGS + (DRAW_IMAGE,)
+    with zf.open("content.xml") as xml:
+        open_images = []
+        nested = []
+        loose = []
+        for event, el in etree.iterparse(xml, events=("start", "end"), tag=tags, huge_tree=True):
+            if el.tag == DRAW_IMAGE:
+                if event == "end":
+                    member = posixpath.normpath(el.get(XLINK_HREF, ""))
+                    if member in members:
+                        (open_images[-1] if open_images else loose).append(member)
+                continue
+            if event == "start":
+                open_images.append([])
+                continue
+
+            kept = bool(renderer.paragraph(el))
+            images = open_images.pop()
+            if open_images:
+                nested.append((kept, images))
+                continue
+            yield kept, loose + images
+            yield from nested
+            nested = []
+            loose = []
+            _drop_finished(el)
+
+
+class ImageStore:
+    """Image blobs stored under ``root`` by content hash (see the module docstring)."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, relpath):
+        return os.path.join(self.root, *relpath.split("/"))
+
+    def url(self, relpath):
+        """``relpath`` under the root as given, with forward slashes (for ``<img src>``)."""
+        return posixpath.join(os.fspath(self.root).replace(os.sep, "/"), relpath)
+
+    def put(self, zf, member):
+        """Store the zip ``member`` unless its content already is; returns its relative path."""
+        digest = hashlib.sha256()
+        with zf.open(member) as blob:
+            for chunk in iter(lambda: blob.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        relpath = f"{digest[:2]}/{digest}{posixpath.splitext(member)[1].lower()}"
+        target = self.path(relpath)
+        if os.path.exists(target):
+            return relpath
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out, zf.open(member) as blob:
+                for chunk in iter(lambda: blob.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+            # another worker may have stored the same content meanwhile: same bytes
+            os.replace(temp, target)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        return relpath
+
+
+def paragraph_images(zf, file_extension, html=False):
+    """The ``(kept, members)`` iterator for ``file_extension``, or None if it has no images."""
+    if file_extension == ".docx":
+        return iter_docx_paragraph_images(zf)
+    if file_extension == ".odt":
+        return iter_odt_paragraph_images(zf, html)
+    return None
+
+
+def extract_images(file, file_extension, config, store, workers=IMAGE_WORKERS):
+    """Store the images of a document and locate them in its paragraph stream.
+
+    Returns ``(sources, placements)``: ``{zip member: url}`` for the
+    renderers, and ``{count: members}``, the images referenced once ``count``
+    extracted paragraphs have been read (for :func:`split_with_images`).
+    Formats without images give ``({}, {})``.
+    """
+    if file_extension not in IMAGE_EXTENSIONS:
+        return {}, {}
+    placements = {}
+    count = 0
+    futures = {}
+    with open_input(file) as source, zipfile.ZipFile(source) as zf:
+        # ZipFile serializes the reads of its members, so workers share it
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for kept, members in paragraph_images(zf, file_extension, config.html):
+                count += kept
+                for member in members:
+                    if member not in futures:
+                        futures[member] = pool.submit(store.put, zf, member)
+                    placements.setdefault(count, []).append(member)
+            sources = {member: store.url(future.result()) for member, future in futures.items()}
+    return sources, placements
+
+
+def split_with_images(paragraphs, config, sources, placements):
+    """Split the extracted ``paragraphs`` and add :data:`IMAGE_FIELD` to each article.
+
+    An image goes to the article that is open once the paragraph referencing
+    it has been read, as ``url, url`` (each once); ``sources`` and
+    ``placements`` come from :func:`extract_images`.
+    """
+    splitter = ArticleSplitter(config.article_start, config.metadata_fields, **config.split_options)
+    placements = dict(placements)
+    pending = list(placements.pop(0, ()))
+
+    def with_images(article):
+        article[IMAGE_FIELD] = ", ".join(dict.fromkeys(sources[member] for member in pending))
+        pending.clear()
+        return article
+
+    for count, paragraph in enumerate(paragraphs, 1):
+        for article in splitter.feed(paragraph):
+            yield with_images(article)
+        pending.extend(placements.pop(count, ()))
+    for members in placements.values():
+        pending.extend(members)
+    for article in splitter.close():
+        yield with_images(article)
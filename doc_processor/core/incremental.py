@@ -0,0 +1,274 @@
+"""Re-split an extracted document quickly when only the split options change.
+
+In the "Personalizado" mode of the toggle app the delimiter and the metadata
+fields are edited keystroke by keystroke, while the document (and its
+extracted paragraphs) stays the same. :class:`ParagraphIndex` holds the
+paragraphs as an immutable structure with:
+
+- the paragraphs joined into one string with their offsets, so the
+  paragraphs containing a delimiter are found with ``str.find`` instead of
+  splitting every line;
+- the lines of every paragraph (and, in HTML mode, of its ``<p>`` wrapped
+  form) under global line numbers, indexed by their text before the first
+  ``:``, so the metadata lines of any paragraph range are found with dict
+  lookups and bisection instead of a regex per line.
+
+:class:`IncrementalSplitter` splits with a given :class:`ProcessorConfig`
+and keeps the articles of the previous split keyed by what determines them:
+their paragraph range, the edge chunks around the delimiters, which lines are
+metadata for which field and (HTML) which paragraphs are left unwrapped. An
+article whose key did not change is reused and only its missing fields are
+filled again, so a new delimiter or field list costs index lookups plus the
+articles that really changed. The result is always the same as
+:func:`core.pipeline.split_articles`; configurations the index cannot handle
+exactly (a delimiter spanning lines or overlapping the ``<p>`` wrapper, a
+``:`` in a field name or prefix) fall back to a full split.
+"""
+
+from array import array
+from bisect import bisect_left
+
+from .classifier import get_classifier
+from .pipeline import split_articles
+from .splitter import ArticleSplitter, fill_missing_fields
+
+RAW = 0
+WRAPPED = 1
+
+
+def _head(line):
+    """Text before the first ':' of ``line``, or None without one."""
+    end = line.find(":")
+    return None if end < 0 else line[:end]
+
+
+def _overlaps_wrapper(delimiter):
+    """Whether ``delimiter`` could match across the added ``<p>``/``</p>``."""
+    for start in range(3):
+        tail = "<p>"[start:]
+        if delimiter.startswith(tail) or tail.startswith(delimiter):
+            return True
+    for end in range(1, 5):
+        head = "</p>"[:end]
+        if delimiter.endswith(head) or head.endswith(delimiter):
+            return True
+    return "<p></p>".find(delimiter) >= 0
+
+
+class ParagraphIndex:
+    """Immutable, indexed paragraph list of one extracted document.
+
+    ``paragraphs`` are as produced by ``extract_paragraphs(..., wrap=False)``;
+    ``html`` tells whether they are unwrapped HTML.
+    """
+
+    def __init__(self, paragraphs, html=False):
+        self.paragraphs = tuple(paragraphs)
+        self.html = html
+        self.text = "\n".join(self.paragraphs)
+        offsets = array("q")
+        position = 0
+        for paragraph in self.paragraphs:
+            offsets.append(position)
+            position += len(paragraph) + 1
+        self.offsets = offsets
+
+        variants = [RAW, WRAPPED] if html else [RAW]
+        self.lines = {}
+        self.line_starts = {}
+        self.line_paragraph = {}
+        self.line_heads = {}
+        for variant in variants:
+            lines = []
+            starts = array("q")
+            owners = array("q")
+            heads = {}
+            for number, paragraph in enumerate(self.paragraphs):
+                starts.append(len(lines))
+                text = f"<p>{paragraph}</p>" if variant == WRAPPED else paragraph
+                for line in text.splitlines():
+                    head = _head(line.strip())
+                    if head is not None:
+                        heads.setdefault(head, []).append(len(lines))
+                    lines.append(line)
+                    owners.append(number)
+            starts.append(len(lines))
+            self.lines[variant] = tuple(lines)
+            self.line_starts[variant] = starts
+            self.line_paragraph[variant] = owners
+            self.line_heads[variant] = heads
+
+        # paragraphs starting with "<field>:" are not wrapped in <p> (see
+        # core.pipeline.wrap_paragraph_html)
+        self.paragraph_heads = {}
+        if html:
+            for number, paragraph in enumerate(self.paragraphs):
+                head = _head(paragraph)
+                if head is not None:
+                    self.paragraph_heads.setdefault(head, []).append(number)
+
+    def __len__(self):
+        return len(self.paragraphs)
+
+    def containing(self, needle):
+        """Sorted numbers of the paragraphs containing ``needle``."""
+        found = []
+        text = self.text
+        position = text.find(needle)
+        while position >= 0:
+            number = bisect_left(self.offsets, position + 1) - 1
+            found.append(number)
+            # continue after this paragraph
+            position = text.find(needle, self.offsets[number] + len(self.paragraphs[number]) + 1)
+        return found
+
+    def supports(self, config):
+        """Whether :meth:`IncrementalSplitter.split` can use the index for ``config``."""
+        delimiter = config.article_start
+        if config.html != self.html or not delimiter.strip() or delimiter.splitlines() != [delimiter]:
+            return False
+        if ":" in config.field_prefix or any(":" in field for field in config.metadata_fields):
+            return False
+        return not (self.html and _overlaps_wrapper(delimiter))
+
+    def paragraph_lines(self, number, variant):
+        starts = self.line_starts[variant]
+        return self.lines[variant][starts[number]:starts[number + 1]]
+
+
+class IncrementalSplitter:
+    """Split a :class:`ParagraphIndex`, reusing the articles of the previous split."""
+
+    def __init__(self, index):
+        self.index = index
+        self._cache = {}
+        self.reused = 0
+        self.built = 0
+
+    def split(self, config):
+        """Return the article list for ``config`` (same as a full split)."""
+        index = self.index
+        if not index.supports(config):
+            self._cache = {}
+            self.reused, self.built = 0, 0
+            return list(split_articles(index.paragraphs, config, wrapped=False))
+        return _Split(self, config).run()
+
+
+class _Split:
+    """One :meth:`IncrementalSplitter.split` run."""
+
+    def __init__(self, owner, config):
+        self.owner = owner
+        self.index = owner.index
+        self.config = config
+        self.delimiter = config.article_start
+        self.classifier = get_classifier(config.metadata_fields, config.article_start, config.field_prefix)
+        self.splitter = ArticleSplitter(config.article_start, config.metadata_fields, **config.split_options)
+
+        # "<prefix><field>" heads in field order; the first field wins, as in the regex
+        self.field_heads = []
+        seen = set()
+        for field in config.metadata_fields:
+            head = config.field_prefix + field
+            if head not in seen:
+                seen.add(head)
+                self.field_heads.append((head, field.strip()))
+
+        self.unwrapped = []
+        if self.index.html:
+            for head, _ in self.field_heads:
+                self.unwrapped.extend(self.index.paragraph_heads.get(head, ()))
+            self.unwrapped.sort()
+        self.unwrapped_set = set(self.unwrapped)
+
+        # metadata lines of the whole document, per line variant, in line order
+        self.metadata_lines = {}
+        for variant in self.index.lines:
+            owners = self.index.line_paragraph[variant]
+            found = []
+            for head, key in self.field_heads:
+                for line in self.index.line_heads[variant].get(head, ()):
+                    if self.variant(owners[line]) == variant:
+                        found.append((line, key))
+            found.sort()
+            self.metadata_lines[variant] = ([line for line, _ in found], found)
+
+        self.cache = {}
+        self.articles = []
+        self.reused = 0
+        self.built = 0
+
+    def variant(self, number):
+        if not self.index.html or number in self.unwrapped_set:
+            return RAW
+        return WRAPPED
+
+    def cut_lines(self, number):
+        """Lines of a paragraph containing the delimiter, wrapped as the pipeline would."""
+        paragraph = self.index.paragraphs[number]
+        if self.index.html and not self.classifier.is_structural(paragraph):
+            paragraph = f"<p>{paragraph}</p>"
+        return paragraph.splitlines()
+
+    def range_key(self, start, stop):
+        index = self.index
+        key = [start, stop]
+        for variant, (lines, found) in self.metadata_lines.items():
+            starts = index.line_starts[variant]
+            key.append(tuple(found[bisect_left(lines, starts[start]):bisect_left(lines, starts[stop])]))
+        if index.html:
+            key.append(tuple(self.unwrapped[bisect_left(self.unwrapped, start):bisect_left(self.unwrapped, stop)]))
+        return tuple(key)
+
+    def finish(self, before, span, after):
+        match = self.classifier.match_field
+        key = (
+            self.config.strip_body,
+            tuple((chunk, match(chunk.strip())) for chunk in before),
+            self.range_key(*span) if span else None,
+            tuple((chunk, match(chunk.strip())) for chunk in after),
+        )
+        previous = self.owner._cache
+        if key in previous:
+            article = previous[key]
+            self.reused += 1
+        else:
+            splitter = self.splitter
+            for chunk in before:
+                splitter._add_line(chunk)
+            if span:
+                for number in range(*span):
+                    for line in self.index.paragraph_lines(number, self.variant(number)):
+                        splitter._add_line(line)
+            for chunk in after:
+                splitter._add_line(chunk)
+            article = splitter._collect()
+            self.built += 1
+        self.cache[key] = article
+        if article is not None:
+            self.articles.append(fill_missing_fields(dict(article), self.config.metadata_fields))
+
+    def run(self):
+        index = self.index
+        delimiter = self.delimiter
+        before, span, after = [], None, []
+        previous = 0
+        for number in index.containing(delimiter) + [len(index)]:
+            if previous < number:
+                span = (previous, number)
+            if number == len(index):
+                break
+            for line in self.cut_lines(number):
+                chunks = line.split(delimiter)
+                (after if span else before).append(chunks[0])
+                for chunk in chunks[1:]:
+                    self.finish(before, span, after)
+                    before, span, after = [chunk], None, []
+            previous = number + 1
+        self.finish(before, span, after)
+
+        owner = self.owner
+        owner._cache = self.cache
+        owner.reused, owner.built = self.reused, self.built
+        return self.articles
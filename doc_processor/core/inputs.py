@@ -0,0 +1,103 @@
+"""Zero-copy access to input documents.
+
+The parsers (zipfile for .docx/.odt, the JSON readers) only need a seekable
+binary file object. :func:`open_input` provides one without copying the
+whole input first:
+
+- a path is memory-mapped, so zip members are read straight from the page
+  cache instead of through an extra user-space buffer, and the pages can be
+  dropped by the OS under memory pressure;
+- bytes, bytearray, memoryview and mmap objects are read through a
+  :class:`MemoryReader` over a memoryview (``io.BytesIO(memoryview)`` would
+  copy the whole payload);
+- file objects, such as Streamlit uploads (BytesIO subclasses), are used as
+  they are.
+
+The JSON readers consume a file front to back, so for a JSON file on disk a
+plain buffered ``open()`` is as cheap and keeps fewer pages resident than a
+map; they use :func:`open_input` for in-memory payloads only.
+"""
+
+import errno
+import io
+import mmap
+import os
+from contextlib import contextmanager
+
+
+class MemoryReader(io.RawIOBase):
+    """Seekable read-only file object over any buffer, without copying it."""
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+        self.size = self._view.nbytes
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            # same error as a real file; zipfile relies on it for short inputs
+            raise OSError(errno.EINVAL, "Invalid argument")
+        self._position = offset
+        return offset
+
+    def read(self, size=-1):
+        start = self._position
+        end = self.size if size is None or size < 0 else min(self.size, start + size)
+        if end <= start:
+            return b""
+        self._position = end
+        return self._view[start:end].tobytes()
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def getbuffer(self):
+        """The underlying buffer (read-only), like ``BytesIO.getbuffer``."""
+        return self._view.toreadonly()
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+@contextmanager
+def open_input(source):
+    """Yield a seekable binary file object over ``source`` (see the module docstring)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield f
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                reader = MemoryReader(mapped)
+                try:
+                    yield reader
+                finally:
+                    # release the view before the map is closed
+                    reader.close()
+        return
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        with MemoryReader(source) as reader:
+            yield reader
+        return
+    yield source
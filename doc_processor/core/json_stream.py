@@ -0,0 +1,247 @@
+"""Incremental ingestion of JSON edition exports.
+
+An edition export is one JSON object with edition-level fields
+(``edition_title``, ``edition_date``, ``edition_number``, ``ficha_tecnica``,
+``editorial``...) and an ``articles`` array. Instead of decoding the whole
+upload and ``json.loads``-ing it, the object is parsed as a stream of events:
+each top-level field as soon as its value is complete and each element of
+``articles`` one at a time. ijson is used when it is installed; otherwise a
+pure-Python reader decodes one value at a time with ``json.JSONDecoder``.
+
+Output rows carry the edition fields, which may come after ``articles`` in
+the file. In that case the rows are spooled to a temporary file (on disk
+beyond a few MB) and emitted once the edition fields are known.
+
+NDJSON input holds one complete edition object per line.
+"""
+
+import codecs
+import json
+import tempfile
+from decimal import Decimal
+
+EDITION_FIELDS = ("edition_title", "edition_date", "edition_number")
+CSV_FIELDNAMES = [
+    "edition_date", "edition_number", "titulo", "subtitulo", "autor",
+    "paginas", "num_imagens", "tags", "edition_title", "corpo"
+]
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def article_row(article, edition):
+    """CSV row for one article of ``edition`` (same columns as process_json)."""
+    return {
+        "edition_date": edition.get("edition_date", ""),
+        "edition_number": edition.get("edition_number", ""),
+        "titulo": article.get("titulo", ""),
+        "subtitulo": article.get("subtitulo", ""),
+        "autor": article.get("autor", ""),
+        "paginas": article.get("paginas", ""),
+        "num_imagens": article.get("num_imagens", 0),
+        "tags": ", ".join(article.get("tags", [])),
+        "edition_title": edition.get("edition_title", ""),
+        "corpo": article.get("corpo", ""),
+    }
+
+
+def _may_continue(value, buf, end):
+    """Whether the number ``value`` decoded up to ``end`` could be longer with more input."""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    return end == len(buf) or buf[end] in _NUMBER_CHARS
+
+
+class _ValueReader:
+    """Pull JSON values one at a time from a (binary or text) file object."""
+
+    def __init__(self, file, chunk_size=1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        chunk = ""
+        while not chunk and not self.eof:
+            raw = self.file.read(size or self.chunk_size)
+            self.eof = not raw
+            if isinstance(raw, str):
+                chunk = raw
+            else:
+                # a multi-byte character may be split across reads
+                chunk = self.text_decoder.decode(raw, final=self.eof)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, found {char or 'end of input'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # a number cut by the end of the buffer ("3.", "1e", "12") may
+                # continue in the next chunk
+                if self.eof or not _may_continue(value, self.buf, end):
+                    self.pos = end
+                    return value
+            # grow the read size with the pending value so re-decoding stays linear
+            self._fill(max(self.chunk_size, len(self.buf) - self.pos))
+
+
+def _iter_events_python(file):
+    reader = _ValueReader(file)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "articles" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield "article", key, reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            yield "field", key, reader.value()
+        if reader.expect(",}") == "}":
+            if reader.peek():
+                raise ValueError("Invalid JSON: extra data after the edition object")
+            return
+
+
+def _decimals_to_float(value):
+    # ijson returns non-integral numbers as Decimal; json.loads gives floats
+    if isinstance(value, dict):
+        return {k: _decimals_to_float(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decimals_to_float(v) for v in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _iter_events_ijson(file):
+    import ijson
+    from ijson.common import ObjectBuilder
+
+    key = None
+    builder = None
+    depth = 0
+    kind = None
+    for prefix, event, value in ijson.parse(file):
+        if builder is None:
+            if prefix == "":
+                if event == "map_key":
+                    key = value
+                continue
+            if prefix == "articles.item":
+                kind = "article"
+            elif prefix == key and not (key == "articles" and event in ("start_array", "end_array")):
+                kind = "field"
+            else:
+                continue
+            builder = ObjectBuilder()
+            depth = 0
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            yield kind, key, _decimals_to_float(builder.value)
+            builder = None
+
+
+def iter_json_events(file, backend="auto"):
+    """Yield ``("field", key, value)`` for top-level fields and
+    ``("article", "articles", article)`` for each article, in file order.
+
+    ``backend`` is ``"ijson"``, ``"python"`` or ``"auto"`` (ijson if installed).
+    """
+    if backend == "auto":
+        try:
+            import ijson  # noqa: F401
+        except ImportError:
+            backend = "python"
+        else:
+            backend = "ijson"
+    if backend == "ijson":
+        return _iter_events_ijson(file)
+    if backend == "python":
+        return _iter_events_python(file)
+    raise ValueError(f"Unknown JSON backend: {backend!r}")
+
+
+def iter_edition_rows(file, edition=None, backend="auto"):
+    """Yield one CSV row per article of a JSON edition, streaming the input.
+
+    Top-level fields other than ``articles`` are collected into ``edition``
+    (pass a dict to read them, e.g. ``ficha_tecnica``, after iterating).
+    """
+    edition = {} if edition is None else edition
+    spool = None
+
+    for kind, key, value in iter_json_events(file, backend):
+        if kind == "field":
+            edition[key] = value
+        elif spool is None and all(field in edition for field in EDITION_FIELDS):
+            yield article_row(value, edition)
+        else:
+            # edition fields may still follow: keep the articles until the end
+            if spool is None:
+                spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode="w+", encoding="utf-8")
+            spool.write(json.dumps(value, ensure_ascii=False))
+            spool.write("\n")
+
+    if spool is not None:
+        with spool:
+            spool.seek(0)
+            for line in spool:
+                yield article_row(json.loads(line), edition)
+
+
+def iter_ndjson_rows(file, editions=None):
+    """Yield CSV rows from NDJSON input with one edition object per line.
+
+    The edition-level fields of each line are appended to ``editions`` if it
+    is a list.
+    """
+    for line in file:
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode("utf-8-sig")
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        articles = data.pop("articles", [])
+        if editions is not None:
+            editions.append(data)
+        for article in articles:
+            yield article_row(article, data)
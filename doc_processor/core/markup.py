@@ -0,0 +1,171 @@
+"""Streaming paragraph readers for plain text, Markdown and HTML sources.
+
+All three decode the input incrementally as UTF-8 (a BOM is dropped), so a
+large file is never held in memory as a single string.
+
+- .txt: one paragraph per line, as written;
+- .md: one paragraph per line; heading markers (``# ``) are removed, but
+  metadata lines such as ``#Titulo: ...`` (no space after the ``#``) are
+  kept. ``**bold**``, ``*italic*``/``_italic_`` and ``[text](url)`` become
+  plain text, or ``<b>``, ``<i>`` and ``<a href>`` with ``html=True``;
+- .html: one paragraph per block element (``p``, ``h1``..``h6``, ``li``,
+  ``div``...), whitespace collapsed as a browser would. With ``html=True``
+  ``b``/``strong``, ``i``/``em``, ``u`` and links are kept as ``<b>``,
+  ``<i>``, ``<u>`` and ``<a href>``, and ``<br>`` as ``<br>`` (a line break
+  in text mode). Empty paragraphs are skipped, as in :mod:`core.odt`.
+"""
+
+import codecs
+import io
+import re
+from contextlib import contextmanager
+from html.parser import HTMLParser
+
+from .html import _FORMAT_TAGS
+from .inputs import open_input
+
+CHUNK_SIZE = 1 << 16
+
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)(?:\s+#+)?\s*$")
+_LINK = re.compile(r"\[([^\]]+)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+_BOLD = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_ITALIC = re.compile(r"(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)")
+
+
+@contextmanager
+def _text_stream(file):
+    """Text file object over a path, bytes-like or binary file object."""
+    with open_input(file) as source:
+        if not isinstance(source, io.BufferedIOBase):
+            source = io.BufferedReader(source) if isinstance(source, io.RawIOBase) else source
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline=None)
+        try:
+            yield text
+        finally:
+            # leave the caller's file object open
+            text.detach()
+
+
+def iter_text_paragraphs(file):
+    """Yield the lines of a UTF-8 text file."""
+    with _text_stream(file) as text:
+        for line in text:
+            yield line.rstrip("\n")
+
+
+def _markdown_inline(line, html):
+    if html:
+        line = _LINK.sub(r'<a href="\2">\1</a>', line)
+        line = _BOLD.sub(r"<b>\2</b>", line)
+        return _ITALIC.sub(lambda m: f"<i>{m.group(1) or m.group(2)}</i>", line)
+    line = _LINK.sub(r"\1", line)
+    line = _BOLD.sub(r"\2", line)
+    return _ITALIC.sub(lambda m: m.group(1) or m.group(2), line)
+
+
+def iter_markdown_paragraphs(file, html=False):
+    """Yield the lines of a Markdown file with the inline markup rendered."""
+    with _text_stream(file) as text:
+        for line in text:
+            line = line.rstrip("\n")
+            heading = _HEADING.match(line)
+            if heading:
+                line = heading.group(1)
+            yield _markdown_inline(line, html) if "[" in line or "*" in line or "_" in line else line
+
+
+BLOCK_TAGS = frozenset((
+    "address", "article", "aside", "blockquote", "body", "caption", "dd", "div", "dt", "figcaption",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "li", "main", "p", "pre", "section",
+    "td", "th", "title", "tr",
+))
+SKIP_TAGS = frozenset(("head", "script", "style", "template", "noscript"))
+_FORMAT_INDEX = {"b": 0, "strong": 0, "i": 1, "em": 1, "u": 2, "ins": 2}
+_WHITESPACE = re.compile(r"\s+")
+_SPACES = re.compile(r" {2,}")
+
+
+class _ParagraphParser(HTMLParser):
+    def __init__(self, html):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.paragraphs = []
+        self.parts = []
+        self.format = [0, 0, 0]
+        self.skip = 0
+        self.pre = 0
+        self.link = None
+
+    def flush(self):
+        text = "".join(self.parts)
+        self.parts = []
+        if not self.pre:
+            text = _SPACES.sub(" ", text)
+        text = text.strip()
+        if text:
+            self.paragraphs.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            self.pre += tag == "pre"
+        elif tag in _FORMAT_INDEX:
+            self.format[_FORMAT_INDEX[tag]] += 1
+        elif tag == "br":
+            self.parts.append("<br>" if self.html else "\n")
+        elif tag == "a" and self.html:
+            self.link = (dict(attrs).get("href") or "", len(self.parts))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "br":
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip = max(self.skip - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            if tag == "pre":
+                self.pre = max(self.pre - 1, 0)
+        elif tag in _FORMAT_INDEX:
+            index = _FORMAT_INDEX[tag]
+            self.format[index] = max(self.format[index] - 1, 0)
+        elif tag == "a" and self.link is not None:
+            href, start = self.link
+            self.link = None
+            link_text = "".join(self.parts[start:]).strip()
+            del self.parts[start:]
+            if link_text:
+                self.parts.append(f'<a href="{href}">{link_text}</a>')
+
+    def handle_data(self, data):
+        if self.skip or not data:
+            return
+        if not self.pre:
+            data = _WHITESPACE.sub(" ", data)
+        fmt = tuple(bool(flag) for flag in self.format)
+        if self.html and any(fmt) and self.link is None and data.strip():
+            opening, closing = _FORMAT_TAGS[fmt]
+            self.parts.extend((opening, data, closing))
+        else:
+            self.parts.append(data)
+
+
+def iter_html_paragraphs(file, html=False):
+    """Yield the text of the block elements of an HTML file."""
+    parser = _ParagraphParser(html)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    with open_input(file) as source:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            parser.feed(decoder.decode(chunk, final=not chunk))
+            if parser.paragraphs:
+                yield from parser.paragraphs
+                parser.paragraphs = []
+            if not chunk:
+                break
+    parser.close()
+    parser.flush()
+    yield from parser.paragraphs
@@ -0,0 +1,322 @@
+"""Column-wise normalization and validation of split articles.
+
+After the split every metadata value is a raw string (``Data: 3 de março de
+2024``, ``Pag: 4-5``), and JSON exports carry ``paginas``/``num_imagens``/
+``tags`` as they were typed. :func:`normalize_articles` converts a whole
+article table at once with pandas/NumPy operations instead of row by row:
+
+- ``date`` columns become ``datetime64`` (Portuguese month names, ``dd/mm/yyyy``
+  and ISO dates; NaT when unreadable),
+- ``pages`` columns become two ``Int64`` columns, ``<name>_inicio`` and
+  ``<name>_fim`` (``"4"`` is the range 4-4),
+- ``int`` columns become ``Int64`` (the first number in the text),
+- ``count`` columns become ``Int64``: the number itself, or the number of
+  comma separated items (the image URLs of ``Imagens``),
+- ``tags`` columns are split into a long table of (row, field, tag) with
+  ``tag`` as a categorical, so ``tags["tag"].cat.codes`` are the tag codes.
+
+Every conversion parses the distinct values of a column only (an edition's
+articles share most dates and page numbers) and maps them back with the
+factorized codes. Columns are matched with or without the ``#`` field prefix.
+
+Alongside, a boolean issue table flags the rows to check: no ``Titulo``, and
+a Rodape that is not the last paragraph of the article (more lines follow the
+footer line). Needs pandas and pyarrow (a Streamlit dependency).
+
+    result = normalize_articles(articles)
+    result.frame["Data"].dt.year, result.tags, result.frame[~result.valid]
+"""
+
+DATE = "date"
+PAGES = "pages"
+INT = "int"
+COUNT = "count"
+TAGS = "tags"
+
+# how each known column is normalized (docx/odt metadata fields and JSON export columns)
+NORMALIZE_FIELDS = {
+    "Data": DATE,
+    "Pag": PAGES,
+    "Numero": INT,
+    "Imagens": COUNT,
+    "Tag": TAGS,
+    "edition_date": DATE,
+    "edition_number": INT,
+    "paginas": PAGES,
+    "num_imagens": COUNT,
+    "tags": TAGS,
+}
+TITLE_FIELDS = ("Titulo", "titulo")
+ISSUES = ("sem_titulo", "rodape_nao_final")
+
+# three-letter month prefixes, in calendar order
+MONTHS = ("jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez")
+# "3 de março de 2024", "segunda-feira, 3 mar. 2024", "1º de abril 2024"
+_TEXT_DATE = r"(?P<day>\d{1,2})[oº°]?\s*(?:de\s+)?(?P<month>[a-z]{3})[^\s\d.,]*\.?,?\s*(?:de\s+)?(?P<year>\d{4})"
+# "março de 2024" (first of the month)
+_MONTH_DATE = r"^(?P<month>[a-z]{3})[^\s\d.,]*\.?\s*(?:de\s+)?(?P<year>\d{4})$"
+_ISO_DATE = r"^(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})"
+_DMY_DATE = r"^(?P<day>\d{1,2})[-/.](?P<month>\d{1,2})[-/.](?P<year>\d{2}|\d{4})$"
+_PAGES = r"(?P<start>\d+)(?:\s*(?:-|–|—|/|a|at[eé])\s*(?P<end>\d+))?"
+_NUMBER = r"(?P<number>\d+)"
+_TAG_SEPARATORS = r"[,;]"
+
+
+class NormalizedArticles:
+    """Result of :func:`normalize_articles`.
+
+    - ``frame``: the articles with typed columns,
+    - ``tags``: long table of (row, field, tag), ``tag`` categorical,
+    - ``issues``: one boolean column per check in :data:`ISSUES`,
+    - ``valid``: boolean NumPy mask, True where a row has no issue.
+    """
+
+    __slots__ = ("frame", "tags", "issues", "valid")
+
+    def __init__(self, frame, tags, issues):
+        self.frame = frame
+        self.tags = tags
+        self.issues = issues
+        self.valid = ~issues.to_numpy().any(axis=1)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def summary(self):
+        """Number of rows flagged by each check."""
+        return {name: int(self.issues[name].sum()) for name in self.issues.columns}
+
+
+def _factorize(column):
+    """Codes and distinct values of ``column`` as text (missing values as "")."""
+    import pandas as pd
+
+    # hashing Python objects is several times faster than factorizing Arrow strings
+    values = column.astype("string").to_numpy(dtype=object, na_value="")
+    return pd.factorize(values)
+
+
+def _unique_text(column):
+    """Factorized codes of ``column`` plus its distinct values, stripped and lowercase.
+
+    The values are Arrow strings, so ``str.extract`` runs in Arrow's regex
+    engine; patterns need named groups and must be valid for both ``re`` and
+    RE2.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    codes, uniques = _factorize(column)
+    return codes, pd.Series(uniques, dtype=pd.ArrowDtype(pa.string())).str.strip().str.lower()
+
+
+def _take(values, codes, name, index):
+    """Map the per-unique ``values`` back onto the rows."""
+    import pandas as pd
+
+    return pd.Series(values.array.take(codes), index=index, name=name)
+
+
+def _ints(values):
+    """``Int64`` Series from extracted digit strings (unmatched groups are NA or "")."""
+    import pandas as pd
+
+    return pd.to_numeric(values, errors="coerce").astype("Int64")
+
+
+def _month_numbers(names):
+    """Month number (float, NaN if unknown) of each three-letter month name."""
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    positions = pc.index_in(pa.array(names, pa.string()), value_set=pa.array(MONTHS))
+    return positions.to_numpy(zero_copy_only=False).astype("float64") + 1
+
+
+def parse_dates(column):
+    """``datetime64[ns]`` Series from Portuguese date strings (NaT when unreadable)."""
+    import numpy as np
+    import pandas as pd
+
+    codes, text = _unique_text(column)
+    # year/month/day per distinct value, filled by the first pattern that matches
+    parts = np.full((3, len(text)), np.nan)
+    pending = np.arange(len(text))
+    for pattern in (_ISO_DATE, _DMY_DATE, _TEXT_DATE, _MONTH_DATE):
+        if not len(pending):
+            break
+        found = text.iloc[pending].str.extract(pattern)
+        if pattern in (_TEXT_DATE, _MONTH_DATE):
+            month = _month_numbers(found["month"])
+        else:
+            month = pd.to_numeric(found["month"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        matched = ~np.isnan(month)
+        rows = pending[matched]
+        parts[0, rows] = pd.to_numeric(found["year"]).to_numpy(dtype="float64", na_value=np.nan)[matched]
+        parts[1, rows] = month[matched]
+        if "day" in found:
+            parts[2, rows] = pd.to_numeric(found["day"]).to_numpy(dtype="float64", na_value=np.nan)[matched]
+        else:
+            parts[2, rows] = 1
+        pending = pending[~matched]
+    # two-digit years are 20xx
+    parts[0, parts[0] < 100] += 2000
+    dates = pd.to_datetime(pd.DataFrame({"year": parts[0], "month": parts[1], "day": parts[2]}), errors="coerce")
+    return _take(dates.astype("datetime64[ns]"), codes, column.name, column.index)
+
+
+def parse_pages(column):
+    """(start, end) ``Int64`` Series from page strings such as "4", "4-5" or "pp. 4 a 6"."""
+    codes, text = _unique_text(column)
+    found = text.str.extract(_PAGES)
+    start = _ints(found["start"])
+    end = _ints(found["end"]).fillna(start)
+    name = column.name
+    return (
+        _take(start, codes, f"{name}_inicio", column.index),
+        _take(end, codes, f"{name}_fim", column.index),
+    )
+
+
+def parse_ints(column, count_items=False):
+    """``Int64`` Series with the first number in each value.
+
+    With ``count_items``, values without digits count their comma separated
+    items instead (a list of image URLs gives the number of images).
+    """
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        return column.astype("Int64")
+    codes, text = _unique_text(column)
+    values = _ints(text.str.extract(_NUMBER)["number"])
+    if count_items:
+        items = _ints(text.str.count(",")) + 1
+        items = items.where(text.str.len() > 0, 0)
+        values = values.where(text.str.fullmatch(r"\d+").fillna(False).astype(bool), items)
+    return _take(values, codes, column.name, column.index)
+
+
+def split_tags(column):
+    """Long DataFrame (row, field, tag) with one row per tag; ``tag`` is categorical.
+
+    Categories are in order of first appearance.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if column.dtype == object:
+        # JSON exports may keep tags as lists
+        column = column.map(lambda value: ", ".join(map(str, value)) if isinstance(value, (list, tuple)) else value)
+    codes, uniques = _factorize(column)
+
+    # split and strip every distinct value once
+    lists = pc.split_pattern_regex(pa.array(uniques, pa.string()), _TAG_SEPARATORS)
+    owners = pc.list_parent_indices(lists).to_numpy()
+    tags = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    keep = pc.greater(pc.utf8_length(tags), 0)
+    tags = tags.filter(keep).dictionary_encode()
+    owners = owners[keep.to_numpy(zero_copy_only=False)]
+
+    # repeat the tag run of each distinct value on every row holding it
+    counts = np.bincount(owners, minlength=len(uniques))
+    starts = np.cumsum(counts) - counts
+    per_row = counts[codes]
+    rows = np.repeat(np.arange(len(codes)), per_row)
+    offsets = np.cumsum(per_row) - per_row
+    positions = np.repeat(starts[codes] - offsets, per_row) + np.arange(len(rows))
+
+    tag_codes = tags.indices.to_numpy(zero_copy_only=False)[positions]
+    return pd.DataFrame({
+        "row": column.index.to_numpy()[rows].astype("int64"),
+        "field": column.name,
+        "tag": pd.Categorical.from_codes(tag_codes, categories=tags.dictionary.to_pylist()),
+    })
+
+
+def _column(frame, name):
+    """Column ``name`` of ``frame`` with or without the '#' prefix, or None."""
+    for candidate in (name, "#" + name):
+        if candidate in frame.columns:
+            return candidate
+    return None
+
+
+def _text(column):
+    return column.astype("string").fillna("")
+
+
+def validate(frame):
+    """Boolean DataFrame with one column per check in :data:`ISSUES`."""
+    import numpy as np
+    import pandas as pd
+
+    length = len(frame)
+    issues = pd.DataFrame(False, index=frame.index, columns=list(ISSUES))
+
+    present = np.zeros(length, dtype=bool)
+    for name in (_column(frame, field) for field in TITLE_FIELDS):
+        if name is not None:
+            present |= (_text(frame[name]).str.strip().str.len() > 0).to_numpy(dtype=bool)
+    issues["sem_titulo"] = ~present
+
+    # Rodape takes every line after "#Rodape:", so a second line there means
+    # body text came after the footer
+    rodape = _column(frame, "Rodape")
+    if rodape is not None:
+        issues["rodape_nao_final"] = _text(frame[rodape]).str.contains("\n", regex=False).to_numpy(dtype=bool)
+    return issues
+
+
+def normalize_articles(articles, fields=None):
+    """Normalize an article table; see the module docstring.
+
+    ``articles`` is a DataFrame, an :class:`~core.table.ArticleTable` or a list
+    of article dicts; ``fields`` maps column names to a kind (``"date"``,
+    ``"pages"``, ``"int"``, ``"count"``, ``"tags"``) and defaults to
+    :data:`NORMALIZE_FIELDS`. The input frame is not modified.
+    """
+    import pandas as pd
+
+    if isinstance(articles, pd.DataFrame):
+        frame = articles
+    elif hasattr(articles, "to_pandas"):
+        frame = articles.to_pandas()
+    else:
+        frame = pd.DataFrame(list(articles))
+    frame = frame.reset_index(drop=True)
+    issues = validate(frame)
+
+    fields = NORMALIZE_FIELDS if fields is None else fields
+    columns = {}
+    tags = []
+    for name in frame.columns:
+        kind = fields.get(name, fields.get(name.lstrip("#")))
+        column = frame[name]
+        if kind == DATE:
+            columns[name] = parse_dates(column)
+        elif kind == PAGES:
+            start, end = parse_pages(column)
+            columns[start.name] = start
+            columns[end.name] = end
+        elif kind in (INT, COUNT):
+            columns[name] = parse_ints(column, count_items=kind == COUNT)
+        elif kind == TAGS:
+            tags.append(split_tags(column))
+            columns[name] = column
+        elif kind is None:
+            columns[name] = column
+        else:
+            raise ValueError(f"Unknown normalization {kind!r} for column {name!r}")
+    frame = pd.DataFrame(columns, index=frame.index)
+
+    if tags:
+        tags = pd.concat(tags, ignore_index=True)
+        tags["tag"] = tags["tag"].astype("category")
+    else:
+        tags = pd.DataFrame({"row": pd.Series(dtype="int64"), "field": pd.Series(dtype="str"),
+                             "tag": pd.Categorical([])})
+    return NormalizedArticles(frame, tags, issues)
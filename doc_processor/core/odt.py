@@ -0,0 +1,172 @@
+"""Streaming paragraph reader for .odt files.
+
+Parses ``content.xml`` straight from the zip with ``lxml.etree.iterparse``
+instead of loading the odfpy DOM. ``text:p`` and ``text:h`` paragraphs are
+yielded in document order with the text of nested spans, links, spaces
+(``text:s``), tabs and line breaks; each paragraph is cleared from the tree
+once it has been yielded, so memory does not grow with the document.
+
+Paragraphs nested in another paragraph (text boxes, notes, annotations) are
+yielded right after the paragraph that contains them. Empty paragraphs are
+skipped and paragraph text is stripped.
+
+With ``html=True`` the paragraph is rendered like the .docx ``runs_to_html``:
+bold/italic/underline direct formatting from the document's automatic styles
+becomes ``<b>``/``<i>``/``<u>``, links become ``<a href>`` and line breaks
+``<br>``. ``images`` maps ``Pictures/...`` members to a ``src``, and the
+frames of those images become ``<img src>`` (see :mod:`core.images`).
+"""
+
+import posixpath
+
+import zipfile
+
+from .html import _FORMAT_TAGS
+from .inputs import open_input
+
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+STYLE_NS = "urn:oasis:names:tc:opendocument:xmlns:style:1.0"
+FO_NS = "urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+DRAW_NS = "urn:oasis:names:tc:opendocument:xmlns:drawing:1.0"
+
+T_P = f"{{{TEXT_NS}}}p"
+T_H = f"{{{TEXT_NS}}}h"
+T_SPAN = f"{{{TEXT_NS}}}span"
+T_A = f"{{{TEXT_NS}}}a"
+T_S = f"{{{TEXT_NS}}}s"
+T_TAB = f"{{{TEXT_NS}}}tab"
+T_LINE_BREAK = f"{{{TEXT_NS}}}line-break"
+T_STYLE_NAME = f"{{{TEXT_NS}}}style-name"
+T_C = f"{{{TEXT_NS}}}c"
+STYLE_STYLE = f"{{{STYLE_NS}}}style"
+STYLE_NAME = f"{{{STYLE_NS}}}name"
+STYLE_TEXT_PROPERTIES = f"{{{STYLE_NS}}}text-properties"
+STYLE_UNDERLINE = f"{{{STYLE_NS}}}text-underline-style"
+FO_FONT_WEIGHT = f"{{{FO_NS}}}font-weight"
+FO_FONT_STYLE = f"{{{FO_NS}}}font-style"
+XLINK_HREF = f"{{{XLINK_NS}}}href"
+DRAW_FRAME = f"{{{DRAW_NS}}}frame"
+DRAW_IMAGE = f"{{{DRAW_NS}}}image"
+
+PARAGRAPH_TAGS = (T_P, T_H)
+NO_FORMAT = (None, None, None)
+
+
+def _style_format(style):
+    """(bold, italic, underline) set by a style element; None where it says nothing."""
+    props = style.find(STYLE_TEXT_PROPERTIES)
+    if props is None:
+        return NO_FORMAT
+    weight = props.get(FO_FONT_WEIGHT)
+    font_style = props.get(FO_FONT_STYLE)
+    underline = props.get(STYLE_UNDERLINE)
+    return (
+        None if weight is None else (weight == "bold" or (weight.isdigit() and int(weight) >= 600)),
+        None if font_style is None else font_style in ("italic", "oblique"),
+        None if underline is None else underline != "none",
+    )
+
+
+def _merge_format(outer, inner):
+    return tuple(o if i is None else i for o, i in zip(outer, inner))
+
+
+class _Renderer:
+    def __init__(self, html, styles, images=None):
+        self.html = html
+        self.styles = styles
+        self.images = images if html else None
+        self.parts = []
+
+    def emit(self, text, fmt):
+        if not text:
+            return
+        if self.html and any(fmt):
+            opening, closing = _FORMAT_TAGS[tuple(bool(flag) for flag in fmt)]
+            self.parts.extend((opening, text, closing))
+        else:
+            self.parts.append(text)
+
+    def render(self, el, fmt):
+        self.emit(el.text, fmt)
+        for child in el:
+            tag = child.tag
+            if tag == T_SPAN:
+                self.render(child, _merge_format(fmt, self.styles.get(child.get(T_STYLE_NAME), NO_FORMAT)))
+            elif tag == T_S:
+                self.emit(" " * int(child.get(T_C, "1")), fmt)
+            elif tag == T_TAB:
+                self.emit("\t", fmt)
+            elif tag == T_LINE_BREAK:
+                self.parts.append("<br>" if self.html else "\n")
+            elif tag == DRAW_FRAME:
+                if self.images:
+                    for image in child.iterchildren(DRAW_IMAGE):
+                        src = self.images.get(posixpath.normpath(image.get(XLINK_HREF, "")))
+                        if src:
+                            self.parts.append(f'<img src="{src}">')
+            elif tag == T_A:
+                if self.html:
+                    link_text = "".join(child.itertext()).strip()
+                    if link_text:
+                        self.parts.append(f'<a href="{child.get(XLINK_HREF, "")}">{link_text}</a>')
+                else:
+                    self.render(child, fmt)
+            elif isinstance(tag, str) and tag.startswith(f"{{{TEXT_NS}}}") and tag not in PARAGRAPH_TAGS:
+                # fields, bookmarks, soft page breaks... (notes hold paragraphs
+                # of their own, which are yielded separately)
+                if not tag.endswith("}note"):
+                    self.render(child, fmt)
+            self.emit(child.tail, fmt)
+
+    def paragraph(self, p):
+        self.parts = []
+        self.render(p, self.styles.get(p.get(T_STYLE_NAME), NO_FORMAT))
+        return "".join(self.parts).strip()
+
+
+def _drop_finished(el):
+    """Remove ``el`` and everything already parsed before it from the tree."""
+    el.clear(keep_tail=True)
+    node = el
+    while node.getparent() is not None:
+        parent = node.getparent()
+        while node.getprevious() is not None:
+            del parent[0]
+        node = parent
+
+
+def iter_odt_paragraphs_stream(file, html=False, images=None):
+    """Yield the non-empty paragraphs of an .odt file (path or file object)."""
+    from lxml import etree
+
+    styles = {}
+    renderer = _Renderer(html, styles, images)
+    tags = PARAGRAPH_TAGS + (STYLE_STYLE,) if html else PARAGRAPH_TAGS
+
+    with open_input(file) as source, zipfile.ZipFile(source) as zf:
+        with zf.open("content.xml") as xml:
+            depth = 0
+            nested = []
+            for event, el in etree.iterparse(xml, events=("start", "end"), tag=tags, huge_tree=True):
+                if el.tag == STYLE_STYLE:
+                    if event == "end":
+                        styles[el.get(STYLE_NAME)] = _style_format(el)
+                    continue
+                if event == "start":
+                    depth += 1
+                    continue
+
+                depth -= 1
+                text = renderer.paragraph(el)
+                if depth:
+                    # nested paragraphs end before their container; keep them for later
+                    if text:
+                        nested.append(text)
+                    continue
+                if text:
+                    yield text
+                yield from nested
+                nested = []
+                _drop_finished(el)
@@ -0,0 +1,106 @@
+"""Headless extraction + splitting driven by a :class:`ProcessorConfig`."""
+
+import os
+
+from .classifier import get_classifier
+from .config import ProcessorConfig
+from .docx_fast import W_R
+from .extract import iter_paragraphs
+from .html import docx_paragraph_runs_html
+from .instrument import active_profiler, profile_iter, stage
+from .registry import select_extractor
+from .splitter import iter_articles
+
+
+def wrap_paragraph_html(html, config):
+    """Wrap body paragraphs in <p>; delimiter and metadata lines are left bare."""
+    classifier = get_classifier(config.metadata_fields, config.article_start, config.field_prefix)
+    if classifier.is_structural(html):
+        return html
+    return f"<p>{html}</p>"
+
+
+def extract_paragraphs(file, file_extension, config, wrap=True, images=None):
+    """Yield the paragraphs of a document as configured.
+
+    In HTML mode paragraphs are inline HTML; ``wrap=False`` leaves out the
+    <p> wrapping, which is the only part that depends on the delimiter and
+    metadata fields (see :func:`split_articles`). ``images`` maps zip members
+    to the ``src`` of their ``<img>`` in HTML mode (see :mod:`core.images`).
+    """
+    profiler = active_profiler()
+    if profiler is not None:
+        size = _input_size(file)
+        if size is not None:
+            profiler.count("bytes", size)
+
+    if not config.html:
+        render = None
+        if profiler is not None and not config.fast:
+            # only installed while profiling, to count the runs
+            def render(paragraph):
+                _count_runs(profiler, paragraph)
+                return paragraph.text
+
+        return profile_iter("extract", iter_paragraphs(file, file_extension, render, fast=config.fast), "paragraphs")
+
+    def render(paragraph):
+        if profiler is not None:
+            _count_runs(profiler, paragraph)
+        return docx_paragraph_runs_html(paragraph, config.merge_runs, images)
+
+    paragraphs = iter_paragraphs(file, file_extension, render, html=True, images=images)
+    if wrap:
+        paragraphs = (wrap_paragraph_html(html, config) for html in paragraphs)
+    return profile_iter("extract", paragraphs, "paragraphs")
+
+
+def document_extractor(file_extension, config):
+    """The registry backend :func:`extract_paragraphs` uses for ``file_extension``."""
+    if config.html:
+        return select_extractor(file_extension, render=docx_paragraph_runs_html, html=True)
+    return select_extractor(file_extension, fast=config.fast)
+
+
+def split_articles(paragraphs, config, wrapped=True):
+    """Yield article dicts from paragraphs; ``wrapped=False`` for unwrapped HTML."""
+    if config.html and not wrapped:
+        paragraphs = (wrap_paragraph_html(html, config) for html in paragraphs)
+    articles = iter_articles(paragraphs, config.article_start, config.metadata_fields, **config.split_options)
+    return profile_iter("split", articles, "articles")
+
+
+def process_document(file, file_extension, config=None):
+    """Yield the articles of one document (path or binary file object).
+
+    With ``config.image_dir`` the embedded images are stored first, and each
+    article lists its images in :data:`core.images.IMAGE_FIELD`.
+    """
+    config = config or ProcessorConfig()
+    if config.image_dir:
+        return _process_with_images(file, file_extension, config)
+    return split_articles(extract_paragraphs(file, file_extension, config), config)
+
+
+def _process_with_images(file, file_extension, config):
+    from .images import ImageStore, extract_images, split_with_images
+
+    with stage("images"):
+        sources, placements = extract_images(file, file_extension, config, ImageStore(config.image_dir))
+    paragraphs = extract_paragraphs(file, file_extension, config, images=sources)
+    return profile_iter("split", split_with_images(paragraphs, config, sources, placements), "articles")
+
+
+def _count_runs(profiler, paragraph):
+    profiler.count("runs", sum(1 for _ in paragraph._element.iter(W_R)))
+
+
+def _input_size(file):
+    """Size in bytes of a path, an upload or a seekable binary file, if known."""
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    size = getattr(file, "size", None)  # Streamlit UploadedFile
+    if size is None and hasattr(file, "getbuffer"):
+        with file.getbuffer() as view:
+            size = view.nbytes
+    return size
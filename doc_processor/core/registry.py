@@ -0,0 +1,247 @@
+"""Registry of paragraph extractors, keyed by file extension.
+
+Every source format is an :class:`Extractor`: a callable
+``iterate(file, render=None, html=False)`` yielding paragraph strings, plus
+what it can do:
+
+- ``streaming``: paragraphs are produced while the input is read, instead
+  of after loading the whole document (python-docx loads every part first);
+- ``picklable``: ``iterate`` is a module-level function, so a file using it
+  can be sent to a process pool (an extractor registered with a lambda or a
+  closure is run in the calling process instead);
+- ``html``: can render inline HTML (``<b>``, ``<i>``, ``<u>``, ``<a href>``);
+- ``render``: accepts a python-docx ``Paragraph`` renderer (``render=...``);
+- ``images``: accepts ``images={zip member: src}`` and renders those images
+  as ``<img src>`` in HTML (.docx does it through its ``render``);
+- ``cost``: relative cost per byte, used to pick the fastest backend.
+
+:func:`select_extractor` picks the backend for a file: the first registered
+extractor able to do what is asked, or with ``fast`` the cheapest one (the
+streaming lxml reader for plain-text .docx). :func:`detect_extension` falls
+back to sniffing the content (zip magic, the ODF ``mimetype`` entry, the
+OOXML main part, HTML markup) when the file name has no registered
+extension. New formats are added with :func:`register`::
+
+    register(Extractor("rtf", (".rtf",), iter_rtf_paragraphs, mime_types=("application/rtf",)))
+"""
+
+import os
+import zipfile
+
+from .docx_fast import iter_docx_paragraphs_fast
+from .inputs import open_input
+from .markup import iter_html_paragraphs, iter_markdown_paragraphs, iter_text_paragraphs
+from .odt import iter_odt_paragraphs_stream
+
+ZIP_MAGIC = b"PK\x03\x04"
+ODT_MIME = "application/vnd.oasis.opendocument.text"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class Extractor:
+    """One paragraph source; see the module docstring for the flags."""
+
+    __slots__ = (
+        "name", "extensions", "iterate", "mime_types", "streaming", "picklable", "html", "render", "images", "cost"
+    )
+
+    def __init__(
+        self,
+        name,
+        extensions,
+        iterate,
+        mime_types=(),
+        streaming=True,
+        picklable=True,
+        html=True,
+        render=False,
+        images=False,
+        cost=1.0,
+    ):
+        self.name = name
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.iterate = iterate
+        self.mime_types = tuple(mime_types)
+        self.streaming = streaming
+        self.picklable = picklable
+        self.html = html
+        self.render = render
+        self.images = images
+        self.cost = cost
+
+    def __repr__(self):
+        return f"Extractor({self.name!r}, {self.extensions!r})"
+
+    def __call__(self, file, render=None, html=False, images=None):
+        if images and self.images:
+            return self.iterate(file, render=render, html=html, images=images)
+        return self.iterate(file, render=render, html=html)
+
+    def supports(self, render=None, html=False):
+        return (render is None or self.render) and (not html or self.html or self.render)
+
+
+_EXTRACTORS = {}
+_BY_EXTENSION = {}
+
+
+def register(extractor, replace=False):
+    """Add ``extractor``; an extractor with the same name is kept unless ``replace``."""
+    if extractor.name in _EXTRACTORS:
+        if not replace:
+            return _EXTRACTORS[extractor.name]
+        unregister(extractor.name)
+    _EXTRACTORS[extractor.name] = extractor
+    for extension in extractor.extensions:
+        _BY_EXTENSION.setdefault(extension, []).append(extractor)
+    return extractor
+
+
+def unregister(name):
+    extractor = _EXTRACTORS.pop(name)
+    for extension in extractor.extensions:
+        _BY_EXTENSION[extension].remove(extractor)
+        if not _BY_EXTENSION[extension]:
+            del _BY_EXTENSION[extension]
+
+
+def get_extractor(name):
+    return _EXTRACTORS[name]
+
+
+def extractors(file_extension=None):
+    """Registered extractors, all or those for ``file_extension``, in registration order."""
+    if file_extension is None:
+        return list(_EXTRACTORS.values())
+    return list(_BY_EXTENSION.get(file_extension.lower(), ()))
+
+
+def supported_extensions():
+    """Registered extensions, such as ``(".docx", ".odt", ...)``."""
+    return tuple(_BY_EXTENSION)
+
+
+def select_extractor(file_extension, render=None, html=False, fast=False):
+    """The extractor to use for ``file_extension``.
+
+    ``render`` is a python-docx paragraph renderer; it is only required from
+    formats that have an extractor accepting one (.docx), and ignored by the
+    others, which render HTML themselves with ``html``. Raises ``ValueError``
+    for an unregistered extension or when no extractor can do what is asked.
+    """
+    candidates = extractors(file_extension)
+    if not candidates:
+        raise ValueError(f"Unsupported file extension: {file_extension!r}")
+    if render is not None and not any(extractor.render for extractor in candidates):
+        render = None
+    capable = [extractor for extractor in candidates if extractor.supports(render, html)]
+    if not capable:
+        raise ValueError(f"No extractor for {file_extension!r} with render={render is not None}, html={html}")
+    return min(capable, key=lambda extractor: extractor.cost) if fast else capable[0]
+
+
+def sniff_extension(file):
+    """Guess the extension of a document from its content, or None.
+
+    ``file`` is a path, a bytes-like object or a seekable binary file object
+    (its position is restored).
+    """
+    position = None
+    if hasattr(file, "seek") and hasattr(file, "tell"):
+        position = file.tell()
+        file.seek(0)
+    try:
+        with open_input(file) as source:
+            head = source.read(2048)
+            if head.startswith(ZIP_MAGIC):
+                source.seek(0)
+                return _sniff_zip(source)
+    finally:
+        if position is not None:
+            file.seek(position)
+
+    text = head.decode("utf-8", errors="ignore").lstrip("﻿").lstrip().lower()
+    if text.startswith(("<!doctype html", "<html")) or "<body" in text or "<p>" in text or "<p " in text:
+        return ".html"
+    if b"\x00" in head:
+        return None
+    mime = _mime_extension("text/plain")
+    return mime if mime in _BY_EXTENSION else None
+
+
+def _sniff_zip(source):
+    try:
+        with zipfile.ZipFile(source) as zf:
+            names = set(zf.namelist())
+            if "mimetype" in names:
+                mime = zf.read("mimetype").decode("ascii", errors="ignore").strip()
+                return _mime_extension(mime)
+            if "word/document.xml" in names or "[Content_Types].xml" in names:
+                content_types = zf.read("[Content_Types].xml").decode("utf-8", errors="ignore")
+                if "wordprocessingml" in content_types:
+                    return _mime_extension(DOCX_MIME)
+    except (zipfile.BadZipFile, KeyError, OSError):
+        pass
+    return None
+
+
+def _mime_extension(mime):
+    for extractor in _EXTRACTORS.values():
+        if mime in extractor.mime_types:
+            return extractor.extensions[0]
+    return None
+
+
+def detect_extension(file, filename=None):
+    """Extension of ``file``: from ``filename`` (or the path) when registered, else sniffed.
+
+    Returns the lowercase extension, or None when the format is unknown.
+    """
+    if filename is None and isinstance(file, (str, os.PathLike)):
+        filename = os.fspath(file)
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in _BY_EXTENSION:
+        return extension
+    return sniff_extension(file)
+
+
+# --- built-in extractors -------------------------------------------------
+#
+# Module-level wrappers with the common signature, so they pickle by name.
+
+
+def _docx(file, render=None, html=False):
+    # python-docx is only imported when a document is actually parsed
+    from .extract import iter_docx_paragraphs
+
+    return iter_docx_paragraphs(file, render)
+
+
+def _docx_fast(file, render=None, html=False):
+    return iter_docx_paragraphs_fast(file)
+
+
+def _odt(file, render=None, html=False, images=None):
+    return iter_odt_paragraphs_stream(file, html, images)
+
+
+def _text(file, render=None, html=False):
+    return iter_text_paragraphs(file)
+
+
+def _markdown(file, render=None, html=False):
+    return iter_markdown_paragraphs(file, html)
+
+
+def _html(file, render=None, html=False):
+    return iter_html_paragraphs(file, html)
+
+
+# python-docx first: it is the default .docx backend, the lxml reader is the
+# fast one for plain text
+register(Extractor("docx", (".docx",), _docx, (DOCX_MIME,), streaming=False, html=False, render=True, cost=8.0))
+register(Extractor("docx_fast", (".docx",), _docx_fast, (DOCX_MIME,), html=False))
+register(Extractor("odt", (".odt",), _odt, (ODT_MIME,), images=True))
+register(Extractor("markdown", (".md", ".markdown"), _markdown, ("text/markdown",)))
+register(Extractor("html", (".html", ".htm"), _html, ("text/html",)))
+register(Extractor("text", (".txt",), _text, ("text/plain",), cost=0.5))
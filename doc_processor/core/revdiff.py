@@ -0,0 +1,148 @@
+"""Article-level diff between two revisions of the same edition.
+
+Every article gets a fingerprint: the SHA-256 of its fields after
+normalization (Unicode NFC, runs of whitespace collapsed, surrounding
+whitespace removed), so re-saving a document or re-flowing a paragraph does
+not count as a change. :func:`diff_revisions` aligns the two revisions in
+linear time with hash lookups, in three passes over the articles not yet
+matched:
+
+1. same fingerprint: unchanged (even if it moved);
+2. same title (ignoring case and accents): modified;
+3. same body: modified (the title was edited).
+
+Articles left over are added (in the new revision) or removed (from the old
+one). Duplicates of a key are paired in document order. Only the changes
+are reported, as :class:`ArticleChange` tuples, modified ones with the
+fields that changed:
+
+    for change in diff_revisions(old_articles, new_articles):
+        print(change.kind, change.new_position, sorted(change.fields))
+
+:func:`change_rows` turns them into output rows (:data:`DIFF_FIELDNAMES`
+followed by the article fields) for :func:`core.sinks.open_sink`.
+"""
+
+import json
+import unicodedata
+from collections import defaultdict, deque, namedtuple
+
+from .cache import content_hash
+from .fulltext import article_columns
+from .search import normalize
+
+ADDED = "novo"
+REMOVED = "removido"
+MODIFIED = "alterado"
+
+DIFF_FIELDNAMES = ["Alteração", "Artigo anterior", "Artigo", "Campos alterados"]
+
+# kind is ADDED/REMOVED/MODIFIED; positions are 0-based, None on the missing
+# side; fields maps each changed field to its (old, new) values
+ArticleChange = namedtuple("ArticleChange", ["kind", "old_position", "new_position", "article", "fields"])
+
+
+def normalize_value(value):
+    """Comparable form of a field value: NFC, whitespace collapsed and stripped."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(map(str, value))
+    return " ".join(unicodedata.normalize("NFC", str(value)).split())
+
+
+def normalized_fields(article):
+    """The article's non-empty fields, normalized."""
+    fields = {}
+    for key, value in article.items():
+        value = normalize_value(value)
+        if value:
+            fields[key] = value
+    return fields
+
+
+def _fingerprint(fields):
+    return content_hash(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode())
+
+
+def article_fingerprint(article):
+    """SHA-256 of the normalized fields of ``article`` (field order does not matter)."""
+    return _fingerprint(normalized_fields(article))
+
+
+def _keys(fields):
+    # fingerprint, then the alignment keys: title without case and accents, body hash
+    columns = article_columns(fields)
+    title = " ".join(normalize(columns["titulo"]).split())
+    body = columns["corpo"]
+    return _fingerprint(fields), title, content_hash(body.encode()) if body else ""
+
+
+def field_changes(old, new, old_fields=None, new_fields=None):
+    """``{field: (old value, new value)}`` of the fields whose normalized values differ."""
+    old_fields = normalized_fields(old) if old_fields is None else old_fields
+    new_fields = normalized_fields(new) if new_fields is None else new_fields
+    return {
+        key: (old.get(key), new.get(key))
+        for key in dict.fromkeys((*old, *new))
+        if old_fields.get(key, "") != new_fields.get(key, "")
+    }
+
+
+def _match(old_keys, new_keys, old_match, new_match):
+    unmatched = defaultdict(deque)
+    for i, key in enumerate(old_keys):
+        if old_match[i] is None and key:
+            unmatched[key].append(i)
+    for j, key in enumerate(new_keys):
+        if new_match[j] is None and key and unmatched.get(key):
+            i = unmatched[key].popleft()
+            old_match[i] = j
+            new_match[j] = i
+
+
+def diff_revisions(old_articles, new_articles):
+    """The :class:`ArticleChange` list from ``old_articles`` to ``new_articles``.
+
+    Added and modified articles come in new document order, then the removed
+    ones in old document order.
+    """
+    old = [dict(article) for article in old_articles]
+    new = [dict(article) for article in new_articles]
+    old_match = [None] * len(old)
+    new_match = [None] * len(new)
+
+    old_fields = [normalized_fields(article) for article in old]
+    new_fields = [normalized_fields(article) for article in new]
+    old_keys = [_keys(fields) for fields in old_fields]
+    new_keys = [_keys(fields) for fields in new_fields]
+    unchanged = set()
+    for level in range(3):
+        _match([keys[level] for keys in old_keys], [keys[level] for keys in new_keys], old_match, new_match)
+        if level == 0:
+            unchanged = {j for j, i in enumerate(new_match) if i is not None}
+
+    changes = []
+    for j, article in enumerate(new):
+        i = new_match[j]
+        if i is None:
+            changes.append(ArticleChange(ADDED, None, j, article, {}))
+        elif j not in unchanged:
+            fields = field_changes(old[i], article, old_fields[i], new_fields[j])
+            changes.append(ArticleChange(MODIFIED, i, j, article, fields))
+    for i, article in enumerate(old):
+        if old_match[i] is None:
+            changes.append(ArticleChange(REMOVED, i, None, article, {}))
+    return changes
+
+
+def change_rows(changes):
+    """One dict per change: :data:`DIFF_FIELDNAMES` (1-based positions) and the article fields."""
+    for change in changes:
+        yield {
+            **change.article,
+            "Alteração": change.kind,
+            "Artigo anterior": "" if change.old_position is None else change.old_position + 1,
+            "Artigo": "" if change.new_position is None else change.new_position + 1,
+            "Campos alterados": ", ".join(change.fields),
+        }
@@ -0,0 +1,84 @@
+"""In-memory search index over article metadata fields.
+
+The apps filter the article list on every rerun as the user types, so the
+fields are tokenized once into per-field inverted indexes; a query only
+touches the postings of the matching tokens.
+
+Matching ignores case and accents, and every query word must be a prefix of
+a word in one of the searched fields ("joão silv" finds "João Silva").
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+
+SEARCH_FIELDS = ("Titulo", "Autor", "Tag")
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Casefold ``text`` and strip its accents."""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return _WORD.findall(normalize(text))
+
+
+class ArticleIndex:
+    """Prefix word index of ``fields`` over a list of article dicts."""
+
+    def __init__(self, articles, fields=SEARCH_FIELDS):
+        self.fields = tuple(fields)
+        self.size = 0
+        self._postings = {field: {} for field in self.fields}
+        for position, article in enumerate(articles):
+            self.size += 1
+            for field in self.fields:
+                value = article.get(field)
+                if not value:
+                    continue
+                if isinstance(value, (list, tuple)):
+                    value = " ".join(map(str, value))
+                postings = self._postings[field]
+                for token in set(tokenize(value)):
+                    postings.setdefault(token, []).append(position)
+        self._tokens = {field: sorted(postings) for field, postings in self._postings.items()}
+
+    def __len__(self):
+        return self.size
+
+    def _prefix_matches(self, prefix, fields):
+        matches = set()
+        for field in fields:
+            tokens = self._tokens[field]
+            postings = self._postings[field]
+            i = bisect_left(tokens, prefix)
+            while i < len(tokens) and tokens[i].startswith(prefix):
+                matches.update(postings[tokens[i]])
+                i += 1
+        return matches
+
+    def search(self, query, fields=None):
+        """Sorted positions of the articles matching every word of ``query``.
+
+        ``fields`` restricts the search to some of the indexed fields; an empty
+        query matches every article.
+        """
+        fields = self.fields if fields is None else tuple(fields)
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Fields not indexed: {sorted(unknown)}")
+        words = tokenize(query or "")
+        if not words:
+            return list(range(self.size))
+        result = None
+        # longest words first: they usually have the fewest matches
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self._prefix_matches(word, fields)
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result)
@@ -0,0 +1,348 @@
+"""Local HTTP ingestion service with a bounded job queue.
+
+``python -m doc_processor serve`` runs an asyncio server (standard library
+only) in front of a process pool, so parsing scales with the number of cores
+instead of with the number of Streamlit sessions:
+
+- ``POST /jobs?filename=edition.docx&config={...}`` with the file as the
+  request body queues a job and answers ``202`` with its id. ``config`` is
+  optional JSON with :class:`ProcessorConfig` fields. An identical file with
+  the same configuration returns the existing job instead of parsing again.
+  When the queue is full the answer is ``503`` with ``Retry-After``. Any
+  format of :mod:`core.registry` is accepted; a file name without a
+  registered extension is resolved by sniffing the content.
+- ``GET /jobs/<id>`` returns the job status: ``queued``, ``running``,
+  ``done`` or ``error``.
+- ``GET /jobs/<id>/results`` streams the articles as NDJSON once the job is
+  done (``409`` before that).
+- ``GET /health`` reports the queue length and the number of workers.
+
+Uploads are spooled to a temporary directory and the workers get the path
+(memory-mapped for .docx/.odt, see :mod:`core.inputs`), so a large upload is
+not pickled through the pool's pipe. Only the most recent ``max_jobs`` jobs are
+kept. :class:`ServiceClient` is the matching blocking client used by the
+Streamlit apps.
+"""
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import content_hash
+from .config import ProcessorConfig
+from .json_stream import CSV_FIELDNAMES, iter_edition_rows, iter_ndjson_rows
+from .pipeline import process_document
+from .registry import detect_extension
+from .table import ArticleTable
+
+DEFAULT_PORT = 8765
+JSON_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 411: "Length Required", 413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+
+def parse_upload(path, file_extension, config):
+    """Worker process body: parse one spooled upload into an :class:`ArticleTable`."""
+    if file_extension not in JSON_EXTENSIONS:
+        return ArticleTable.from_rows(process_document(path, file_extension, config))
+    with open(path, "rb") as file:
+        if file_extension == ".json":
+            return ArticleTable.from_rows(iter_edition_rows(file), CSV_FIELDNAMES)
+        return ArticleTable.from_rows(iter_ndjson_rows(file), CSV_FIELDNAMES)
+
+
+class Job:
+    __slots__ = ("id", "key", "source", "status", "articles", "error", "submitted", "finished", "data")
+
+    def __init__(self, job_id, key, source, data):
+        self.id = job_id
+        self.key = key
+        self.source = source
+        self.status = "queued"
+        self.articles = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self.data = data
+
+    def to_dict(self):
+        return {
+            "job": self.id,
+            "source": self.source,
+            "status": self.status,
+            "articles": None if self.articles is None else len(self.articles),
+            "error": self.error,
+            "submitted": self.submitted,
+            "finished": self.finished,
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+class IngestionService:
+    """Bounded queue of parse jobs dispatched to a process pool."""
+
+    def __init__(self, workers=None, queue_size=16, max_jobs=256, max_upload_bytes=256 << 20):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_jobs = max_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs = OrderedDict()
+        self._by_key = {}
+        self._ids = itertools.count(1)
+        self._queue = None
+        self._pool = None
+        self._tasks = []
+        self._spool = None
+
+    async def start(self):
+        self._spool = tempfile.mkdtemp(prefix="doc_processor_jobs_")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # spawned workers do not inherit the listening socket or the event loop
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self._spool, ignore_errors=True)
+
+    def submit(self, data, filename, config):
+        """Queue ``data``; returns ``(job, deduplicated)``. Raises HTTPError 503 when full."""
+        file_extension = os.path.splitext(filename)[1].lower()
+        if file_extension not in JSON_EXTENSIONS:
+            # any registered document format; unknown names are sniffed
+            file_extension = detect_extension(data, filename)
+            if file_extension is None:
+                raise HTTPError(400, f"unsupported file type: {os.path.splitext(filename)[1] or filename!r}")
+        key = (content_hash(data), file_extension, json.dumps(config.to_dict(), sort_keys=True))
+        job = self._by_key.get(key)
+        if job is not None and job.status != "error":
+            self.jobs.move_to_end(job.id)
+            return job, True
+
+        if self._queue.full():
+            raise HTTPError(503, "queue full, retry later", [("Retry-After", "1")])
+        job_id = f"{next(self._ids):x}"
+        path = os.path.join(self._spool, job_id + file_extension)
+        with open(path, "wb") as f:
+            f.write(data)
+        job = Job(job_id, key, filename, (path, file_extension, config))
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._by_key[key] = job
+        self._trim()
+        return job, False
+
+    def _trim(self):
+        finished = [job for job in self.jobs.values() if job.status in ("done", "error")]
+        for job in finished[: max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            path, file_extension, config = job.data
+            job.data = None
+            try:
+                job.articles = await loop.run_in_executor(self._pool, parse_upload, path, file_extension, config)
+                job.status = "done"
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.status = "error"
+            finally:
+                os.remove(path)
+            job.finished = time.time()
+            self._queue.task_done()
+            self._trim()
+
+    def health(self):
+        running = sum(1 for job in self.jobs.values() if job.status == "running")
+        return {"queued": self._queue.qsize(), "running": running, "workers": self.workers, "jobs": len(self.jobs)}
+
+    # --- HTTP ------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                await self._respond(reader, writer)
+            except HTTPError as exc:
+                await _send_json(writer, exc.status, {"error": str(exc)}, exc.headers)
+            except (asyncio.IncompleteReadError, ValueError):
+                await _send_json(writer, 400, {"error": "malformed request"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader, writer):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HTTPError(400, "malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        url = urllib.parse.urlsplit(target)
+        query = urllib.parse.parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            return await _send_json(writer, 200, self.health())
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                raise HTTPError(405, "use POST to submit a job")
+            if "content-length" not in headers:
+                raise HTTPError(411, "Content-Length required")
+            length = int(headers["content-length"])
+            if length > self.max_upload_bytes:
+                raise HTTPError(413, f"upload larger than {self.max_upload_bytes} bytes")
+            data = await reader.readexactly(length)
+            filename = query.get("filename", [""])[0]
+            try:
+                config = ProcessorConfig.from_dict(json.loads(query.get("config", ["{}"])[0]))
+            except (TypeError, ValueError) as exc:
+                raise HTTPError(400, f"invalid config: {exc}") from None
+            if config.image_dir:
+                # a client must not choose where the server writes files
+                raise HTTPError(400, "invalid config: image_dir is not accepted by the service")
+            job, deduplicated = self.submit(data, filename, config)
+            return await _send_json(writer, 202, {**job.to_dict(), "deduplicated": deduplicated})
+
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"no job {parts[1]!r}")
+            if len(parts) == 2:
+                return await _send_json(writer, 200, job.to_dict())
+            if parts[2] == "results":
+                if job.status != "done":
+                    raise HTTPError(409, f"job is {job.status}")
+                return await _send_ndjson(writer, job.articles)
+        raise HTTPError(404, f"no route for {method} {url.path}")
+
+
+def _head(status, content_type, extra=()):
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}", "Connection: close"]
+    lines.extend(f"{name}: {value}" for name, value in extra)
+    return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, payload, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, "application/json", [("Content-Length", len(body)), *headers]) + b"\r\n" + body)
+    await writer.drain()
+
+
+async def _send_ndjson(writer, articles, batch=200):
+    """Stream one JSON object per article; the body ends when the connection closes."""
+    writer.write(_head(200, "application/x-ndjson") + b"\r\n")
+    lines = []
+    for article in articles:
+        lines.append(json.dumps(dict(article), ensure_ascii=False, default=str))
+        if len(lines) >= batch:
+            writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+            lines = []
+            await writer.drain()
+    if lines:
+        writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+    await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, **options):
+    """Run the service until cancelled."""
+    service = IngestionService(**options)
+    await service.start()
+    try:
+        # SIGTERM stops the service like Ctrl+C, removing the spool directory
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):  # Windows
+        pass
+    try:
+        server = await asyncio.start_server(service.handle, host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+class ServiceClient:
+    """Blocking client for a running service (used by the Streamlit apps)."""
+
+    def __init__(self, url, timeout=600):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, data=None, method="GET"):
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def submit(self, data, filename, config=None, retries=30):
+        """Submit a file and return its job status; waits and retries while the queue is full."""
+        query = {"filename": filename}
+        if config is not None:
+            query["config"] = json.dumps(config.to_dict())
+        path = "/jobs?" + urllib.parse.urlencode(query)
+        for attempt in range(retries + 1):
+            try:
+                with self._request(path, data, "POST") as response:
+                    return json.load(response)
+            except urllib.error.HTTPError as exc:
+                if exc.code != 503 or attempt == retries:
+                    raise
+                time.sleep(float(exc.headers.get("Retry-After", 1)))
+
+    def status(self, job_id):
+        with self._request(f"/jobs/{job_id}") as response:
+            return json.load(response)
+
+    def results(self, job_id):
+        """Yield the articles of a finished job."""
+        with self._request(f"/jobs/{job_id}/results") as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+    def process(self, data, filename, config=None, poll=0.2):
+        """Submit, wait for the job and return its articles as a list."""
+        job = self.submit(data, filename, config)
+        deadline = time.monotonic() + self.timeout
+        while job["status"] in ("queued", "running"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"job {job['job']} still {job['status']}")
+            time.sleep(poll)
+            job = self.status(job["job"])
+        if job["status"] == "error":
+            raise RuntimeError(job["error"])
+        return list(self.results(job["job"]))
@@ -0,0 +1,151 @@
+"""Streaming output sinks for article dicts.
+
+Each sink writes rows as they arrive from the article generator, so an edition
+never has to be held as a DataFrame or a full CSV string. Sinks write to a
+path or a binary file object; :func:`to_bytes` renders into an in-memory
+buffer for ``st.download_button``, with no shared file on disk.
+
+    with open_sink("csv", "articles.csv", fieldnames) as sink:
+        sink.write_all(articles)
+"""
+
+import csv
+import io
+import json
+
+from .instrument import stage
+
+SINK_FORMATS = ("csv", "jsonl", "parquet")
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def article_fieldnames(metadata_fields, leading=(), trailing=()):
+    """Output columns for split articles: ``leading``, the fields, BODY, Rodape and ``trailing``."""
+    names = [*leading, *(field.strip() for field in metadata_fields), "BODY", "Rodape", *trailing]
+    return list(dict.fromkeys(names))
+
+
+class Sink:
+    """Base class: open the target, write rows one by one, close."""
+
+    def __init__(self, target, fieldnames):
+        self.fieldnames = list(fieldnames)
+        self.count = 0
+        self._owns_file = isinstance(target, (str, bytes)) or hasattr(target, "__fspath__")
+        self._file = open(target, "wb") if self._owns_file else target
+
+    def write(self, row):
+        raise NotImplementedError
+
+    def write_all(self, rows):
+        with stage("write"):
+            for row in rows:
+                self.write(row)
+        return self.count
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _TextSink(Sink):
+    def __init__(self, target, fieldnames):
+        super().__init__(target, fieldnames)
+        self._text = io.TextIOWrapper(self._file, encoding="utf-8", newline="", write_through=True)
+
+    def close(self):
+        self._text.flush()
+        # leave a caller-provided binary stream open
+        self._text.detach()
+        super().close()
+
+
+class CsvSink(_TextSink):
+    """CSV with a header row; missing columns are written empty."""
+
+    def __init__(self, target, fieldnames):
+        super().__init__(target, fieldnames)
+        self._writer = csv.DictWriter(
+            self._text, fieldnames=self.fieldnames, restval="", extrasaction="ignore", lineterminator="\n"
+        )
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self.count += 1
+
+
+class JsonlSink(_TextSink):
+    """One JSON object per line, keys in ``fieldnames`` order."""
+
+    def write(self, row):
+        record = {name: row.get(name, "") for name in self.fieldnames}
+        self._text.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._text.write("\n")
+        self.count += 1
+
+
+class ParquetSink(Sink):
+    """Parquet file written in row groups of ``row_group_size`` rows (needs pyarrow)."""
+
+    def __init__(self, target, fieldnames, row_group_size=1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from exc
+        super().__init__(target, fieldnames)
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self._schema = pa.schema([(name, pa.string()) for name in self.fieldnames])
+        self._writer = pq.ParquetWriter(self._file, self._schema)
+        self._columns = {name: [] for name in self.fieldnames}
+        self._pending = 0
+
+    def write(self, row):
+        for name, column in self._columns.items():
+            value = row.get(name, "")
+            column.append(None if value is None else str(value))
+        self._pending += 1
+        self.count += 1
+        if self._pending >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        table = self._pa.Table.from_pydict(self._columns, schema=self._schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._columns = {name: [] for name in self.fieldnames}
+        self._pending = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        super().close()
+
+
+_SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+def open_sink(sink_format, target, fieldnames, **options):
+    """Create the sink for ``sink_format`` (one of :data:`SINK_FORMATS`)."""
+    try:
+        sink_class = _SINKS[sink_format]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {sink_format!r}") from None
+    return sink_class(target, fieldnames, **options)
+
+
+def to_bytes(rows, sink_format, fieldnames, **options):
+    """Render ``rows`` into an in-memory buffer and return its bytes."""
+    buffer = io.BytesIO()
+    with open_sink(sink_format, buffer, fieldnames, **options) as sink:
+        sink.write_all(rows)
+    return buffer.getvalue()
@@ -0,0 +1,118 @@
+"""Incremental article splitter.
+
+Paragraphs are fed one at a time and each article is yielded as soon as the
+next ``ARTICLE_START`` delimiter (or the end of the input) is reached, so peak
+memory is bounded by the largest article instead of the whole edition.
+"""
+
+from .classifier import LineClassifier
+
+RODAPE_MARKER = "#Rodape:"
+HTML_PARAGRAPH_OPEN = "<p>"
+
+
+class ArticleSplitter:
+    """State machine that turns a stream of paragraphs into article dicts.
+
+    - ``article_start``: delimiter that opens a new article.
+    - ``metadata_fields``: field names recognised on metadata lines.
+    - ``field_prefix``: text written before a field name in the source
+      (``"#"`` when lines look like ``#Titulo: ...``). The prefix is not part
+      of the resulting dict key.
+    - ``html``: paragraphs are HTML, so the footer marker is ``<p>#Rodape:``
+      and the ``<p>`` is kept on the Rodape value.
+    - ``strip_body``: strip whitespace around BODY and Rodape after the
+      footer has been split off.
+    """
+
+    def __init__(self, article_start, metadata_fields, field_prefix="", html=False, strip_body=True):
+        self.article_start = article_start
+        self.metadata_fields = list(metadata_fields)
+        self.field_prefix = field_prefix
+        self.html = html
+        self.strip_body = strip_body
+        self._classifier = LineClassifier(self.metadata_fields, field_prefix=field_prefix)
+        self._reset()
+
+    def _reset(self):
+        self._metadata = {}
+        self._body_lines = []
+        self._has_lines = False
+
+    def feed(self, paragraph):
+        """Consume one paragraph and yield any article it completes."""
+        for line in paragraph.splitlines():
+            # The delimiter may appear anywhere in a line, exactly like
+            # text.split(ARTICLE_START) on the joined document.
+            chunks = line.split(self.article_start)
+            self._add_line(chunks[0])
+            for chunk in chunks[1:]:
+                article = self._finish()
+                if article is not None:
+                    yield article
+                self._add_line(chunk)
+
+    def close(self):
+        """Yield the last article, if any, once the input is exhausted."""
+        article = self._finish()
+        if article is not None:
+            yield article
+
+    def _add_line(self, line):
+        line = line.strip()
+        if not line:
+            return
+        self._has_lines = True
+
+        match = self._classifier.match_field(line)
+        if match is not None:
+            field, value = match
+            self._metadata[field] = value
+        else:
+            self._body_lines.append(line)
+
+    def _finish(self):
+        article = self._collect()
+        if article is not None:
+            fill_missing_fields(article, self.metadata_fields)
+        return article
+
+    def _collect(self):
+        """Build the pending article (found metadata, BODY, Rodape) and reset."""
+        if not self._has_lines:
+            return None
+        metadata = self._metadata
+        body_text = "\n".join(self._body_lines).strip()
+        self._reset()
+
+        marker = HTML_PARAGRAPH_OPEN + RODAPE_MARKER if self.html else RODAPE_MARKER
+        if marker in body_text:
+            body_part, rodape_part = body_text.split(marker, 1)
+            if self.html:
+                rodape_part = HTML_PARAGRAPH_OPEN + rodape_part
+            if self.strip_body:
+                body_part, rodape_part = body_part.strip(), rodape_part.strip()
+            metadata["BODY"] = body_part
+            metadata["Rodape"] = rodape_part
+        else:
+            metadata["BODY"] = body_text
+        return metadata
+
+
+def fill_missing_fields(article, metadata_fields):
+    """Fill missing metadata keys with empty string."""
+    for field in metadata_fields:
+        if field not in article:
+            article[field] = ""
+    return article
+
+
+def iter_articles(paragraphs, article_start, metadata_fields, **options):
+    """Yield article dicts from an iterable of paragraph strings.
+
+    ``options`` are passed on to :class:`ArticleSplitter`.
+    """
+    splitter = ArticleSplitter(article_start, metadata_fields, **options)
+    for paragraph in paragraphs:
+        yield from splitter.feed(paragraph)
+    yield from splitter.close()
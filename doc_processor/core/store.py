@@ -0,0 +1,231 @@
+"""Persistent results store: parse only the files that changed.
+
+:class:`ResultStore` keeps, in one SQLite file, a ``documents`` row per
+source (absolute path, size, modification time, SHA-256 of the content, the
+configuration it was split with, article count) and its ``articles`` (one
+row per article, the article dict as JSON, in document order).
+
+:meth:`ResultStore.refresh` decides per file whether the stored articles are
+still valid:
+
+- same size, modification time and configuration: skipped without reading
+  the file;
+- otherwise the content is hashed, and if only the modification time
+  changed (a copy, a touch) the row is updated without parsing;
+- new or changed files are parsed with :func:`core.batch.process_batch` and
+  their articles replace the old ones (upsert).
+
+Exports then read the articles back from the store
+(:meth:`ResultStore.iter_batch_articles`), so a monthly run over the whole
+archive costs about as much as the files that changed. A file that fails to
+parse is removed from the store (it is retried on the next run) and left out
+of the export, as in a run without a store.
+
+The configuration is compared without ``fast``, which does not change the
+output.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from .batch import SOURCE_FIELD, BatchResult, collect_files, process_batch
+from .cache import content_hash, settings_key
+from .inputs import open_input
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime_ns INTEGER,
+    content_hash TEXT NOT NULL,
+    config TEXT NOT NULL,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    position INTEGER NOT NULL,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (document_id, position)
+) WITHOUT ROWID;
+"""
+
+
+def file_hash(path):
+    """SHA-256 of a file, hashed straight from its memory map."""
+    with open_input(path) as source:
+        if hasattr(source, "getbuffer"):
+            with source.getbuffer() as view:
+                return content_hash(view)
+        return content_hash(source.read())
+
+
+def file_identity(path):
+    """``(size, mtime_ns, content hash)`` of a file, stat first.
+
+    Taken before parsing, so a file that changes meanwhile no longer matches
+    on the next check.
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, file_hash(path)
+
+
+class ResultStore:
+    """Documents and their articles in the SQLite file ``path`` (see the module docstring)."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def documents(self):
+        """``{source: (content_hash, config, article_count)}`` of the stored documents."""
+        rows = self._db.execute("SELECT source, content_hash, config, article_count FROM documents ORDER BY source")
+        return {source: (digest, json.loads(config), count) for source, digest, config, count in rows}
+
+    def _row(self, path):
+        # keyed by absolute path, so runs from another directory find their files
+        return self._db.execute(
+            "SELECT id, size, mtime_ns, content_hash, config FROM documents WHERE source = ?", (os.path.abspath(path),)
+        ).fetchone()
+
+    def is_current(self, path, settings):
+        """True if the stored articles of ``path`` are valid for this file and ``settings``.
+
+        When only the modification time changed the row is updated, so the
+        next check takes the fast path again.
+        """
+        row = self._row(path)
+        key = settings_key(settings)
+        if row is None or row[4] != key:
+            return False
+        stat = os.stat(path)
+        if (row[1], row[2]) == (stat.st_size, stat.st_mtime_ns):
+            return True
+        if file_hash(path) != row[3]:
+            return False
+        with self._db:
+            self._db.execute(
+                "UPDATE documents SET size = ?, mtime_ns = ? WHERE id = ?", (stat.st_size, stat.st_mtime_ns, row[0])
+            )
+        return True
+
+    def stale(self, paths, settings):
+        """The paths among ``paths`` whose articles must be (re)extracted."""
+        return [path for path in paths if not self.is_current(path, settings)]
+
+    def put(self, path, articles, settings, identity=None):
+        """Upsert ``path`` with its ``articles``; returns the number stored.
+
+        ``identity`` is the :func:`file_identity` of the file the articles
+        were parsed from, taken before parsing; by default the file as it is
+        now. The articles are consumed as a stream, and replace the old ones
+        in one transaction.
+        """
+        size, mtime_ns, digest = identity or file_identity(path)
+        with self._db:
+            self._db.execute(
+                """
+                INSERT INTO documents (source, size, mtime_ns, content_hash, config, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET
+                    size = excluded.size, mtime_ns = excluded.mtime_ns, content_hash = excluded.content_hash,
+                    config = excluded.config, updated_at = excluded.updated_at
+                """,
+                (os.path.abspath(path), size, mtime_ns, digest, settings_key(settings), time.time()),
+            )
+            document_id = self._row(path)[0]
+            self._db.execute("DELETE FROM articles WHERE document_id = ?", (document_id,))
+            count = 0
+
+            def rows():
+                nonlocal count
+                for position, article in enumerate(articles):
+                    count += 1
+                    yield document_id, position, json.dumps(dict(article), ensure_ascii=False)
+
+            self._db.executemany("INSERT INTO articles VALUES (?, ?, ?)", rows())
+            self._db.execute("UPDATE documents SET article_count = ? WHERE id = ?", (count, document_id))
+        return count
+
+    def remove(self, path):
+        """Drop ``path`` and its articles; returns False if it was not stored."""
+        row = self._row(path)
+        if row is None:
+            return False
+        with self._db:
+            self._db.execute("DELETE FROM articles WHERE document_id = ?", (row[0],))
+            self._db.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+        return True
+
+    def articles(self, path):
+        """The stored articles of ``path``, as dicts in document order."""
+        rows = self._db.execute(
+            """
+            SELECT a.fields FROM articles AS a JOIN documents AS d ON d.id = a.document_id
+            WHERE d.source = ? ORDER BY a.position
+            """,
+            (os.path.abspath(path),),
+        )
+        for (fields,) in rows:
+            yield json.loads(fields)
+
+    def refresh(self, inputs, config, workers=None, recursive=False):
+        """Bring the store up to date with ``inputs``; returns an iterator of :class:`BatchResult`.
+
+        The files are checked when this is called, and ``skipped`` holds the
+        unchanged ones right away. The changed files are then parsed as the
+        iterator is consumed, one result per file.
+        """
+        files = collect_files(inputs, recursive)
+        stale = self.stale(files, config)
+        stale_paths = set(stale)
+        self.skipped = [path for path in files if path not in stale_paths]
+        # taken before parsing, so a file that changes meanwhile stays stale
+        identities = {}
+        for path in stale:
+            try:
+                identities[path] = file_identity(path)
+            except OSError:
+                pass  # reported by process_batch
+        return self._update(stale, identities, config, workers)
+
+    def _update(self, paths, identities, config, workers):
+        if not paths:
+            return
+        for result in process_batch(paths, config, workers=workers):
+            if result.error is None:
+                self.put(result.source, result.articles, config, identities.get(result.source))
+            else:
+                self.remove(result.source)
+            yield result
+
+    def iter_batch_articles(self, inputs, recursive=False, errors=None):
+        """Stored articles of ``inputs`` tagged with the source file, like :func:`core.batch.iter_batch_articles`.
+
+        Files not in the store (failed ones) are skipped; with ``errors`` a
+        list, a :class:`BatchResult` is appended for each of them.
+        """
+        for path in collect_files(inputs, recursive):
+            if self._row(path) is None:
+                if errors is not None:
+                    errors.append(BatchResult(path, [], "not in the store"))
+                continue
+            source = os.path.basename(path)
+            for article in self.articles(path):
+                yield {SOURCE_FIELD: source, **article}
@@ -0,0 +1,260 @@
+"""Synthetic edition generator for tests and benchmarks.
+
+Writes .docx, .odt and .json editions in the source format the processors
+expect (``ARTICLE_START`` lines, ``#Field: value`` metadata, body, ``#Rodape:``)
+with a configurable number of articles, body length, metadata density,
+formatting runs and hyperlinks. The documents are written directly as zip
+packages, so neither python-docx nor odfpy is needed, and the output is
+deterministic for a given ``seed``.
+
+    generate_edition("edition.docx", articles=1000, run_density=4, hyperlinks=2)
+"""
+
+import json
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from .config import ARTICLE_START, METADATA_FIELDS
+
+WORDS = (
+    "associação cultural jornal leitores edição artigo cidade mercado centro histórico "
+    "praia comunidade festa igreja escola teatro música biblioteca desporto clube "
+    "memória tradição rua avenida jardim rio ponte barco pescadores história "
+    "presidente câmara freguesia população cultura notícia reportagem entrevista"
+).split()
+GENERATED_FORMATS = ("docx", "odt", "json")
+
+
+class SyntheticArticle:
+    __slots__ = ("metadata", "paragraphs", "rodape", "links")
+
+    def __init__(self, metadata, paragraphs, rodape, links):
+        self.metadata = metadata
+        self.paragraphs = paragraphs
+        self.rodape = rodape
+        self.links = links
+
+
+def _sentence(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def generate_articles(
+    count,
+    body_paragraphs=5,
+    words_per_paragraph=60,
+    metadata_density=1.0,
+    hyperlinks=0,
+    metadata_fields=METADATA_FIELDS,
+    seed=0,
+):
+    """Build ``count`` synthetic articles.
+
+    ``metadata_density`` is the fraction of ``metadata_fields`` present in each
+    article (``Titulo`` is always kept); ``hyperlinks`` is the number of links
+    per article.
+    """
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        metadata = {}
+        for field in metadata_fields:
+            if field == metadata_fields[0] or rng.random() < metadata_density:
+                metadata[field] = f"{_sentence(rng, 4)[:-1]} {i}"
+        paragraphs = [_sentence(rng, words_per_paragraph) for _ in range(body_paragraphs)]
+        links = [f"https://example.org/artigo/{i}/{n}" for n in range(hyperlinks)]
+        articles.append(SyntheticArticle(metadata, paragraphs, _sentence(rng, 12), links))
+    return articles
+
+
+# --- .docx -----------------------------------------------------------------
+
+_DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+_DOCX_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+_HYPERLINK_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+
+def _docx_run(text, bold=False, italic=False, underline=False):
+    props = ("<w:b/>" if bold else "") + ("<w:i/>" if italic else "") + ('<w:u w:val="single"/>' if underline else "")
+    rpr = f"<w:rPr>{props}</w:rPr>" if props else ""
+    return f'<w:r>{rpr}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def _split_runs(text, runs):
+    words = text.split(" ")
+    size = max(1, -(-len(words) // max(1, runs)))
+    return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "") for i in range(0, len(words), size)]
+
+
+def write_docx(path, articles, article_start=ARTICLE_START, field_prefix="#", run_density=1, seed=0):
+    """Write ``articles`` as a .docx; body paragraphs are split into ``run_density`` formatted runs."""
+    rng = random.Random(seed)
+    rels = []
+    body = []
+
+    def paragraph(*runs):
+        body.append(f"<w:p>{''.join(runs)}</w:p>")
+
+    for article in articles:
+        paragraph(_docx_run(article_start))
+        for field, value in article.metadata.items():
+            paragraph(_docx_run(f"{field_prefix}{field}: {value}"))
+        paragraph()
+        links = list(article.links)
+        for text in article.paragraphs:
+            runs = []
+            for chunk in _split_runs(text, run_density):
+                formatted = run_density > 1 and rng.random() < 0.5
+                runs.append(_docx_run(chunk, formatted and rng.random() < 0.5, formatted and rng.random() < 0.5,
+                                      formatted and rng.random() < 0.3))
+            if links:
+                rel_id = f"rId{len(rels) + 10}"
+                rels.append(f'<Relationship Id="{rel_id}" Type="{_HYPERLINK_REL}" Target={quoteattr(links.pop())} TargetMode="External"/>')
+                runs.append(f'<w:hyperlink r:id="{rel_id}">{_docx_run("ligação")}</w:hyperlink>')
+            paragraph(*runs)
+        for link in links:
+            rel_id = f"rId{len(rels) + 10}"
+            rels.append(f'<Relationship Id="{rel_id}" Type="{_HYPERLINK_REL}" Target={quoteattr(link)} TargetMode="External"/>')
+            paragraph(f'<w:hyperlink r:id="{rel_id}">{_docx_run(link)}</w:hyperlink>')
+        paragraph(_docx_run(f"#Rodape: {article.rodape}"))
+        paragraph()
+
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f"<w:body>{''.join(body)}<w:sectPr/></w:body></w:document>"
+    )
+    document_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f"{''.join(rels)}</Relationships>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_ROOT_RELS)
+        zf.writestr("word/document.xml", document)
+        zf.writestr("word/_rels/document.xml.rels", document_rels)
+
+
+# --- .odt ------------------------------------------------------------------
+
+_ODT_MANIFEST = """<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+<manifest:file-entry manifest:full-path="/" manifest:media-type="application/vnd.oasis.opendocument.text"/>
+<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>"""
+_ODT_STYLES = (
+    '<office:automatic-styles>'
+    '<style:style style:name="T1" style:family="text"><style:text-properties fo:font-weight="bold"/></style:style>'
+    '<style:style style:name="T2" style:family="text"><style:text-properties fo:font-style="italic"/></style:style>'
+    '<style:style style:name="T3" style:family="text"><style:text-properties style:text-underline-style="solid"/></style:style>'
+    '</office:automatic-styles>'
+)
+
+
+def write_odt(path, articles, article_start=ARTICLE_START, field_prefix="#", run_density=1, seed=0):
+    """Write ``articles`` as an .odt; body paragraphs get ``run_density`` spans."""
+    rng = random.Random(seed)
+    body = []
+    for article in articles:
+        body.append(f"<text:p>{escape(article_start)}</text:p>")
+        for field, value in article.metadata.items():
+            body.append(f"<text:p>{escape(f'{field_prefix}{field}: {value}')}</text:p>")
+        links = list(article.links)
+        for text in article.paragraphs:
+            parts = []
+            for chunk in _split_runs(text, run_density):
+                if run_density > 1 and rng.random() < 0.5:
+                    parts.append(f'<text:span text:style-name="T{rng.randint(1, 3)}">{escape(chunk)}</text:span>')
+                else:
+                    parts.append(escape(chunk))
+            if links:
+                parts.append(f'<text:a xlink:href={quoteattr(links.pop())}>ligação</text:a>')
+            body.append(f"<text:p>{''.join(parts)}</text:p>")
+        for link in links:
+            body.append(f'<text:p><text:a xlink:href={quoteattr(link)}>{escape(link)}</text:a></text:p>')
+        body.append(f"<text:p>{escape(f'#Rodape: {article.rodape}')}</text:p>")
+        body.append("<text:p/>")
+
+    content = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+        'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+        'xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" office:version="1.2">'
+        f"{_ODT_STYLES}<office:body><office:text>{''.join(body)}</office:text></office:body>"
+        "</office:document-content>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        # the mimetype entry must come first and be stored uncompressed
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.text", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/manifest.xml", _ODT_MANIFEST)
+        zf.writestr("content.xml", content)
+
+
+# --- .json -----------------------------------------------------------------
+
+def write_json(path, articles, seed=0, **_):
+    """Write ``articles`` as a JSON edition export (processor_json format)."""
+    rng = random.Random(seed)
+    edition = {
+        "edition_title": "Edição sintética",
+        "edition_date": "2025-01-01",
+        "edition_number": seed,
+        "ficha_tecnica": _sentence(rng, 20),
+        "editorial": {"autor": "Redação", "corpo": _sentence(rng, 80)},
+        "articles": [
+            {
+                "titulo": article.metadata.get("Titulo", ""),
+                "subtitulo": article.metadata.get("SubTitulo", ""),
+                "autor": article.metadata.get("Autor", ""),
+                "paginas": f"{i + 1}-{i + 2}",
+                "num_imagens": rng.randint(0, 4),
+                "tags": rng.sample(WORDS, 3),
+                "corpo": "\n".join(article.paragraphs + article.links),
+            }
+            for i, article in enumerate(articles)
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(edition, f, ensure_ascii=False)
+
+
+_WRITERS = {"docx": write_docx, "odt": write_odt, "json": write_json}
+
+
+def generate_edition(
+    path,
+    articles=100,
+    body_paragraphs=5,
+    words_per_paragraph=60,
+    metadata_density=1.0,
+    run_density=1,
+    hyperlinks=0,
+    article_start=ARTICLE_START,
+    metadata_fields=METADATA_FIELDS,
+    field_prefix="#",
+    seed=0,
+):
+    """Write a synthetic edition to ``path``; the format comes from its extension."""
+    file_format = os.path.splitext(path)[1].lower().lstrip(".")
+    if file_format not in _WRITERS:
+        raise ValueError(f"Unsupported synthetic format: {file_format!r} (use one of {GENERATED_FORMATS})")
+    items = generate_articles(articles, body_paragraphs, words_per_paragraph, metadata_density, hyperlinks,
+                              tuple(metadata_fields), seed)
+    options = {"article_start": article_start, "field_prefix": field_prefix, "run_density": run_density}
+    _WRITERS[file_format](path, items, seed=seed, **({} if file_format == "json" else options))
+    return len(items)
@@ -0,0 +1,300 @@
+"""Columnar, array-backed article store.
+
+A list of article dicts repeats every key in every row and keeps one Python
+str object per value. :class:`ArticleTable` stores each column once instead:
+
+- text columns as a single UTF-8 buffer plus an ``int64`` offset array,
+- integer columns (such as ``num_imagens`` of JSON exports) as an ``int64``
+  array,
+- a presence mask only for columns that some rows do not have,
+
+with interned column names. Rows are read through :class:`ArticleRow`, a
+``__slots__`` view that behaves like a read-only dict (``row["BODY"]``,
+``row.get(...)``, ``{**row}``), so sinks, the search index and
+``pd.DataFrame`` accept a table where they accept a list of dicts.
+
+The buffers map directly onto Arrow ``large_string``/``int64`` arrays, so
+:meth:`ArticleTable.to_arrow` and :meth:`ArticleTable.to_pandas` do not copy
+the text, and :meth:`ArticleTable.save` writes the raw buffers behind a small
+JSON header (that is also the pickle format, used when batch workers send
+their results back).
+
+    table = ArticleTable.from_rows(process_document("edition.docx", ".docx"))
+    table[0]["Titulo"], len(table), table.nbytes
+    table.save("edition.articles")
+"""
+
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"ARTTBL1\n"
+TEXT = "text"
+INT = "int"
+
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class _Column:
+    """One column: text (UTF-8 buffer + offsets) or int (int64 array), with optional presence mask."""
+
+    __slots__ = ("kind", "data", "offsets", "values", "present", "length")
+
+    def __init__(self, length=0):
+        self.kind = INT
+        self.values = array("q")
+        self.data = None
+        self.offsets = None
+        self.present = None
+        self.length = 0
+        for _ in range(length):
+            self.append_missing()
+
+    def append(self, value):
+        if self.kind == INT:
+            if type(value) is int and _INT_MIN <= value <= _INT_MAX:
+                self.values.append(value)
+                self._mark(1)
+                return
+            self._to_text()
+        if value is None:
+            value = ""
+        self.data += str(value).encode("utf-8")
+        self.offsets.append(len(self.data))
+        self._mark(1)
+
+    def append_missing(self):
+        if self.present is None:
+            self.present = array("b", [1]) * self.length
+        if self.kind == INT:
+            self.values.append(0)
+        else:
+            self.offsets.append(len(self.data))
+        self._mark(0)
+
+    def _mark(self, flag):
+        if self.present is not None:
+            self.present.append(flag)
+        self.length += 1
+
+    def _to_text(self):
+        data = bytearray()
+        offsets = array("q", [0])
+        for i, value in enumerate(self.values):
+            if self.present is None or self.present[i]:
+                data += str(value).encode("utf-8")
+            offsets.append(len(data))
+        self.kind = TEXT
+        self.data, self.offsets, self.values = data, offsets, None
+
+    def has(self, i):
+        return self.present is None or bool(self.present[i])
+
+    def value(self, i):
+        if self.kind == INT:
+            return self.values[i]
+        offsets = self.offsets
+        return str(self.data[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def buffers(self):
+        if self.kind == INT:
+            buffers = [self.values]
+        else:
+            buffers = [self.offsets, self.data]
+        if self.present is not None:
+            buffers.append(self.present)
+        return buffers
+
+    @property
+    def nbytes(self):
+        return sum(memoryview(buffer).nbytes for buffer in self.buffers())
+
+
+class ArticleRow(Mapping):
+    """Read-only dict view of one table row (keys in column order, missing values left out)."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        column = self._table._columns[key]
+        if not column.has(self._index):
+            raise KeyError(key)
+        return column.value(self._index)
+
+    def __iter__(self):
+        i = self._index
+        return (name for name, column in self._table._columns.items() if column.has(i))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"ArticleRow({dict(self)!r})"
+
+
+class ArticleTable:
+    """Immutable columnar table of article rows; see the module docstring."""
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns, length):
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_rows(cls, rows, fieldnames=()):
+        """Build a table from an iterable of dicts, consumed one row at a time.
+
+        Columns appear in ``fieldnames`` order, then in the order their keys
+        are first seen. Columns holding only ints stay ints; other values are
+        stored as text (``None`` as "").
+        """
+        columns = {sys.intern(name): _Column() for name in fieldnames}
+        length = 0
+        for row in rows:
+            for name, value in row.items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[sys.intern(name)] = _Column(length)
+                column.append(value)
+            length += 1
+            for column in columns.values():
+                if column.length < length:
+                    column.append_missing()
+        return cls(columns, length)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ArticleRow(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ArticleTable index out of range")
+        return ArticleRow(self, index)
+
+    def __iter__(self):
+        return (ArticleRow(self, i) for i in range(self._length))
+
+    def __repr__(self):
+        return f"ArticleTable({self._length} rows, columns={self.fieldnames!r})"
+
+    @property
+    def fieldnames(self):
+        return list(self._columns)
+
+    @property
+    def nbytes(self):
+        """Size of the column buffers in bytes."""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def column(self, name):
+        """All values of column ``name`` as a list (None where a row has no value)."""
+        column = self._columns[name]
+        return [column.value(i) if column.has(i) else None for i in range(self._length)]
+
+    def to_arrow(self):
+        """``pyarrow.Table`` over the same buffers (text is not copied)."""
+        import pyarrow as pa
+
+        arrays = []
+        for column in self._columns.values():
+            validity = None
+            nulls = 0
+            if column.present is not None:
+                import numpy as np
+
+                mask = np.frombuffer(column.present, dtype=np.int8).astype(bool)
+                validity = pa.py_buffer(np.packbits(mask, bitorder="little"))
+                nulls = int(self._length - mask.sum())
+            if column.kind == INT:
+                buffers = [validity, pa.py_buffer(column.values)]
+                arrays.append(pa.Array.from_buffers(pa.int64(), self._length, buffers, nulls))
+            else:
+                buffers = [validity, pa.py_buffer(column.offsets), pa.py_buffer(column.data)]
+                arrays.append(pa.Array.from_buffers(pa.large_string(), self._length, buffers, nulls))
+        return pa.Table.from_arrays(arrays, names=self.fieldnames)
+
+    def to_pandas(self):
+        """DataFrame with Arrow-backed columns sharing the table buffers."""
+        import pandas as pd
+
+        return self.to_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+
+    # --- serialization ---------------------------------------------------
+
+    def tobytes(self):
+        """The table in the :meth:`save` format."""
+        header = {"length": self._length, "byteorder": sys.byteorder, "columns": []}
+        payload = []
+        for name, column in self._columns.items():
+            buffers = column.buffers()
+            header["columns"].append({
+                "name": name,
+                "kind": column.kind,
+                "present": column.present is not None,
+                "sizes": [memoryview(buffer).nbytes for buffer in buffers],
+            })
+            payload.extend(buffers)
+        encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        return b"".join([MAGIC, struct.pack("<Q", len(encoded)), encoded, *(bytes(b) for b in payload)])
+
+    @classmethod
+    def frombytes(cls, data):
+        """Rebuild a table written by :meth:`tobytes`."""
+        view = memoryview(data)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not an ArticleTable file")
+        position = len(MAGIC) + 8
+        (header_size,) = struct.unpack("<Q", view[len(MAGIC):position])
+        header = json.loads(bytes(view[position:position + header_size]))
+        position += header_size
+        swap = header["byteorder"] != sys.byteorder
+
+        columns = {}
+        for spec in header["columns"]:
+            buffers = []
+            for size in spec["sizes"]:
+                buffers.append(view[position:position + size])
+                position += size
+            column = _Column()
+            column.kind = spec["kind"]
+            column.length = header["length"]
+            if column.kind == INT:
+                column.values = _int_array(buffers.pop(0), swap)
+            else:
+                column.values = None
+                column.offsets = _int_array(buffers.pop(0), swap)
+                column.data = bytes(buffers.pop(0))
+            if spec["present"]:
+                column.present = array("b", bytes(buffers.pop(0)))
+            columns[sys.intern(spec["name"])] = column
+        return cls(columns, header["length"])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.frombytes(f.read())
+
+    def __reduce__(self):
+        return (ArticleTable.frombytes, (self.tobytes(),))
+
+
+def _int_array(buffer, swap):
+    values = array("q")
+    values.frombytes(buffer)
+    if swap:
+        values.byteswap()
+    return values
@@ -0,0 +1,8 @@
+import sys
+
+from core.cli import main
+
+
+# Same as `python -m doc_processor split ...`
+if __name__ == "__main__":
+    sys.exit(main(["split", *sys.argv[1:]]))
@@ -1,7 +1,17 @@
 import json
-import csv
-import pandas as pd
-import streamlit as st
+
+from core import CSV_FIELDNAMES, ArticleTable, iter_edition_rows, iter_ndjson_rows, normalize_articles, to_bytes
+from core.instrument import profile_session, stage
+from core.json_stream import article_row
+from ui import (
+    archive_index_path,
+    show_archive_search,
+    show_articles,
+    show_duplicates,
+    show_normalized,
+    show_performance,
+    upload_digest,
+)
 
 def process_json(input_json):
     """
@@ -19,84 +29,107 @@ def process_json(input_json):
     articles = data.get("articles", [])
 
     # Prepare CSV data
-    csv_data = []
-    for article in articles:
-        csv_data.append({
-            "edition_date": edition_date,
-            "edition_number": edition_number,
-            "titulo": article.get("titulo", ""),
-            "subtitulo": article.get("subtitulo", ""),
-            "autor": article.get("autor", ""),
-            "paginas": article.get("paginas", ""),
-            "num_imagens": article.get("num_imagens", 0),
-            "tags": ", ".join(article.get("tags", [])),
-            "edition_title": edition_title,
-            "corpo": article.get("corpo", "")
-        })
+    csv_data = [article_row(article, data) for article in articles]
 
     return edition_title, edition_number, edition_date, ficha_tecnica, editorial, articles, csv_data
 
 def generate_csv(csv_data):
     """
-    Generate a CSV file from the given data and return it as a string.
+    Generate the CSV for the given rows in memory and return it as bytes.
+    Nothing is written to disk, so concurrent sessions don't share a file.
+    """
+    return to_bytes(csv_data, "csv", CSV_FIELDNAMES)
+
+def read_json_upload(uploaded_file):
+    """
+    Stream the rows of an uploaded JSON export (or NDJSON, one edition per line)
+    without decoding the whole upload into one string.
+    Returns the edition-level fields (of the first edition for NDJSON), the number
+    of editions and the CSV rows as an ArticleTable.
     """
-    csv_file = "articles_output.csv"
-    with open(csv_file, mode="w", newline="", encoding="utf-8") as csvfile:
-        fieldnames = [
-            "edition_date", "edition_number", "titulo", "subtitulo", "autor",
-            "paginas", "num_imagens", "tags","edition_title", "corpo"
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(csv_data)
-    return csv_file
+    if uploaded_file.name.lower().endswith((".ndjson", ".jsonl")):
+        editions = []
+        rows = ArticleTable.from_rows(iter_ndjson_rows(uploaded_file, editions), CSV_FIELDNAMES)
+        return (editions[0] if editions else {}), len(editions), rows
+    edition = {}
+    rows = ArticleTable.from_rows(iter_edition_rows(uploaded_file, edition), CSV_FIELDNAMES)
+    return edition, 1, rows
 
 # --- Streamlit app ---
 if __name__ == "__main__":
+    import pandas as pd
+    import streamlit as st
+
     st.title("📄 Separador Automático de artigos")
     st.write("Faça upload do documento JSON para processar os artigos")
 
-    uploaded_file = st.file_uploader("Upload JSON File", type=["json"])
+    uploaded_file = st.file_uploader("Upload JSON File", type=["json", "ndjson", "jsonl"])
 
     if uploaded_file is not None:
-        # Read and process the uploaded JSON file
-        input_json = uploaded_file.read().decode("utf-8")
-        edition_title, edition_number, edition_date, ficha_tecnica, editorial, articles, csv_data = process_json(input_json)
-
-        # Display edition information
-        st.subheader("Informações da Edição")
-        st.write(f"Título da Edição: {edition_title}")
-        st.write(f"Data da Edição: {edition_date}")
-        st.write(f"Número da Edição: {edition_number}")
-
-        # Display CSV preview
-        st.subheader("CSV Preview")
-        df = pd.DataFrame(csv_data)
-        st.dataframe(df)
-
-        # Generate CSV file for download
-        csv_file = generate_csv(csv_data)
-        with open(csv_file, "rb") as f:
+        with profile_session(label=uploaded_file.name) as profiler:
+            # Stream the uploaded JSON file into CSV rows
+            with stage("process"):
+                edition, edition_count, csv_data = read_json_upload(uploaded_file)
+            ficha_tecnica = edition.get("ficha_tecnica", "")
+            editorial = edition.get("editorial", {})
+
+            # Display edition information
+            st.subheader("Informações da Edição")
+            if edition_count > 1:
+                st.write(f"{edition_count} edições no ficheiro; a mostrar a primeira.")
+            st.write(f"Título da Edição: {edition.get('edition_title', '')}")
+            st.write(f"Data da Edição: {edition.get('edition_date', '')}")
+            st.write(f"Número da Edição: {edition.get('edition_number', '')}")
+
+            # Display CSV preview
+            st.subheader("CSV Preview")
+            with stage("dataframe"):
+                df = csv_data.to_pandas()
+            st.dataframe(df)
+
+            with stage("normalize"):
+                normalized = normalize_articles(df)
+            show_normalized(normalized)
+
+            digest = upload_digest(uploaded_file)
+            archive = archive_index_path()
+            with stage("index"):
+                show_archive_search(csv_data, uploaded_file.name, digest, path=archive)
+
+            with stage("dedup"):
+                show_duplicates(csv_data, uploaded_file.name, digest, path=archive)
+
+            # Generate CSV for download
+            with stage("export"):
+                csv_bytes = generate_csv(csv_data)
             st.download_button(
                 label="Download CSV",
-                data=f,
+                data=csv_bytes,
                 file_name="articles_output.csv",
                 mime="text/csv"
             )
 
-        
-        # Display ficha tecnica and editorial
-        st.subheader("Ficha Técnica")
-        st.write(ficha_tecnica)
+            
+            # Display ficha tecnica and editorial
+            st.subheader("Ficha Técnica")
+            st.write(ficha_tecnica)
+
+            st.subheader("Editorial")
+            st.write(f"Autor: {editorial.get('autor', '')}")
+            st.write(f"Corpo: {editorial.get('corpo', '')}")
+
 
-        st.subheader("Editorial")
-        st.write(f"Autor: {editorial.get('autor', '')}")
-        st.write(f"Corpo: {editorial.get('corpo', '')}")
 
+            # Display article bodies
+            st.subheader("Artigos")
+            def render_article(number, row):
+                with st.expander(f"Artigo {number}: {row['titulo'] or 'Sem Título'}"):
+                    st.write(row["corpo"])
 
+            # only the current page of articles is rendered
+            with stage("render"):
+                show_articles(
+                    csv_data, render_article, fields=("titulo", "autor", "tags"), signature=(uploaded_file.file_id,)
+                )
 
-        # Display article bodies
-        st.subheader("Artigos")
-        for i, article in enumerate(articles):
-            with st.expander(f"Artigo {i + 1}: {article.get('titulo', 'Sem Título')}"):
-                st.write(article.get("corpo", ""))
\ No newline at end of file
+        show_performance(profiler)
@@ -1,11 +1,17 @@
-from docx import Document
-import streamlit as st
 import re
-import pandas as pd
-from io import StringIO
 import os
-from odf.opendocument import load
-from odf.text import P, H, LineBreak
+from core import article_fieldnames, iter_articles, iter_paragraphs, normalize_articles, to_bytes
+from core.instrument import profile_iter, profile_session, stage
+from ui import (
+    archive_index_path,
+    show_archive_search,
+    show_articles,
+    show_duplicates,
+    show_normalized,
+    show_performance,
+    upload_digest,
+    upload_types,
+)
 
 
 #Global definition of article delimiters and field identifiers
@@ -14,68 +20,24 @@ METADATA_FIELDS = ["Titulo", "SubTitulo", "Autor", "Data", "Tag", "Pag", "Numero
 
 
 
+def extract_paragraphs(file, file_extension):
+    """Yield the paragraphs of a Word or ODT document one at a time."""
+    return iter_paragraphs(file, file_extension)
+
+
 def extract_text_from_word(file, file_extension):
     """Extract all text from a Word document."""
-    if file_extension == ".docx":
-        doc = Document(file)
-        text = [p.text for p in doc.paragraphs]
-        return '\n'.join(text)
-    elif file_extension == ".odt":
-        """
-        Extract text from ODT. Collects <text:p> text nodes in document order.
-        """
-        doc = load(file)
-        lines = []
-        paragraphs = doc.getElementsByType(P)
-        for paragraph in paragraphs:
-            text_str = "".join(getattr(n, "data", "") for n in paragraph.childNodes).strip()
-            if text_str:
-                lines.append(text_str)
-
-
-    return "\n".join(lines)
+    return '\n'.join(extract_paragraphs(file, file_extension))
+
+
+def iter_article_split(paragraphs):
+    """Yield articles (body and metadata) as the paragraphs are read."""
+    return iter_articles(paragraphs, ARTICLE_START, METADATA_FIELDS, field_prefix="#", strip_body=False)
+
 
 def article_split(text):
     """Split articles and extract body and metadata."""
-    raw_articles = text.split(ARTICLE_START)
-    articles = []
-
-    # loops articles
-    for raw_article in raw_articles:
-        raw_article = raw_article.strip()
-        if not raw_article:
-            continue #skip empty articles
-
-        lines = [line.strip() for line in raw_article.splitlines() if line.strip()]
-        
-        metadata = {}
-        body_lines = []
-
-        # loops lines to find metadata fields to add them to the metadat dictionary
-        for line in lines:
-            # print(line)
-            if any(line.startswith(f"#{field}:") for field in METADATA_FIELDS):
-                key, value = line.split(":", 1)
-                
-                field = key.lstrip("#").rstrip()
-                metadata[field] = value.strip()
-                
-            # everything else appends to body
-            else:
-                body_lines.append(line)
-        try:
-            (metadata["BODY"], metadata["Rodape"]) = ("\n".join(body_lines).strip()).split("#Rodape:", 1)
-        except:
-            metadata["BODY"] = "\n".join(body_lines).strip()
-
-        # Fill missing metadata keys with empty string
-        for field in METADATA_FIELDS:
-            if field not in metadata:
-                metadata[field] = ""
-
-        articles.append(metadata)
-
-    return articles
+    return list(iter_article_split([text]))
 
 
 # def data_extract(articles):
@@ -88,46 +50,68 @@ def article_split(text):
 
 
 if __name__ == "__main__":
+    import pandas as pd
+    import streamlit as st
+
     # --- Streamlit app ---
     st.title("📄 Separador Automático de artigos")
     st.write("Faça upload do documento.docx ou .odt para separar automaticamente artigos separados por 3 linhas brancas")
 
-    uploaded_file = st.file_uploader("Escolha um documento .docx", type=["docx", "odt"])
+    uploaded_file = st.file_uploader("Escolha um documento", type=upload_types())
     
 
     if uploaded_file:
         filename, file_extension = os.path.splitext(uploaded_file.name)
 
-        text = extract_text_from_word(uploaded_file, file_extension)
-        articles = article_split(text)
+        with profile_session(label=uploaded_file.name) as profiler:
+            with stage("process"):
+                paragraphs = profile_iter("extract", extract_paragraphs(uploaded_file, file_extension), "paragraphs")
+                articles = list(profile_iter("split", iter_article_split(paragraphs), "articles"))
 
-        # data = data_extract(articles)
+            # data = data_extract(articles)
 
-        df = pd.DataFrame(articles)
+            with stage("dataframe"):
+                df = pd.DataFrame(articles)
 
-        #Display the DataFrame as a CSV table
-        st.success(f"✅ encontrados {len(articles)} artigos.")
-        st.dataframe(df)
-        
-        #Generate CSV for download
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
+            #Display the DataFrame as a CSV table
+            st.success(f"✅ encontrados {len(articles)} artigos.")
+            st.dataframe(df)
 
-        st.download_button(
-            label="💾 Download CSV",
-            data=csv_data,
-            file_name="articles.csv",
-            mime="text/csv"
-        )
+            with stage("normalize"):
+                normalized = normalize_articles(df)
+            show_normalized(normalized)
 
-    
-        for i, article in enumerate(articles, 1):
-            st.subheader(f"Artigo {i}")
-            st.text_area(f"{article["Titulo"]}", article["BODY"], height=200)
-            if "Rodape" in article.keys():
-                st.text_area("Rodapé", article["Rodape"], height=60)
+            digest = upload_digest(uploaded_file)
+            archive = archive_index_path()
+            with stage("index"):
+                show_archive_search(articles, uploaded_file.name, digest, [ARTICLE_START, METADATA_FIELDS], archive)
+
+            with stage("dedup"):
+                show_duplicates(articles, uploaded_file.name, digest, [ARTICLE_START, METADATA_FIELDS], archive)
+
+            #Generate CSV for download
+            with stage("export"):
+                fieldnames = article_fieldnames(METADATA_FIELDS)
+                csv_data = to_bytes(articles, "csv", fieldnames)
+
+            st.download_button(
+                label="💾 Download CSV",
+                data=csv_data,
+                file_name="articles.csv",
+                mime="text/csv"
+            )
+
+            def render_article(number, article):
+                st.subheader(f"Artigo {number}")
+                st.text_area(article["Titulo"], article["BODY"], height=200)
+                if "Rodape" in article.keys():
+                    st.text_area("Rodapé", article["Rodape"], height=60)
+
+            # only the current page of articles is rendered
+            with stage("render"):
+                show_articles(articles, render_article, signature=(uploaded_file.file_id,))
 
+        show_performance(profiler)
 
     else:
         st.info("Escolha um documento .docx para começar.")
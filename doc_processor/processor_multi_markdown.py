@@ -1,122 +1,56 @@
-from docx import Document
-import streamlit as st
 import re
-import pandas as pd
-from io import StringIO
 import os
-from odf.opendocument import load
-from odf.text import P, H, LineBreak
+from core import article_fieldnames, docx_paragraph_runs_html, get_classifier, iter_articles, iter_paragraphs, normalize_articles, to_bytes
+from core.instrument import profile_iter, profile_session, stage
+from ui import (
+    archive_index_path,
+    show_archive_search,
+    show_articles,
+    show_duplicates,
+    show_normalized,
+    show_performance,
+    upload_digest,
+    upload_types,
+)
 
 
 #Global definition of article delimiters and field identifiers
 ARTICLE_START = "==Artigo_inicio=="
 METADATA_FIELDS = ["Titulo", "SubTitulo", "Autor", "Data", "Tag", "Pag", "Numero", "Imagens"]
+output_format = "Texto"
 
 
 
+def extract_paragraphs(file, file_extension):
+    """Yield the paragraphs of a Word or ODT document one at a time."""
+    if output_format != "HTML":
+        return iter_paragraphs(file, file_extension)
+    paragraphs = iter_paragraphs(file, file_extension, docx_paragraph_runs_html, html=True)
+    return map(wrap_paragraph_html, paragraphs)
+
+
 def extract_text_from_word(file, file_extension):
     """Extract all text from a Word document."""
-    if file_extension == ".docx":
-        doc = Document(file)
-        if output_format == "HTML":
-            text = [paragraph_to_html(p) for p in doc.paragraphs]
-        else:
-            text = [p.text for p in doc.paragraphs]
-        return '\n'.join(text)
-    elif file_extension == ".odt":
-        """
-        Extract text from ODT. Collects <text:p> text nodes in document order.
-        """
-        doc = load(file)
-        lines = []
-        paragraphs = doc.getElementsByType(P)
-        for paragraph in paragraphs:
-            text_str = "".join(getattr(n, "data", "") for n in paragraph.childNodes).strip()
-            if text_str:
-                lines.append(text_str)
-
-
-    return "\n".join(lines)
+    return '\n'.join(extract_paragraphs(file, file_extension))
+
+
+def iter_article_split(paragraphs):
+    """Yield articles (body and metadata) as the paragraphs are read."""
+    return iter_articles(paragraphs, ARTICLE_START, METADATA_FIELDS, field_prefix="#", html=True, strip_body=False)
+
 
 def article_split(text):
     """Split articles and extract body and metadata."""
-    raw_articles = text.split(ARTICLE_START)
-    articles = []
-
-    # loops articles
-    for raw_article in raw_articles:
-        raw_article = raw_article.strip()
-        if not raw_article:
-            continue #skip empty articles
-
-        lines = [line.strip() for line in raw_article.splitlines() if line.strip()]
-        
-        metadata = {}
-        body_lines = []
-
-        # loops lines to find metadata fields to add them to the metadat dictionary
-        for line in lines:
-            if any(line.startswith(f"#{field}:") for field in METADATA_FIELDS):
-                key, value = line.split(":", 1)
-                
-                field = key.lstrip("#").rstrip()
-                metadata[field] = value.strip()
-                
-            # everything else appends to body
-            else:
-                body_lines.append(line)
-        try:
-            (metadata["BODY"], metadata["Rodape"]) = ("\n".join(body_lines).strip()).split("<p>#Rodape:", 1)
-            metadata["Rodape"] = "<p>" + metadata["Rodape"]
-        except:
-            metadata["BODY"] = "\n".join(body_lines).strip()
-
-        # Fill missing metadata keys with empty string
-        for field in METADATA_FIELDS:
-            if field not in metadata:
-                metadata[field] = ""
-
-        articles.append(metadata)
-
-    return articles
+    return list(iter_article_split([text]))
 
 
 def paragraph_to_html(paragraph):
-    html = ""
-    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
-          'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'}
-    
-    # Process paragraph children (mix of runs and hyperlinks)
-    for child in paragraph._element:
-        # Handle hyperlink elements that contain runs
-        if child.tag.endswith('hyperlink'):
-            rId = child.get('{%s}id' % ns['r'])
-            if rId:
-                try:
-                    url = paragraph.part.rels[rId].target_ref
-                    # Extract text from all runs inside the hyperlink
-                    link_text = "".join(run.text for run in child.findall('.//w:r', ns) if run.text)
-                    if link_text:
-                        html += f'<a href="{url}">{link_text}</a>'
-                except (KeyError, AttributeError):
-                    pass
-        # Handle regular runs
-        elif child.tag.endswith('r'):
-            run_elem = child
-            text = ""
-            for t_elem in run_elem.findall('.//w:t', ns):
-                text += t_elem.text or ""
-            
-            if text:
-                if run_elem.find('.//w:b', ns) is not None:
-                    text = f"<b>{text}</b>"
-                if run_elem.find('.//w:i', ns) is not None:
-                    text = f"<i>{text}</i>"
-                if run_elem.find('.//w:u', ns) is not None:
-                    text = f"<u>{text}</u>"
-                html += text
-    
-    if html.startswith(ARTICLE_START) or any(html.startswith(f"#{field}:") for field in METADATA_FIELDS):
+    return wrap_paragraph_html(docx_paragraph_runs_html(paragraph))
+
+
+def wrap_paragraph_html(html):
+    """Wrap body paragraphs in <p>; delimiter and metadata lines are left bare."""
+    if get_classifier(tuple(METADATA_FIELDS), ARTICLE_START, "#").is_structural(html):
         return html
     else:
         return f"<p>{html}</p>"
@@ -131,47 +65,73 @@ def paragraph_to_html(paragraph):
 
 
 if __name__ == "__main__":
+    import pandas as pd
+    import streamlit as st
+
     # --- Streamlit app ---
     st.title("📄 Separador Automático de artigos")
     st.write("Faça upload do documento.docx ou .odt para separar automaticamente artigos separados por 3 linhas brancas")
 
     output_format = st.radio("Escolha o formato de saída:", ("Texto", "HTML"))
-    uploaded_file = st.file_uploader("Escolha um documento .docx", type=["docx", "odt"])
+    uploaded_file = st.file_uploader("Escolha um documento", type=upload_types())
     
     
     if uploaded_file:
         filename, file_extension = os.path.splitext(uploaded_file.name)
 
-        text = extract_text_from_word(uploaded_file, file_extension)
-        articles = article_split(text)
-
-        # data = data_extract(articles)
-
-        df = pd.DataFrame(articles)
-
-        #Display the DataFrame as a CSV table
-        st.success(f"✅ encontrados {len(articles)} artigos.")
-        st.dataframe(df)
-        
-        #Generate CSV for download
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
-
-        st.download_button(
-            label="💾 Download CSV",
-            data=csv_data,
-            file_name="articles.csv",
-            mime="text/csv"
-        )
-
-    
-        for i, article in enumerate(articles, 1):
-            st.subheader(f"Artigo {i}")
-            st.text_area(f"{article["Titulo"]}", article["BODY"], height=200)
-            if "Rodape" in article.keys():
-                st.text_area("Rodapé", article["Rodape"], height=60)
-
+        with profile_session(label=uploaded_file.name) as profiler:
+            with stage("process"):
+                paragraphs = profile_iter("extract", extract_paragraphs(uploaded_file, file_extension), "paragraphs")
+                articles = list(profile_iter("split", iter_article_split(paragraphs), "articles"))
+
+            # data = data_extract(articles)
+
+            with stage("dataframe"):
+                df = pd.DataFrame(articles)
+
+            #Display the DataFrame as a CSV table
+            st.success(f"✅ encontrados {len(articles)} artigos.")
+            st.dataframe(df)
+
+            with stage("normalize"):
+                normalized = normalize_articles(df)
+            show_normalized(normalized)
+
+            digest = upload_digest(uploaded_file)
+            archive = archive_index_path()
+            with stage("index"):
+                show_archive_search(
+                    articles, uploaded_file.name, digest, [output_format, ARTICLE_START, METADATA_FIELDS], archive
+                )
+
+            with stage("dedup"):
+                show_duplicates(
+                    articles, uploaded_file.name, digest, [output_format, ARTICLE_START, METADATA_FIELDS], archive
+                )
+
+            #Generate CSV for download
+            with stage("export"):
+                fieldnames = article_fieldnames(METADATA_FIELDS)
+                csv_data = to_bytes(articles, "csv", fieldnames)
+
+            st.download_button(
+                label="💾 Download CSV",
+                data=csv_data,
+                file_name="articles.csv",
+                mime="text/csv"
+            )
+
+            def render_article(number, article):
+                st.subheader(f"Artigo {number}")
+                st.text_area(article["Titulo"], article["BODY"], height=200)
+                if "Rodape" in article.keys():
+                    st.text_area("Rodapé", article["Rodape"], height=60)
+
+            # only the current page of articles is rendered
+            with stage("render"):
+                show_articles(articles, render_article, signature=(uploaded_file.file_id, output_format))
+
+        show_performance(profiler)
 
     else:
         st.info("Escolha um documento .docx para começar.")
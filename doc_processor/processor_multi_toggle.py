@@ -1,137 +1,129 @@
-from docx import Document
-import streamlit as st
-import re
-import pandas as pd
-from io import StringIO
 import os
-from odf.opendocument import load
-from odf.text import P, H, LineBreak
+
+import core
+from core import (
+    DocumentCache,
+    IncrementalSplitter,
+    ParagraphIndex,
+    ProcessorConfig,
+    ServiceClient,
+    article_fieldnames,
+    docx_paragraph_runs_html,
+    normalize_articles,
+    to_bytes,
+)
+from core.instrument import profile_session, stage
+from core.sinks import MIME_TYPES
+from ui import (
+    archive_index_path,
+    search_fields,
+    show_archive_search,
+    show_articles,
+    show_duplicates,
+    show_normalized,
+    show_performance,
+    upload_digest,
+    upload_types,
+)
 
 
 #Global definition of article delimiters and field identifiers
 ARTICLE_START = "==Artigo_inicio=="
 METADATA_FIELDS = ["#Titulo", "#SubTitulo", "#Autor", "#Data", "#Tag", "#Pag", "#Numero", "#Imagens"]
+output_format = "Texto"
+
+
+def current_config():
+    """ProcessorConfig for the module settings (which the app's widgets overwrite).
+    Metadata lines are 'Titulo: valor' with the field exactly as listed in METADATA_FIELDS."""
+    return ProcessorConfig(
+        article_start=ARTICLE_START,
+        metadata_fields=METADATA_FIELDS,
+        field_prefix="",
+        output_format=output_format,
+    )
+
 
+def extract_paragraphs(file, file_extension, config=None):
+    """Yield the paragraphs of a Word or ODT document one at a time."""
+    return core.extract_paragraphs(file, file_extension, config or current_config())
 
-def extract_text_from_word(file, file_extension):
+
+def extract_text_from_word(file, file_extension, config=None):
     """Extract all text from a Word document."""
-    if file_extension == ".docx":
-        doc = Document(file)
-        if output_format == "HTML":
-            text = [paragraph_to_html(p) for p in doc.paragraphs]
-        else:
-            text = [p.text for p in doc.paragraphs]
-        return '\n'.join(text)
-    elif file_extension == ".odt":
-        """
-        Extract text from ODT. Collects <text:p> text nodes in document order.
-        """
-        doc = load(file)
-        lines = []
-        paragraphs = doc.getElementsByType(P)
-        for paragraph in paragraphs:
-            text_str = "".join(getattr(n, "data", "") for n in paragraph.childNodes).strip()
-            if text_str:
-                lines.append(text_str)
-
-
-    return "\n".join(lines)
-
-def article_split(text):
-    """Split articles and extract body and metadata.
-    This version treats lines like 'Titulo: valor' (without leading '#') as metadata.
-    It also accepts legacy '#Titulo: valor' forms.
-    """
-    raw_articles = text.split(ARTICLE_START)
-    articles = []
-
-    # loops articles
-    for raw_article in raw_articles:
-        raw_article = raw_article.strip()
-        if not raw_article:
-            continue  # skip empty articles
-
-        lines = [line.strip() for line in raw_article.splitlines() if line.strip()]
-
-        metadata = {}
-        body_lines = []
-
-        # loops lines to find metadata fields to add them to the metadata dictionary
-        for line in lines:
-            is_metadata = any(line.startswith(f"{field}:") for field in METADATA_FIELDS)
-            if is_metadata:
-                key, value = line.split(":", 1)
-                field = key.strip()
-                metadata[field] = value.strip()
-            else:
-                body_lines.append(line)
-
-        # join body lines and try to split Rodape using the appropriate marker
-        body_text = "\n".join(body_lines).strip()
-        try:
-            split_marker = "<p>#Rodape:" if output_format == "HTML" else "#Rodape:"
-            if split_marker in body_text:
-                body_part, rodape_part = body_text.split(split_marker, 1)
-                metadata["BODY"] = body_part.strip()
-                metadata["Rodape"] = ("<p>" + rodape_part) if output_format == "HTML" else rodape_part.strip()
-            else:
-                metadata["BODY"] = body_text
-        except Exception:
-            metadata["BODY"] = body_text
-
-        # Fill missing metadata keys with empty string
-        for field in METADATA_FIELDS:
-            if field not in metadata:
-                metadata[field] = ""
-
-        articles.append(metadata)
-
-    return articles
-
-
-def paragraph_to_html(paragraph):
-    html = ""
-    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
-          'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'}
-
-    # Process paragraph children (mix of runs and hyperlinks)
-    for child in paragraph._element:
-        # Handle hyperlink elements that contain runs
-        if child.tag.endswith('hyperlink'):
-            rId = child.get('{%s}id' % ns['r'])
-            if rId:
-                try:
-                    url = paragraph.part.rels[rId].target_ref
-                    # Extract text from all runs inside the hyperlink
-                    link_text = "".join(run.text for run in child.findall('.//w:r', ns) if run.text)
-                    if link_text:
-                        html += f'<a href="{url}">{link_text}</a>'
-                except (KeyError, AttributeError):
-                    pass
-        # Handle regular runs
-        elif child.tag.endswith('r'):
-            run_elem = child
-            text = ""
-            for t_elem in run_elem.findall('.//w:t', ns):
-                text += t_elem.text or ""
-
-            if text:
-                if run_elem.find('.//w:b', ns) is not None:
-                    text = f"<b>{text}</b>"
-                if run_elem.find('.//w:i', ns) is not None:
-                    text = f"<i>{text}</i>"
-                if run_elem.find('.//w:u', ns) is not None:
-                    text = f"<u>{text}</u>"
-                html += text
-
-    # treat paragraphs that are article start or metadata lines without leading '#'
-    if html.startswith(ARTICLE_START) or any(html.startswith(f"{field}:") for field in METADATA_FIELDS):
-        return html
-    else:
-        return f"<p>{html}</p>"
+    return '\n'.join(extract_paragraphs(file, file_extension, config))
+
+
+def iter_article_split(paragraphs, config=None):
+    """Yield articles (body and metadata) as the paragraphs are read."""
+    return core.split_articles(paragraphs, config or current_config())
+
+
+def article_split(text, config=None):
+    """Split articles and extract body and metadata."""
+    return list(iter_article_split([text], config))
+
+
+def paragraph_runs_to_html(paragraph):
+    """Render the runs and hyperlinks of a paragraph as inline HTML, without the <p> wrapper."""
+    return docx_paragraph_runs_html(paragraph)
+
+
+def wrap_paragraph_html(html, config=None):
+    """Wrap body paragraphs in <p>; delimiter and metadata lines are left bare."""
+    return core.wrap_paragraph_html(html, config or current_config())
+
+
+def paragraph_to_html(paragraph, config=None):
+    return wrap_paragraph_html(paragraph_runs_to_html(paragraph), config)
+
+
+def extract_cacheable_paragraphs(file, file_extension, config=None):
+    """Like extract_paragraphs, but HTML paragraphs are not wrapped yet, so the
+    result does not depend on ARTICLE_START / METADATA_FIELDS and can be cached."""
+    return core.extract_paragraphs(file, file_extension, config or current_config(), wrap=False)
+
+
+def split_cached_paragraphs(paragraphs, config=None):
+    """Split paragraphs produced by extract_cacheable_paragraphs into articles."""
+    return core.split_articles(paragraphs, config or current_config(), wrapped=False)
 
 
 if __name__ == "__main__":
+    import pandas as pd
+    import streamlit as st
+
+    @st.cache_resource
+    def get_document_cache():
+        """Document cache shared by all sessions; set DOC_PROCESSOR_CACHE_DIR to keep it on disk."""
+        return DocumentCache(disk_dir=os.environ.get("DOC_PROCESSOR_CACHE_DIR"))
+
+    def get_incremental_splitter(paragraphs, digest, file_extension):
+        """Indexed paragraphs of the upload, kept in the session while only the
+        delimiter or the metadata fields change, so editing them re-splits incrementally."""
+        key = (digest, file_extension, output_format)
+        if st.session_state.get("splitter_key") != key:
+            st.session_state["splitter"] = IncrementalSplitter(ParagraphIndex(paragraphs, html=output_format == "HTML"))
+            st.session_state["splitter_key"] = key
+        return st.session_state["splitter"]
+
+    def cached_articles(uploaded_file, digest, file_extension, config):
+        """Articles of the upload for ``config``: cached for settings seen before,
+        otherwise split incrementally from the cached paragraphs.
+        ``digest`` is the upload's content hash; the upload is only parsed on a cache miss."""
+
+        def split(paragraphs):
+            return get_incremental_splitter(paragraphs, digest, file_extension).split(config)
+
+        with uploaded_file.getbuffer() as data:
+            return get_document_cache().articles(
+                data, file_extension, config, extract_cacheable_paragraphs, split, digest
+            )
+
+    # with DOC_PROCESSOR_SERVICE_URL set (see `python -m doc_processor serve`) the
+    # parsing runs in the service's worker pool and this app only renders
+    SERVICE_URL = os.environ.get("DOC_PROCESSOR_SERVICE_URL")
+
     # --- Streamlit app ---
     st.title("📄 Separador Automático de artigos")
     st.write("Faça upload do documento .docx ou .odt para separar automaticamente artigos")
@@ -172,38 +164,79 @@ if __name__ == "__main__":
             height=100,
             disabled=True
         )
-    uploaded_file = st.file_uploader("Escolha um documento .docx", type=["docx", "odt"])
+    uploaded_file = st.file_uploader("Escolha um documento", type=upload_types())
 
     if uploaded_file:
         filename, file_extension = os.path.splitext(uploaded_file.name)
 
-        text = extract_text_from_word(uploaded_file, file_extension)
-        articles = article_split(text)
-
-        df = pd.DataFrame(articles)
-
-        # Display the DataFrame as a CSV table
-        st.success(f"✅ encontrados {len(articles)} artigos.")
-        st.dataframe(df)
-
-        # Generate CSV for download
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
-
-        st.download_button(
-            label="💾 Download CSV",
-            data=csv_data,
-            file_name="articles.csv",
-            mime="text/csv"
-        )
-
-        for i, article in enumerate(articles, 1):
-            st.subheader(f"Artigo {i}")
-            st.text_area(article.get("Titulo", ""), article.get("BODY", ""), height=200)
-
-            if "Rodape" in article.keys() and article.get("Rodape"):
-                st.text_area("Rodapé", article.get("Rodape", ""), height=60)
+        with profile_session(label=uploaded_file.name) as profiler:
+            # hashed once per rerun, from the upload's buffer
+            digest = upload_digest(uploaded_file)
+
+            # reuse the parse from previous reruns of the same upload, and the
+            # articles the new delimiter / fields leave unchanged
+            with stage("process"):
+                if SERVICE_URL:
+                    articles = ServiceClient(SERVICE_URL).process(
+                        uploaded_file.getvalue(), uploaded_file.name, current_config()
+                    )
+                else:
+                    articles = cached_articles(uploaded_file, digest, file_extension, current_config())
+
+            with stage("dataframe"):
+                df = pd.DataFrame(articles)
+
+            # Display the DataFrame as a CSV table
+            st.success(f"✅ encontrados {len(articles)} artigos.")
+            st.dataframe(df)
+
+            with stage("normalize"):
+                normalized = normalize_articles(df)
+            show_normalized(normalized)
+
+            archive = archive_index_path()
+            with stage("index"):
+                show_archive_search(articles, uploaded_file.name, digest, current_config(), archive)
+
+            with stage("dedup"):
+                show_duplicates(articles, uploaded_file.name, digest, current_config(), archive)
+
+            # Generate CSV for download
+            with stage("export"):
+                fieldnames = article_fieldnames(current_config().metadata_fields)
+                csv_data = to_bytes(articles, "csv", fieldnames)
+                jsonl_data = to_bytes(articles, "jsonl", fieldnames)
+
+            st.download_button(
+                label="💾 Download CSV",
+                data=csv_data,
+                file_name="articles.csv",
+                mime="text/csv"
+            )
+            st.download_button(
+                label="💾 Download JSONL",
+                data=jsonl_data,
+                file_name="articles.jsonl",
+                mime=MIME_TYPES["jsonl"]
+            )
+
+            def render_article(number, article):
+                st.subheader(f"Artigo {number}")
+                st.text_area(article.get("Titulo", ""), article.get("BODY", ""), height=200)
+
+                if "Rodape" in article.keys() and article.get("Rodape"):
+                    st.text_area("Rodapé", article.get("Rodape", ""), height=60)
+
+            # only the current page of articles is rendered
+            with stage("render"):
+                show_articles(
+                    articles,
+                    render_article,
+                    fields=search_fields(METADATA_FIELDS),
+                    signature=(uploaded_file.file_id, output_format, ARTICLE_START, tuple(METADATA_FIELDS)),
+                )
+
+        show_performance(profiler)
 
     else:
         st.info("Escolha um documento .docx para começar.")
\ No newline at end of file
@@ -0,0 +1,50 @@
+from doc_processor.core import DocumentCache, ProcessorConfig, split_articles
+
+DATA = "".join(f"==Artigo_inicio==\n#Titulo: {title}\ncorpo de {title}\n" for title in ("Um", "Dois")).encode()
+
+
+class Calls:
+    """extract/split callables for DocumentCache that count how often they run."""
+
+    def __init__(self, config):
+        self.config = config
+        self.extracted = 0
+        self.split_runs = 0
+
+    def extract(self, file, file_extension):
+        self.extracted += 1
+        return file.read().decode().splitlines()
+
+    def split(self, paragraphs):
+        self.split_runs += 1
+        return split_articles(paragraphs, self.config)
+
+
+def articles(cache, calls):
+    return cache.articles(DATA, ".txt", calls.config, calls.extract, calls.split)
+
+
+def test_repeated_run_hits_the_article_tier():
+    cache = DocumentCache()
+    calls = Calls(ProcessorConfig())
+    first = articles(cache, calls)
+    assert [article["Titulo"] for article in first] == ["Um", "Dois"]
+    assert articles(cache, calls) is first
+    assert (calls.extracted, calls.split_runs) == (1, 1)
+
+    # new delimiter: split again, from the cached paragraphs
+    calls.config = ProcessorConfig(article_start="#Titulo")
+    articles(cache, calls)
+    assert (calls.extracted, calls.split_runs) == (1, 2)
+
+    # settings that do not change the articles share the entry
+    calls.config = ProcessorConfig(article_start="#Titulo", fast=True)
+    articles(cache, calls)
+    assert (calls.extracted, calls.split_runs) == (1, 2)
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    calls = Calls(ProcessorConfig())
+    first = articles(DocumentCache(disk_dir=str(tmp_path)), calls)
+    assert articles(DocumentCache(disk_dir=str(tmp_path)), calls) == first
+    assert (calls.extracted, calls.split_runs) == (1, 1)
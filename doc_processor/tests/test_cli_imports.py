@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_cli_import_leaves_heavy_modules_to_the_subcommands():
+    # a fresh interpreter: the test session itself has already imported these
+    script = (
+        "import sys, doc_processor.core.cli\n"
+        "print(' '.join(m for m in ('sqlite3', 'asyncio', 'urllib.request') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
@@ -0,0 +1,85 @@
+import io
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+
+import pytest
+
+from doc_processor.core import IMAGE_FIELD, ProcessorConfig, process_document
+
+ODT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    ' xmlns:draw="urn:oasis:names:tc:opendocument:xmlns:drawing:1.0"'
+    ' xmlns:xlink="http://www.w3.org/1999/xlink"><office:body><office:text>'
+)
+ODT_FOOTER = "</office:text></office:body></office:document-content>"
+
+
+def png(rgb):
+    """A 1x1 PNG of colour ``rgb``."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(b"\x00" + bytes(rgb)))
+        + chunk(b"IEND", b"")
+    )
+
+
+RED = png((255, 0, 0))
+GREEN = png((0, 255, 0))
+
+
+def docx_edition():
+    """Blank paragraph, then article "Um" with a red image and "Dois" with a green one."""
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("")
+    for title, image in (("Um", RED), ("Dois", GREEN)):
+        document.add_paragraph("==Artigo_inicio==")
+        document.add_paragraph(f"#Titulo: {title}")
+        document.add_paragraph("texto")
+        document.add_paragraph().add_run().add_picture(io.BytesIO(image))
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def odt_edition():
+    """Same edition as :func:`docx_edition` in an .odt, with a line break only paragraph first."""
+    body = "<text:p/><text:p><text:line-break/></text:p>"
+    for title, name in (("Um", "red"), ("Dois", "green")):
+        body += (
+            f"<text:p>==Artigo_inicio==</text:p><text:p>#Titulo: {title}</text:p><text:p>texto</text:p>"
+            f'<text:p><draw:frame><draw:image xlink:href="Pictures/{name}.png"/></draw:frame></text:p>'
+        )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as zf:
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.text")
+        zf.writestr("content.xml", ODT_HEADER + body + ODT_FOOTER)
+        zf.writestr("Pictures/red.png", RED)
+        zf.writestr("Pictures/green.png", GREEN)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("output_format", ["Texto", "HTML"])
+@pytest.mark.parametrize("extension, edition", [(".docx", docx_edition), (".odt", odt_edition)])
+def test_images_follow_the_split_articles(tmp_path, output_format, extension, edition):
+    config = ProcessorConfig(output_format=output_format, image_dir=str(tmp_path))
+    articles = list(process_document(io.BytesIO(edition()), extension, config))
+
+    # in HTML mode the leading blank paragraph is an article of its own
+    named = [article for article in articles if article["Titulo"]]
+    assert [article["Titulo"] for article in named] == ["Um", "Dois"]
+    red, green = named[0][IMAGE_FIELD], named[1][IMAGE_FIELD]
+    assert Path(red).read_bytes() == RED
+    assert Path(green).read_bytes() == GREEN
+    assert all(not article[IMAGE_FIELD] for article in articles if not article["Titulo"])
+    if output_format == "HTML":
+        assert f'<img src="{red}">' in named[0]["BODY"]
+        assert f'<img src="{green}">' in named[1]["BODY"]
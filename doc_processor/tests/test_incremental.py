@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from doc_processor.core import IncrementalSplitter, ParagraphIndex, ProcessorConfig, split_articles
+
+PIECES = [
+    "==A==", "==B==", "#Titulo: t", "Titulo: x", "#Autor:a", "#Tag: q", "Tag: z", "corpo", "mais texto", " ", "",
+    "#Rodape: r", "<p>#Rodape: h", "x ==A== y", "==A====A==", "a:b", "#Titulo", "#Pag : 3", "\n", "\t#Autor: b",
+]
+FIELD_SETS = [("Titulo", "Autor", "Tag"), ("Titulo",), ("Autor", "Pag"), ("Tag", "Titulo", "Autor", "Pag ")]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_split_matches_split_articles(seed):
+    rng = random.Random(seed)
+    paragraphs = ["".join(rng.choice(PIECES) for _ in range(rng.randint(0, 3))) for _ in range(rng.randint(0, 40))]
+    html = seed % 2 == 1
+    splitter = IncrementalSplitter(ParagraphIndex(paragraphs, html=html))
+    # the same splitter is reused across configurations, as in the toggle app
+    for _ in range(8):
+        config = ProcessorConfig(
+            article_start=rng.choice(["==A==", "==B==", "==A=", "A", "corpo", "<p>"]),
+            metadata_fields=rng.choice(FIELD_SETS),
+            field_prefix=rng.choice(["#", "", "# "]),
+            output_format="HTML" if html else "Texto",
+            strip_body=rng.random() < 0.5,
+        )
+        expected = list(split_articles(paragraphs, config, wrapped=False))
+        articles = splitter.split(config)
+        assert articles == expected
+        assert [list(article) for article in articles] == [list(article) for article in expected]
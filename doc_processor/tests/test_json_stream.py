@@ -0,0 +1,88 @@
+import io
+import json
+import random
+
+import pytest
+
+from doc_processor.core import iter_json_events
+
+
+class ChunkedReader(io.RawIOBase):
+    """Binary file that returns at most ``size`` bytes per read, whatever is asked."""
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        n = self.size if n is None or n < 0 else min(n, self.size)
+        chunk = self.data[self.offset:self.offset + n]
+        self.offset += len(chunk)
+        return chunk
+
+    def readinto(self, buffer):
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def number(rng):
+    return rng.choice([
+        rng.randint(-10**6, 10**6),
+        round(rng.uniform(-1000, 1000), rng.randint(1, 6)),
+        rng.choice([1e-7, -2.5e10, 3.0e+21, 0.5, -0.0, 12345678901234567890]),
+    ])
+
+
+def edition(seed):
+    rng = random.Random(seed)
+    articles = [
+        {
+            "titulo": f"Artigo {i} — ação",
+            "num_imagens": number(rng),
+            "paginas": [number(rng), number(rng)],
+            "tags": ["a", "b"],
+            "dados": {"x": number(rng), "y": [number(rng)]},
+        }
+        for i in range(rng.randint(0, 12))
+    ]
+    edition = {"edition_number": number(rng), "articles": articles, "edition_date": "2024-03-01", "peso": number(rng)}
+    return json.dumps(edition, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1])).encode()
+
+
+def expected_events(data):
+    for key, value in json.loads(data).items():
+        if key == "articles" and isinstance(value, list):
+            for article in value:
+                yield "article", key, article
+        else:
+            yield "field", key, value
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+@pytest.mark.parametrize("seed", range(10))
+def test_python_reader_with_small_reads(seed, size):
+    data = edition(seed)
+    expected = list(expected_events(data))
+    assert list(iter_json_events(ChunkedReader(data, size), backend="python")) == expected
+
+
+@pytest.mark.parametrize("text", ['{"a": 3.25, "b": 1e5, "c": -7, "articles": [{"n": 10}]}', '{"a": 1.5e-3}'])
+def test_number_split_by_a_read(text):
+    # every split point, including after "3.", "1e" and "-"
+    data = text.encode()
+    for size in range(1, len(data) + 1):
+        assert list(iter_json_events(ChunkedReader(data, size), backend="python")) == list(expected_events(data))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_python_reader_matches_ijson(seed):
+    pytest.importorskip("ijson")
+    data = edition(seed)
+    assert list(iter_json_events(ChunkedReader(data, 7), backend="python")) == list(
+        iter_json_events(io.BytesIO(data), backend="ijson")
+    )
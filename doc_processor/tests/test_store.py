@@ -0,0 +1,65 @@
+import os
+
+from doc_processor.core import ProcessorConfig, ResultStore
+
+CONFIG = ProcessorConfig()
+
+
+def write_edition(path, *titles):
+    path.write_text(
+        "".join(f"==Artigo_inicio==\n#Titulo: {title}\ncorpo de {title}\n" for title in titles), encoding="utf-8"
+    )
+
+
+def refresh(store, inputs):
+    return [result.source for result in store.refresh(inputs, CONFIG, workers=1)]
+
+
+def test_refresh_only_parses_new_and_changed_files(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    write_edition(a, "Um")
+    write_edition(b, "Dois", "Três")
+    with ResultStore(str(tmp_path / "store.sqlite3")) as store:
+        assert refresh(store, [str(tmp_path)]) == [str(a), str(b)]
+        assert store.skipped == []
+
+        assert refresh(store, [str(tmp_path)]) == []
+        assert store.skipped == [str(a), str(b)]
+
+        # same content, new modification time: hashed, not parsed
+        stat = os.stat(a)
+        os.utime(a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert refresh(store, [str(tmp_path)]) == []
+
+        write_edition(a, "Um", "Quatro")
+        assert refresh(store, [str(tmp_path)]) == [str(a)]
+        assert store.skipped == [str(b)]
+        assert [article["Titulo"] for article in store.articles(str(a))] == ["Um", "Quatro"]
+
+        # a changed configuration parses everything again
+        assert [result.source for result in store.refresh([str(tmp_path)], CONFIG.replace(strip_body=False))] == [
+            str(a),
+            str(b),
+        ]
+
+
+def test_skipped_is_set_before_parsing(tmp_path):
+    write_edition(tmp_path / "a.txt", "Um")
+    with ResultStore() as store:
+        list(store.refresh([str(tmp_path)], CONFIG, workers=1))
+        results = store.refresh([str(tmp_path)], CONFIG, workers=1)
+        assert store.skipped == [str(tmp_path / "a.txt")]
+        assert list(results) == []
+
+
+def test_file_changed_after_the_check_is_parsed_again(tmp_path):
+    a = tmp_path / "a.txt"
+    write_edition(a, "Um")
+    with ResultStore() as store:
+        results = store.refresh([str(a)], CONFIG, workers=1)
+        write_edition(a, "Um", "Dois")
+        list(results)
+        # the articles stored come from the new content, but the identity is
+        # the one checked, so the next run cannot mistake them for current
+        assert refresh(store, [str(a)]) == [str(a)]
+        assert refresh(store, [str(a)]) == []
@@ -0,0 +1,208 @@
+"""Streamlit widgets shared by the processor apps.
+
+Streamlit is imported inside the functions, like in the apps themselves, so
+this module can be imported without it.
+"""
+
+import os
+
+from core.cache import content_hash
+from core.dedup import DedupIndex, cluster_rows
+from core.fulltext import DEFAULT_PATH, ENV_VAR, FullTextIndex, identity_digest, index_path
+from core.registry import supported_extensions
+from core.search import SEARCH_FIELDS, ArticleIndex
+
+
+def upload_types():
+    """``st.file_uploader`` types for every registered document format."""
+    return [extension.lstrip(".") for extension in supported_extensions()]
+
+
+def upload_digest(uploaded_file):
+    """Content hash of an upload, read from its buffer without copying the bytes.
+
+    Computed once per rerun and passed to the widgets that need it.
+    """
+    with uploaded_file.getbuffer() as view:
+        return content_hash(view)
+
+
+def archive_index_path():
+    """The archive index the upload is added to, or None to leave it alone.
+
+    With ``DOC_PROCESSOR_INDEX`` set that file is used; otherwise nothing is
+    written unless the user ticks the checkbox, which indexes into
+    :data:`core.fulltext.DEFAULT_PATH` in the working directory.
+    """
+    import streamlit as st
+
+    if os.environ.get(ENV_VAR) or st.checkbox(
+        "Guardar no arquivo de pesquisa",
+        key="archive_index",
+        help=f"Acrescenta os artigos a {DEFAULT_PATH}, para os pesquisar e comparar com outras edições",
+    ):
+        return index_path()
+    return None
+
+
+def show_performance(profiler):
+    """Show the stage timings and counters of ``profiler`` in an expander and log them.
+
+    Does nothing when ``profiler`` is None (profiling off, see
+    :mod:`core.instrument`).
+    """
+    if profiler is None:
+        return
+    import streamlit as st
+
+    profiler.log()
+    report = profiler.report()
+    with st.expander("⏱️ Desempenho"):
+        st.write(f"Tempo total: {report['seconds']:.3f} s")
+        rows = []
+        for name, stats in report["stages"].items():
+            row = {
+                "Etapa": name,
+                "Chamadas": stats["calls"],
+                "Tempo (s)": round(stats["seconds"], 4),
+                "Tempo próprio (s)": round(stats["self_seconds"], 4),
+            }
+            if "peak_bytes" in stats:
+                row["Pico de memória (MB)"] = round(stats["peak_bytes"] / 1e6, 2)
+            rows.append(row)
+        st.table(rows)
+        if report["counters"]:
+            st.write(", ".join(f"{name}: {value}" for name, value in report["counters"].items()))
+        st.json(report, expanded=False)
+
+
+def show_normalized(result):
+    """Show a :class:`core.normalize.NormalizedArticles`: the rows to check and the typed table."""
+    import streamlit as st
+
+    issues = {name: count for name, count in result.summary().items() if count}
+    labels = {
+        "sem_titulo": "sem título",
+        "rodape_nao_final": "rodapé seguido de texto",
+    }
+    if issues:
+        st.warning(
+            f"{int((~result.valid).sum())} de {len(result)} artigos a verificar: "
+            + ", ".join(f"{count} {labels.get(name, name)}" for name, count in issues.items())
+        )
+    with st.expander("🧹 Metadados normalizados"):
+        if issues:
+            st.write("Artigos a verificar")
+            st.dataframe(result.issues[~result.valid].join(result.frame))
+        st.dataframe(result.frame)
+        if len(result.tags):
+            st.write("Tags")
+            st.dataframe(result.tags["tag"].value_counts().rename("artigos"))
+
+
+def show_archive_search(articles, source, digest, settings=None, path=None):
+    """Add the upload to the persistent full-text index ``path`` and show a search box over it.
+
+    ``digest`` (see :func:`upload_digest`) and ``settings`` identify what was
+    indexed, so reruns of the same upload do not write the index again. Does
+    nothing when ``path`` is None (see :func:`archive_index_path`).
+    """
+    import streamlit as st
+
+    if path is None:
+        return
+    with FullTextIndex(path) as index:
+        index.add(source, articles, identity_digest(digest, settings))
+        with st.expander("🔎 Pesquisa no arquivo"):
+            st.caption(f"{len(index)} artigos de {len(index.sources())} edições indexadas em {index.path}")
+            words, author = st.columns(2)
+            query = words.text_input("Palavras", key="archive_query")
+            autor = author.text_input("Autor", key="archive_author")
+            if not (query or autor):
+                return
+            hits = index.search(query, autor=autor)
+            st.write(f"{index.count(query, autor=autor)} artigos encontrados")
+            st.dataframe([
+                {
+                    "Edição": hit.source,
+                    "Artigo": hit.position + 1,
+                    "Título": hit.titulo,
+                    "Autor": hit.autor,
+                    "Data": hit.data,
+                    "Excerto": hit.snippet,
+                }
+                for hit in hits
+            ])
+
+
+def show_duplicates(articles, source, digest, settings=None, path=None):
+    """Check the upload for near-duplicate articles, within itself and in the archive.
+
+    The signatures are stored in the archive index ``path`` like
+    :func:`show_archive_search` stores the text, so later editions are
+    checked against this one. Does nothing when ``path`` is None.
+    """
+    import streamlit as st
+
+    if path is None:
+        return
+    with DedupIndex(path) as index:
+        clusters = index.update(source, articles, identity_digest(digest, settings))
+    if not clusters:
+        return
+    repeated = sum(member.source == source for cluster in clusters for member in cluster.members)
+    st.warning(f"{repeated} artigos repetidos ou quase iguais em {len(clusters)} grupos")
+    with st.expander("♻️ Artigos repetidos"):
+        st.dataframe(cluster_rows(clusters))
+
+
+def search_fields(metadata_fields, wanted=SEARCH_FIELDS):
+    """The article keys among ``metadata_fields`` that are searchable (Titulo, Autor, Tag), with or without '#'."""
+    return [field for field in metadata_fields if field.lstrip("#") in wanted]
+
+
+def show_articles(articles, render, fields=SEARCH_FIELDS, key="articles", signature=None, page_sizes=(10, 25, 50)):
+    """Searchable, paginated article list that only renders the current page.
+
+    ``render(number, article)`` draws one article, ``number`` being its
+    1-based position in ``articles``. The search index over ``fields`` is kept
+    in the session and only rebuilt when ``signature`` (for example the upload
+    id plus the processing options) changes; with no signature it is rebuilt
+    on every rerun. A rerun therefore costs one index lookup plus one page of
+    widgets, whatever the size of the edition.
+    """
+    import streamlit as st
+
+    state = st.session_state
+    cached = state.get(f"{key}_index")
+    if signature is not None and cached is not None and cached[0] == signature:
+        index = cached[1]
+    else:
+        index = ArticleIndex(articles, fields)
+        state[f"{key}_index"] = (signature, index)
+
+    query_column, field_column, size_column = st.columns([3, 1, 1])
+    query = query_column.text_input(
+        "Pesquisar", key=f"{key}_query", placeholder=f"Pesquisar em {', '.join(f.lstrip('#') for f in fields)}"
+    )
+    field = field_column.selectbox("Campo", ["Todos", *fields], key=f"{key}_field")
+    page_size = size_column.selectbox("Por página", page_sizes, key=f"{key}_page_size")
+
+    positions = index.search(query, None if field == "Todos" else [field])
+    pages = max(1, -(-len(positions) // page_size))
+
+    # back to the first page whenever the filter or the document changes
+    page_key = f"{key}_page"
+    current_filter = (query, field, page_size, signature)
+    if state.get(f"{key}_filter") != current_filter:
+        state[f"{key}_filter"] = current_filter
+        state[page_key] = 1
+    elif state.get(page_key, 1) > pages:
+        state[page_key] = pages
+
+    page = st.number_input("Página", min_value=1, max_value=pages, step=1, key=page_key)
+    st.caption(f"{len(positions)} de {len(articles)} artigos · página {page} de {pages}")
+
+    start = (page - 1) * page_size
+    for position in positions[start:start + page_size]:
+        render(position + 1, articles[position])